@@ -0,0 +1,17 @@
+from datetime import datetime
+from typing import Optional
+from fastapi import APIRouter, Depends
+from sqlalchemy.orm import Session
+from core.database import get_db
+from core.dependencies import is_admin
+from models.user import User
+from schemas.audit import AuditEventPage
+from services.audit_service import list_audit_events
+
+router = APIRouter()
+
+@router.get("/audit/events", response_model=AuditEventPage, summary="Consultar eventos de auditoria")
+def list_audit_events_endpoint(user_id: Optional[int] = None, actor_id: Optional[int] = None, action: Optional[str] = None,
+                               since: Optional[datetime] = None, until: Optional[datetime] = None, cursor: Optional[str] = None,
+                               limit: int = 50, db: Session = Depends(get_db), current_user: User = Depends(is_admin)):
+    return list_audit_events(db, limit, user_id=user_id, actor_id=actor_id, action=action, since=since, until=until, cursor=cursor)
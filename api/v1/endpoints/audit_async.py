@@ -0,0 +1,17 @@
+from datetime import datetime
+from typing import Optional
+from fastapi import APIRouter, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+from core.database import get_async_db
+from core.dependencies import is_admin_async
+from models.user import User
+from schemas.audit import AuditEventPage
+from services.audit_service_async import list_audit_events
+
+router = APIRouter()
+
+@router.get("/audit/events", response_model=AuditEventPage, summary="Consultar eventos de auditoria")
+async def list_audit_events_endpoint(user_id: Optional[int] = None, actor_id: Optional[int] = None, action: Optional[str] = None,
+                                     since: Optional[datetime] = None, until: Optional[datetime] = None, cursor: Optional[str] = None,
+                                     limit: int = 50, db: AsyncSession = Depends(get_async_db), current_user: User = Depends(is_admin_async)):
+    return await list_audit_events(db, limit, user_id=user_id, actor_id=actor_id, action=action, since=since, until=until, cursor=cursor)
@@ -1,39 +1,54 @@
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Request
 from sqlalchemy.orm import Session
 from fastapi.security import OAuth2PasswordRequestForm
-from core.database import SessionLocal
-from services.user_service import get_user_by_email
-from core.security import create_token_access, get_current_user
-from core.hashing import verify_password
-from utils.logger import logger
+from fastapi.concurrency import run_in_threadpool
+from core.database import get_db
+from services.user_service import get_user_by_email, update_password_hash
+from services.token_service import issue_refresh_token, rotate_refresh_token
+from schemas.token import RefreshRequest
+from core.security import create_token_access, build_token_claims, get_current_user
+from core.hashing import verify_and_update_async
+from core.rate_limit import login_limiter
+from utils.logger import logger, bind_log_context
 from models.user import User
 
 router = APIRouter()
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
 @router.post("/login", summary="Login")
-def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
+async def login(request: Request, form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
+    client_ip = request.client.host if request.client else "desconhecido"
+    login_limiter.check(client_ip, form_data.username)
     
-    usuario = get_user_by_email(db, form_data.username)
+    usuario = await run_in_threadpool(get_user_by_email, db, form_data.username)
     
     if not usuario:
-        logger.error(f"Tentativa de login com e-mail inexistente: {form_data.username}")
+        logger.error("Tentativa de login com e-mail inexistente: %s", form_data.username)
+        login_limiter.record_failure(client_ip, form_data.username)
         raise HTTPException(status_code=400, detail="Usuário não encontrado")
      
-    if not verify_password(form_data.password, usuario.password):
-        logger.error(f"Senha incorreta para e-mail: {form_data.username}")
+    senha_valida, novo_hash = await verify_and_update_async(form_data.password, usuario.password)
+    if not senha_valida:
+        logger.error("Senha incorreta para e-mail: %s", form_data.username)
+        login_limiter.record_failure(client_ip, form_data.username)
         raise HTTPException(status_code=400, detail="Senha incorreta")
      
-    dados_token = {"sub": usuario.email}
+    dados_token = build_token_claims(usuario)
     token = create_token_access(dados_token)
-    logger.info(f"Login bem-sucedido para usuário: {usuario.id} - {usuario.email}")
-    return {"access_token": token, "token_type": "bearer"}
+    bind_log_context(user_id=usuario.id)
+    login_limiter.record_success(client_ip, form_data.username)
+    logger.info("Login bem-sucedido para usuário: %s - %s", usuario.id, usuario.email)
+    if novo_hash is not None:
+        await run_in_threadpool(update_password_hash, db, usuario, novo_hash)
+    refresh_token = await run_in_threadpool(issue_refresh_token, db, usuario)
+    return {"access_token": token, "refresh_token": refresh_token, "token_type": "bearer"}
+
+@router.post("/refresh", summary="Renovar token de acesso")
+def refresh(dados: RefreshRequest, db: Session = Depends(get_db)):
+    usuario, refresh_token = rotate_refresh_token(db, dados.refresh_token)
+    token = create_token_access(build_token_claims(usuario))
+    bind_log_context(user_id=usuario.id)
+    logger.info("Token renovado para usuário: %s", usuario.id)
+    return {"access_token": token, "refresh_token": refresh_token, "token_type": "bearer"}
 
 @router.get("/protected-route", summary="Validar se usuário está logado")
 def protected_route(current_user: User = Depends(get_current_user)):
@@ -41,5 +56,5 @@ def protected_route(current_user: User = Depends(get_current_user)):
         logger.error("Tentativa de acesso a recurso protegido sem autenticação válida.")
         raise HTTPException(status_code=401, detail="Usuário não autenticado")
     
-    logger.info(f"Acesso à rota protegida autorizado para usuário: {current_user.id} - {current_user.email}")
+    logger.info("Acesso à rota protegida autorizado para usuário: %s - %s", current_user.id, current_user.email)
     return {"message": f"Login realizado com sucesso! Bem-vindo, {current_user.name}!"}
\ No newline at end of file
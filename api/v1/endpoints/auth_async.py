@@ -0,0 +1,55 @@
+from fastapi import APIRouter, HTTPException, Depends, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi.security import OAuth2PasswordRequestForm
+from core.database import get_async_db
+from services.user_service_async import get_user_by_email, update_password_hash
+from services.token_service_async import issue_refresh_token, rotate_refresh_token
+from schemas.token import RefreshRequest
+from core.security import create_token_access, build_token_claims, get_current_user_async
+from core.hashing import verify_and_update_async
+from core.rate_limit import login_limiter
+from utils.logger import logger, bind_log_context
+from models.user import User
+
+router = APIRouter()
+
+@router.post("/login", summary="Login")
+async def login(request: Request, form_data: OAuth2PasswordRequestForm = Depends(), db: AsyncSession = Depends(get_async_db)):
+    client_ip = request.client.host if request.client else "desconhecido"
+    login_limiter.check(client_ip, form_data.username)
+
+    usuario = await get_user_by_email(db, form_data.username)
+
+    if not usuario:
+        logger.error("Tentativa de login com e-mail inexistente: %s", form_data.username)
+        login_limiter.record_failure(client_ip, form_data.username)
+        raise HTTPException(status_code=400, detail="Usuário não encontrado")
+
+    senha_valida, novo_hash = await verify_and_update_async(form_data.password, usuario.password)
+    if not senha_valida:
+        logger.error("Senha incorreta para e-mail: %s", form_data.username)
+        login_limiter.record_failure(client_ip, form_data.username)
+        raise HTTPException(status_code=400, detail="Senha incorreta")
+
+    dados_token = build_token_claims(usuario)
+    token = create_token_access(dados_token)
+    bind_log_context(user_id=usuario.id)
+    login_limiter.record_success(client_ip, form_data.username)
+    logger.info("Login bem-sucedido para usuário: %s - %s", usuario.id, usuario.email)
+    if novo_hash is not None:
+        await update_password_hash(db, usuario, novo_hash)
+    refresh_token = await issue_refresh_token(db, usuario)
+    return {"access_token": token, "refresh_token": refresh_token, "token_type": "bearer"}
+
+@router.post("/refresh", summary="Renovar token de acesso")
+async def refresh(dados: RefreshRequest, db: AsyncSession = Depends(get_async_db)):
+    usuario, refresh_token = await rotate_refresh_token(db, dados.refresh_token)
+    token = create_token_access(build_token_claims(usuario))
+    bind_log_context(user_id=usuario.id)
+    logger.info("Token renovado para usuário: %s", usuario.id)
+    return {"access_token": token, "refresh_token": refresh_token, "token_type": "bearer"}
+
+@router.get("/protected-route", summary="Validar se usuário está logado")
+async def protected_route(current_user: User = Depends(get_current_user_async)):
+    logger.info("Acesso à rota protegida autorizado para usuário: %s - %s", current_user.id, current_user.email)
+    return {"message": f"Login realizado com sucesso! Bem-vindo, {current_user.name}!"}
@@ -0,0 +1,28 @@
+from typing import Optional
+from fastapi import APIRouter, Depends, Header, Request
+from fastapi.responses import StreamingResponse
+from core.config import CHANGE_FEED_BATCH_SIZE
+from core.dependencies import is_admin_async
+from models.user import User
+from schemas.change import UserChangePage
+from services.change_feed import check_feed_params, long_poll, sse_events
+from services.change_feed_async import fetch_changes_page
+
+router = APIRouter()
+
+def page_fetcher(limit: int):
+    async def fetch(after: int, consumer: Optional[str]):
+        return await fetch_changes_page(after, limit, consumer)
+    return fetch
+
+@router.get("/changes/users", response_model=UserChangePage, summary="Feed de alterações de usuários (long-poll)")
+async def list_user_changes_endpoint(after: int = 0, limit: int = CHANGE_FEED_BATCH_SIZE, wait: float = 0, consumer: Optional[str] = None, current_user: User = Depends(is_admin_async)):
+    wait = check_feed_params(after, limit, wait)
+    return await long_poll(page_fetcher(limit), after, consumer, wait)
+
+@router.get("/changes/users/stream", summary="Feed de alterações de usuários (Server-Sent Events)")
+async def stream_user_changes_endpoint(request: Request, after: int = 0, limit: int = CHANGE_FEED_BATCH_SIZE, consumer: Optional[str] = None, last_event_id: Optional[int] = Header(None), current_user: User = Depends(is_admin_async)):
+    after = last_event_id if last_event_id is not None else after
+    check_feed_params(after, limit)
+    headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    return StreamingResponse(sse_events(request, page_fetcher(limit), after, consumer), media_type="text/event-stream", headers=headers)
@@ -1,30 +1,31 @@
-from fastapi import APIRouter, Depends, HTTPException
+import io
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Request, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from services.user_service import create_user, get_user, update_user, list_users, patch_user, deactivate_user, activate_user, promote_user_to_admin, delete_user, get_data_current_user
-from schemas.user import UserCreate, UserResponse, UserUpdate, UserPatch
-from core.database import SessionLocal
+from schemas.user import UserCreate, UserResponse, UserUpdate, UserPatch, UserPage, UserBatchRequest, UserBatchResponse
+from core.database import get_db
 from typing import List, Optional
 from models.user import User
 from core.security import get_current_user
 from core.dependencies import is_admin
 from utils.logger import logger
+from services.import_service import import_users, parse_rows, detect_format
+from core.config import BULK_IMPORT_BATCH_SIZE, LIST_USERS_MAX_LIMIT
+from services.export_service import iter_export, gzip_chunks, accepts_gzip, check_format
+from services.user_queries import check_search_mode
+from services.batch_service import run_batch
+from core.http_cache import user_response, page_response
 
 router = APIRouter()
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
 @router.post("/user/{user_id}", response_model=UserResponse, summary="Criar um usuário")
 def create_user_endpoint(user: UserCreate, db: Session = Depends(get_db)):
     return create_user(db=db, user=user)
 
 @router.get("/user/{user_id}", response_model=UserResponse, summary="Busca de usuário por ID")
-def get_user_endpoint(user_id: int, db: Session =  Depends(get_db), current_user: User = Depends(get_current_user)):
-    return get_user(user_id=user_id, db=db, current_user=current_user)
+def get_user_endpoint(request: Request, user_id: int, db: Session =  Depends(get_db), current_user: User = Depends(get_current_user)):
+    return user_response(request, get_user(user_id=user_id, db=db, current_user=current_user))
 
 @router.put("/user/{user_id}", summary="Atualizar todas as informações de um usuário")
 def update_user_endpoint(user_id: int, user: UserUpdate, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):  
@@ -34,21 +35,39 @@ def update_user_endpoint(user_id: int, user: UserUpdate, db: Session = Depends(g
 def delete_user_endpoint(user_id: int, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
     return delete_user(user_id, db, current_user)
 
-@router.get("/users/", response_model=List[UserResponse], summary="Listar usuários")
-def list_users_endpoint(skip: int = 0, limit: int = 10, name: Optional[str] = None, email: Optional[str] = None, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
-    return list_users(db=db, skip=skip, limit=limit, name=name, email=email)
+@router.get("/users/", response_model=UserPage, summary="Listar usuários")
+def list_users_endpoint(request: Request, skip: int = Query(0, ge=0), limit: int = Query(10, ge=1, le=LIST_USERS_MAX_LIMIT), name: Optional[str] = None, email: Optional[str] = None, cursor: Optional[str] = None, search: str = "contains", db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+    key = (skip, limit, name, email, cursor, search)
+    return page_response(request, current_user, key, lambda: list_users(db=db, current_user=current_user, skip=skip, limit=limit, name=name, email=email, cursor=cursor, search=search))
+
+@router.get("/users/export", summary="Exportar usuários (NDJSON ou CSV)")
+def export_users_endpoint(request: Request, format: str = "ndjson", name: Optional[str] = None, email: Optional[str] = None, search: str = "contains", current_user: User = Depends(is_admin)):
+    media_type = check_format(format)
+    check_search_mode(search)
+    chunks = iter_export(format, name=name, email=email, search=search)
+    headers = {"Content-Disposition": f'attachment; filename="users.{format}"', "Vary": "Accept-Encoding"}
+    if accepts_gzip(request.headers.get("accept-encoding")):
+        chunks = gzip_chunks(chunks)
+        headers["Content-Encoding"] = "gzip"
+    return StreamingResponse(chunks, media_type=media_type, headers=headers)
 
-@router.patch("/users/{user_id}", summary="Atualizar parcialmente dados do usuário")
+@router.post("/users/import", summary="Importar usuários em lote (NDJSON ou CSV)")
+def import_users_endpoint(file: UploadFile = File(...), format: Optional[str] = None, batch_size: int = Query(BULK_IMPORT_BATCH_SIZE, ge=1), db: Session = Depends(get_db), current_user: User = Depends(is_admin)):
+    fmt = format or detect_format(file.filename, file.content_type)
+    stream = io.TextIOWrapper(file.file, encoding="utf-8", newline="")
+    return import_users(db, parse_rows(stream, fmt), batch_size)
+
+@router.patch("/users/{user_id}", response_model=UserResponse, summary="Atualizar parcialmente dados do usuário")
 def update_user_partially(user_id: int, user_patch: UserPatch, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
-    return update_user(db=db, user_id=user_id, user_patch=user_patch, current_user=current_user )
+    return patch_user(db=db, user_id=user_id, user_patch=user_patch, current_user=current_user)
 
-@router.patch("/users/{user_id}", summary="Promover usuário a admin")
+@router.patch("/users/{user_id}/promote", summary="Promover usuário a admin")
 def promote_user_to_admin_endpoint(user_id: int, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
     return promote_user_to_admin(user_id, current_user, db)
 
 @router.get("/users/{user_id}", response_model=UserResponse, summary="Meus dados")
-def get_data_current_user_endpoint(current_user: User = Depends(get_current_user)):
-    return get_data_current_user(current_user=current_user)
+def get_data_current_user_endpoint(request: Request, current_user: User = Depends(get_current_user)):
+    return user_response(request, get_data_current_user(current_user=current_user))
 
 @router.patch("/users/{user_id}/deactivate", summary="Desativar usuário")
 def deactivate_user_route(user_id: int, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
@@ -57,3 +76,19 @@ def deactivate_user_route(user_id: int, current_user: User = Depends(get_current
 @router.patch("/users/{user_id}/activate", summary="Ativar usuário")
 def activate_user_route_endpoint(user_id: int, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
     return activate_user(user_id, current_user, db)
+
+@router.post("/users/batch/activate", response_model=UserBatchResponse, summary="Ativar usuários em lote")
+def batch_activate_endpoint(batch: UserBatchRequest, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+    return run_batch(db, "activate", batch.ids, current_user)
+
+@router.post("/users/batch/deactivate", response_model=UserBatchResponse, summary="Desativar usuários em lote")
+def batch_deactivate_endpoint(batch: UserBatchRequest, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+    return run_batch(db, "deactivate", batch.ids, current_user)
+
+@router.post("/users/batch/promote", response_model=UserBatchResponse, summary="Promover usuários a admin em lote")
+def batch_promote_endpoint(batch: UserBatchRequest, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+    return run_batch(db, "promote", batch.ids, current_user)
+
+@router.post("/users/batch/delete", response_model=UserBatchResponse, summary="Excluir usuários em lote")
+def batch_delete_endpoint(batch: UserBatchRequest, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+    return run_batch(db, "delete", batch.ids, current_user)
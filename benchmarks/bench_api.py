@@ -0,0 +1,115 @@
+import argparse
+import asyncio
+import os
+import time
+
+from benchmarks.common import print_table, summarize, write_results
+
+PREFIX = "/api/v1/endpoints"
+BENCH_EMAIL = "bench@bench.com"
+BENCH_PASSWORD = "benchmark"
+
+parser = argparse.ArgumentParser(description="Benchmark de carga dos endpoints de autenticação e usuários")
+parser.add_argument("--users", type=int, default=10000, help="quantidade de usuários semeados no banco")
+parser.add_argument("--requests", type=int, default=500, help="requisições por cenário")
+parser.add_argument("--login-requests", type=int, default=50, help="requisições para o cenário de login (bcrypt é caro)")
+parser.add_argument("--concurrency", type=int, default=16)
+parser.add_argument("--page-size", type=int, default=50)
+parser.add_argument("--database-url", default=os.getenv("BENCH_DATABASE_URL", "sqlite:///./benchmark.db"))
+parser.add_argument("--base-url", default=None, help="URL de um uvicorn já em execução; sem ela o app roda em processo (ASGI)")
+parser.add_argument("--output", default="bench_api.json")
+
+
+def seed(total: int):
+    from sqlalchemy import func, insert, select
+    from core.database import SessionLocal, create_tables
+    from core.hashing import create_hash
+    from init_db import create_master_admin
+    from models.user import User
+
+    create_tables()
+    db = SessionLocal()
+    try:
+        create_master_admin(db)
+        existentes = db.execute(select(func.count(User.id))).scalar_one()
+        if existentes < total:
+            senha = create_hash(BENCH_PASSWORD)
+            if not db.execute(select(User.id).where(User.email == BENCH_EMAIL)).first():
+                db.execute(insert(User), [{"name": "Bench", "email": BENCH_EMAIL, "password": senha, "role": "user", "is_active": True, "is_deleted": False}])
+            lote = []
+            for i in range(existentes, total):
+                lote.append({"name": f"Usuario {i}", "email": f"seed{i}@bench.com", "password": senha, "role": "user", "is_active": True, "is_deleted": False})
+                if len(lote) == 5000:
+                    db.execute(insert(User), lote)
+                    lote = []
+            if lote:
+                db.execute(insert(User), lote)
+            db.commit()
+        return db.execute(select(func.max(User.id))).scalar_one()
+    finally:
+        db.close()
+
+
+async def run_scenario(client, total: int, concurrency: int, request_factory) -> dict:
+    latencias = []
+    erros = 0
+    proximo = 0
+
+    async def worker():
+        nonlocal erros, proximo
+        while proximo < total:
+            indice = proximo
+            proximo += 1
+            method, url, kwargs = request_factory(indice)
+            t0 = time.perf_counter()
+            response = await client.request(method, url, **kwargs)
+            latencias.append(time.perf_counter() - t0)
+            if response.status_code >= 400:
+                erros += 1
+
+    inicio = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarize(latencias, time.perf_counter() - inicio, erros)
+
+
+async def main(args):
+    import httpx
+    from core.security import create_token_access
+    from services.user_queries import encode_cursor
+
+    max_id = seed(args.users)
+
+    if args.base_url:
+        client = httpx.AsyncClient(base_url=args.base_url, timeout=60)
+    else:
+        from main import app
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=60)
+
+    admin = {"Authorization": f"Bearer {create_token_access({'sub': 'admin@admin.com'})}"}
+    deep_offset = max(max_id - args.page_size, 0)
+
+    cenarios = {
+        "auth_login": (args.login_requests, lambda i: ("POST", f"{PREFIX}/auth/login", {"data": {"username": BENCH_EMAIL, "password": BENCH_PASSWORD}})),
+        "auth_protected_route": (args.requests, lambda i: ("GET", f"{PREFIX}/auth/protected-route", {"headers": admin})),
+        "users_list_shallow": (args.requests, lambda i: ("GET", f"{PREFIX}/users/", {"headers": admin, "params": {"limit": args.page_size}})),
+        "users_list_deep_offset": (args.requests, lambda i: ("GET", f"{PREFIX}/users/", {"headers": admin, "params": {"limit": args.page_size, "skip": deep_offset}})),
+        "users_list_deep_cursor": (args.requests, lambda i: ("GET", f"{PREFIX}/users/", {"headers": admin, "params": {"limit": args.page_size, "cursor": encode_cursor(deep_offset)}})),
+        "user_get_by_id": (args.requests, lambda i: ("GET", f"{PREFIX}/user/{(i % max_id) + 1}", {"headers": admin})),
+    }
+
+    resultados = {}
+    async with client:
+        for nome, (total, factory) in cenarios.items():
+            resultados[nome] = await run_scenario(client, total, args.concurrency, factory)
+            print(f"{nome}: {resultados[nome]['throughput_rps']} req/s, p99 {resultados[nome]['p99_ms']} ms")
+
+    print_table(resultados)
+    params = {"users": args.users, "concurrency": args.concurrency, "mode": "http" if args.base_url else "asgi", "async_db": os.getenv("ASYNC_DB", "false")}
+    write_results(args.output, "api", params, resultados)
+
+
+if __name__ == "__main__":
+    args = parser.parse_args()
+    os.environ["DATABASE_URL"] = args.database_url
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+    asyncio.run(main(args))
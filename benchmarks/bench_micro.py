@@ -0,0 +1,50 @@
+import argparse
+import os
+
+from benchmarks.common import print_table, time_calls, write_results
+
+parser = argparse.ArgumentParser(description="Micro-benchmarks de hashing, JWT e autenticação")
+parser.add_argument("--hash-iterations", type=int, default=20)
+parser.add_argument("--iterations", type=int, default=2000)
+parser.add_argument("--database-url", default=os.getenv("BENCH_DATABASE_URL", "sqlite:///./benchmark.db"))
+parser.add_argument("--output", default="bench_micro.json")
+
+
+def main(args):
+    from core.cache import principal_cache
+    from core.database import SessionLocal, create_tables
+    from core.hashing import create_hash, verify_password, shutdown_hash_executor
+    from core.security import create_token_access, get_current_user
+    from init_db import create_master_admin
+
+    create_tables()
+    db = SessionLocal()
+    try:
+        create_master_admin(db)
+        hashed = create_hash("benchmark")
+        token = create_token_access({"sub": "admin@admin.com"})
+
+        def current_user_cold():
+            principal_cache.clear()
+            get_current_user(token=token, db=db)
+
+        resultados = {
+            "create_hash": time_calls(lambda: create_hash("benchmark"), args.hash_iterations),
+            "verify_password": time_calls(lambda: verify_password("benchmark", hashed), args.hash_iterations),
+            "create_token_access": time_calls(lambda: create_token_access({"sub": "admin@admin.com"}), args.iterations),
+            "get_current_user_cold": time_calls(current_user_cold, args.iterations),
+            "get_current_user_cached": time_calls(lambda: get_current_user(token=token, db=db), args.iterations),
+        }
+    finally:
+        db.close()
+        shutdown_hash_executor()
+
+    print_table(resultados)
+    write_results(args.output, "micro", {"hash_workers": os.getenv("HASH_WORKERS", "auto")}, resultados)
+
+
+if __name__ == "__main__":
+    args = parser.parse_args()
+    os.environ["DATABASE_URL"] = args.database_url
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+    main(args)
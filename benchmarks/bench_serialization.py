@@ -0,0 +1,52 @@
+import argparse
+import os
+
+from benchmarks.common import print_table, time_calls, write_results
+
+parser = argparse.ArgumentParser(description="Compara a serialização da listagem de usuários: ORM + Pydantic contra colunas + orjson")
+parser.add_argument("--users", type=int, default=10000, help="quantidade de usuários semeados no banco")
+parser.add_argument("--page-sizes", default="50,1000", help="tamanhos de página separados por vírgula")
+parser.add_argument("--iterations", type=int, default=200)
+parser.add_argument("--database-url", default=os.getenv("BENCH_DATABASE_URL", "sqlite:///./benchmark.db"))
+parser.add_argument("--output", default="bench_serialization.json")
+
+
+def main(args):
+    from fastapi.encoders import jsonable_encoder
+    from fastapi.responses import JSONResponse
+    from benchmarks.bench_api import seed
+    from core.database import SessionLocal
+    from core.http_cache import encode_page
+    from schemas.user import UserPage
+    from services.user_queries import build_list_users_query, paginate
+
+    seed(args.users)
+    db = SessionLocal()
+    dialect = db.get_bind().dialect.name
+
+    def orm_pydantic(limit: int):
+        users = db.execute(build_list_users_query(dialect, limit, lean=False)).scalars().all()
+        JSONResponse(jsonable_encoder(UserPage.model_validate(paginate(users, limit))))
+        db.expunge_all()
+
+    def lean_orjson(limit: int):
+        rows = db.execute(build_list_users_query(dialect, limit)).all()
+        encode_page(paginate(rows, limit))
+
+    resultados = {}
+    try:
+        for limit in (int(valor) for valor in args.page_sizes.split(",")):
+            resultados[f"list_{limit}_orm_pydantic"] = time_calls(lambda: orm_pydantic(limit), args.iterations)
+            resultados[f"list_{limit}_lean_orjson"] = time_calls(lambda: lean_orjson(limit), args.iterations)
+    finally:
+        db.close()
+
+    print_table(resultados)
+    write_results(args.output, "serialization", {"users": args.users, "page_sizes": args.page_sizes}, resultados)
+
+
+if __name__ == "__main__":
+    args = parser.parse_args()
+    os.environ["DATABASE_URL"] = args.database_url
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+    main(args)
@@ -0,0 +1,81 @@
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+
+from benchmarks.common import print_table, summarize, write_results
+
+parser = argparse.ArgumentParser(description="Mede o tempo de partida do app: importação, lifespan e primeira requisição")
+parser.add_argument("--runs", type=int, default=10, help="processos iniciados por cenário")
+parser.add_argument("--database-url", default=os.getenv("BENCH_DATABASE_URL", "sqlite:///./benchmark_startup.db"))
+parser.add_argument("--output", default="bench_startup.json")
+parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+
+ETAPAS = ("import", "lifespan", "first_request", "total")
+
+
+async def child():
+    inicio = time.perf_counter()
+    import httpx
+    from main import app
+    importado = time.perf_counter()
+
+    async with app.router.lifespan_context(app):
+        iniciado = time.perf_counter()
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            response = await client.get("/")
+            response.raise_for_status()
+        respondido = time.perf_counter()
+
+    print(json.dumps({
+        "import": importado - inicio,
+        "lifespan": iniciado - importado,
+        "first_request": respondido - iniciado,
+        "total": respondido - inicio,
+    }))
+
+
+def run_child(env: dict) -> dict:
+    saida = subprocess.run([sys.executable, "-m", "benchmarks.bench_startup", "--child"], env=env, capture_output=True, text=True, check=True)
+    return json.loads(saida.stdout.strip().splitlines()[-1])
+
+
+def remove_sqlite_file(url: str):
+    if url.startswith("sqlite:///"):
+        caminho = url[len("sqlite:///"):]
+        for sufixo in ("", "-wal", "-shm"):
+            if os.path.exists(caminho + sufixo):
+                os.remove(caminho + sufixo)
+
+
+def main(args):
+    env = {**os.environ, "DATABASE_URL": args.database_url, "LOG_LEVEL": "WARNING"}
+    resultados = {}
+    for cenario in ("fresh", "warm"):
+        amostras = {etapa: [] for etapa in ETAPAS}
+        inicio = time.perf_counter()
+        for _ in range(args.runs):
+            if cenario == "fresh":
+                remove_sqlite_file(args.database_url)
+            for etapa, valor in run_child(env).items():
+                amostras[etapa].append(valor)
+        elapsed = time.perf_counter() - inicio
+        for etapa in ETAPAS:
+            resultados[f"{cenario}_{etapa}"] = summarize(amostras[etapa], elapsed)
+            print(f"{cenario}_{etapa}: p50 {resultados[f'{cenario}_{etapa}']['p50_ms']} ms")
+
+    print_table(resultados)
+    params = {"runs": args.runs, "async_db": os.getenv("ASYNC_DB", "false"), "bootstrap": os.getenv("DB_BOOTSTRAP_ON_STARTUP", "true")}
+    write_results(args.output, "startup", params, resultados)
+
+
+if __name__ == "__main__":
+    args = parser.parse_args()
+    if args.child:
+        asyncio.run(child())
+    else:
+        main(args)
@@ -0,0 +1,87 @@
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import time
+
+from benchmarks.common import print_table, write_results
+
+PREFIX = "/api/v1/endpoints"
+
+parser = argparse.ArgumentParser(description="Mede a escala de throughput do gunicorn de 1 a N workers")
+parser.add_argument("--workers", default=f"1,{os.cpu_count()}", help="quantidades de workers separadas por vírgula")
+parser.add_argument("--users", type=int, default=10000, help="quantidade de usuários semeados no banco")
+parser.add_argument("--requests", type=int, default=2000, help="requisições por cenário")
+parser.add_argument("--concurrency", type=int, default=64)
+parser.add_argument("--page-size", type=int, default=50)
+parser.add_argument("--port", type=int, default=8765)
+parser.add_argument("--shared-state", default="shm", help="SHARED_STATE_BACKEND usado pelos workers")
+parser.add_argument("--database-url", default=os.getenv("BENCH_DATABASE_URL", "sqlite:///./benchmark.db"))
+parser.add_argument("--output", default="bench_workers.json")
+
+
+async def wait_ready(client, timeout: float = 60):
+    limite = time.monotonic() + timeout
+    while time.monotonic() < limite:
+        try:
+            if (await client.get("/")).status_code == 200:
+                return
+        except Exception:
+            pass
+        await asyncio.sleep(0.2)
+    raise RuntimeError("gunicorn não respondeu a tempo")
+
+
+async def measure(args, workers: int, token: str) -> dict:
+    import httpx
+    from benchmarks.bench_api import run_scenario
+
+    env = {**os.environ, "DATABASE_URL": args.database_url, "SHARED_STATE_BACKEND": args.shared_state, "LOG_LEVEL": "WARNING", "WEB_CONCURRENCY": str(workers)}
+    processo = subprocess.Popen([sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "--bind", f"127.0.0.1:{args.port}", "main:app"], env=env)
+    headers = {"Authorization": f"Bearer {token}"}
+    cenarios = {
+        "protected_route": lambda i: ("GET", f"{PREFIX}/auth/protected-route", {"headers": headers}),
+        "users_list": lambda i: ("GET", f"{PREFIX}/users/", {"headers": headers, "params": {"limit": args.page_size}}),
+    }
+    resultados = {}
+    try:
+        limits = httpx.Limits(max_connections=args.concurrency)
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{args.port}", timeout=60, limits=limits) as client:
+            await wait_ready(client)
+            for nome, factory in cenarios.items():
+                await run_scenario(client, min(args.requests, 200), args.concurrency, factory)
+                resultados[f"{nome}_w{workers}"] = await run_scenario(client, args.requests, args.concurrency, factory)
+                print(f"{nome} com {workers} workers: {resultados[f'{nome}_w{workers}']['throughput_rps']} req/s")
+    finally:
+        processo.terminate()
+        processo.wait(timeout=60)
+    return resultados
+
+
+async def main(args):
+    from benchmarks.bench_api import seed
+    from core.security import create_token_access
+
+    seed(args.users)
+    token = create_token_access({"sub": "admin@admin.com"})
+
+    resultados = {}
+    for workers in [int(valor) for valor in args.workers.split(",")]:
+        resultados.update(await measure(args, workers, token))
+
+    print_table(resultados)
+    base = {nome.rsplit("_w", 1)[0]: r["throughput_rps"] for nome, r in resultados.items() if nome.endswith("_w1")}
+    for nome, r in resultados.items():
+        cenario = nome.rsplit("_w", 1)[0]
+        if base.get(cenario):
+            print(f"{nome}: {r['throughput_rps'] / base[cenario]:.2f}x em relação a 1 worker")
+    params = {"users": args.users, "concurrency": args.concurrency, "workers": args.workers, "shared_state": args.shared_state}
+    write_results(args.output, "workers", params, resultados)
+
+
+if __name__ == "__main__":
+    args = parser.parse_args()
+    os.environ["DATABASE_URL"] = args.database_url
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+    asyncio.run(main(args))
@@ -0,0 +1,70 @@
+import json
+import os
+import platform
+import statistics
+import subprocess
+import time
+from datetime import datetime, timezone
+
+
+def percentile(amostras: list, p: float) -> float:
+    if not amostras:
+        return 0.0
+    ordenadas = sorted(amostras)
+    indice = (len(ordenadas) - 1) * p / 100
+    inferior = int(indice)
+    superior = min(inferior + 1, len(ordenadas) - 1)
+    return ordenadas[inferior] + (ordenadas[superior] - ordenadas[inferior]) * (indice - inferior)
+
+
+def summarize(latencias: list, elapsed: float, errors: int = 0) -> dict:
+    ms = [valor * 1000 for valor in latencias]
+    return {
+        "requests": len(latencias),
+        "errors": errors,
+        "throughput_rps": round(len(latencias) / elapsed, 2) if elapsed > 0 else 0.0,
+        "mean_ms": round(statistics.fmean(ms), 3) if ms else 0.0,
+        "p50_ms": round(percentile(ms, 50), 3),
+        "p95_ms": round(percentile(ms, 95), 3),
+        "p99_ms": round(percentile(ms, 99), 3),
+    }
+
+
+def time_calls(func, iterations: int) -> dict:
+    latencias = []
+    inicio = time.perf_counter()
+    for _ in range(iterations):
+        t0 = time.perf_counter()
+        func()
+        latencias.append(time.perf_counter() - t0)
+    return summarize(latencias, time.perf_counter() - inicio)
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "desconhecido"
+
+
+def write_results(path: str, suite: str, params: dict, results: dict):
+    dados = {
+        "suite": suite,
+        "meta": {
+            "commit": _git_commit(),
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "cpus": os.cpu_count(),
+            **params,
+        },
+        "results": results,
+    }
+    with open(path, "w", encoding="utf-8") as arquivo:
+        json.dump(dados, arquivo, indent=2, ensure_ascii=False)
+    print(f"Resultados salvos em {path}")
+
+
+def print_table(results: dict):
+    print(f"{'cenário':<28}{'req':>8}{'erros':>7}{'rps':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for nome, r in results.items():
+        print(f"{nome:<28}{r['requests']:>8}{r['errors']:>7}{r['throughput_rps']:>10}{r['p50_ms']:>10}{r['p95_ms']:>10}{r['p99_ms']:>10}")
@@ -0,0 +1,46 @@
+import argparse
+import json
+import sys
+
+parser = argparse.ArgumentParser(description="Compara dois resultados de benchmark e aponta regressões")
+parser.add_argument("baseline")
+parser.add_argument("candidate")
+parser.add_argument("--threshold", type=float, default=10.0, help="regressão máxima aceita, em %%")
+parser.add_argument("--metric", action="append", default=None, help="métricas comparadas (padrão: p50_ms, p95_ms, p99_ms, throughput_rps)")
+
+HIGHER_IS_BETTER = {"throughput_rps"}
+
+
+def compare(baseline: dict, candidate: dict, threshold: float, metrics: list) -> list:
+    regressoes = []
+    for cenario, base in baseline["results"].items():
+        atual = candidate["results"].get(cenario)
+        if atual is None:
+            continue
+        for metrica in metrics:
+            antes, depois = base.get(metrica), atual.get(metrica)
+            if not antes or depois is None:
+                continue
+            variacao = (depois - antes) / antes * 100
+            if metrica in HIGHER_IS_BETTER:
+                variacao = -variacao
+            marcador = "REGRESSÃO" if variacao > threshold else ""
+            print(f"{cenario:<28}{metrica:<16}{antes:>12}{depois:>12}{variacao:>+10.1f}%  {marcador}")
+            if marcador:
+                regressoes.append((cenario, metrica, variacao))
+    return regressoes
+
+
+if __name__ == "__main__":
+    args = parser.parse_args()
+    with open(args.baseline, encoding="utf-8") as arquivo:
+        baseline = json.load(arquivo)
+    with open(args.candidate, encoding="utf-8") as arquivo:
+        candidate = json.load(arquivo)
+
+    print(f"baseline {baseline['meta'].get('commit')} x candidato {candidate['meta'].get('commit')} (limite {args.threshold}%)")
+    regressoes = compare(baseline, candidate, args.threshold, args.metric or ["p50_ms", "p95_ms", "p99_ms", "throughput_rps"])
+    if regressoes:
+        print(f"{len(regressoes)} regressão(ões) acima de {args.threshold}%")
+        sys.exit(1)
+    print("Nenhuma regressão acima do limite")
@@ -0,0 +1,181 @@
+import asyncio
+import atexit
+import json
+import threading
+from collections import deque
+from datetime import datetime
+from typing import Optional
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import insert
+from sqlalchemy.exc import SQLAlchemyError
+from models.audit_event import AuditEvent
+from core.database import SessionLocal
+from core.config import (
+    AUDIT_ENABLED, AUDIT_BUFFER_SIZE, AUDIT_FLUSH_BATCH_SIZE,
+    AUDIT_FLUSH_INTERVAL_SECONDS, AUDIT_OVERFLOW_POLICY,
+)
+from core.metrics import register_gauges
+from utils.logger import logger, get_log_context
+
+
+class AuditWriter:
+    def __init__(self, session_factory, enabled: bool = True, buffer_size: int = 10000, batch_size: int = 500,
+                 interval: float = 1.0, overflow_policy: str = "flush"):
+        self.session_factory = session_factory
+        self.enabled = enabled
+        self.buffer_size = buffer_size
+        self.batch_size = batch_size
+        self.interval = interval
+        self.overflow_policy = overflow_policy
+        self._buffer = deque()
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._loop = None
+        self._wakeup = None
+        self._task = None
+        self.counters = {"recorded": 0, "written": 0, "dropped": 0, "inline_flushes": 0, "failed_flushes": 0}
+
+    def _event(self, action: str, target_id: Optional[int], actor_id: Optional[int], details: Optional[dict]) -> dict:
+        return {
+            "created_at": datetime.utcnow(),
+            "action": action,
+            "actor_id": actor_id,
+            "target_id": target_id,
+            "request_id": get_log_context().get("request_id"),
+            "details": json.dumps(details, ensure_ascii=False) if details else None,
+        }
+
+    def _overflow(self) -> Optional[str]:
+        with self._lock:
+            if len(self._buffer) < self.buffer_size:
+                return None
+            if self.overflow_policy == "drop":
+                self.counters["dropped"] += 1
+                return "drop"
+            self.counters["inline_flushes"] += 1
+            return "flush"
+
+    def _append(self, evento: dict):
+        with self._lock:
+            self._buffer.append(evento)
+            self.counters["recorded"] += 1
+            pendentes = len(self._buffer)
+
+        if pendentes >= self.batch_size and self._loop is not None:
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+
+    def record(self, action: str, target_id: Optional[int] = None, actor_id: Optional[int] = None, details: Optional[dict] = None):
+        if not self.enabled:
+            return
+
+        evento = self._event(action, target_id, actor_id, details)
+        politica = self._overflow()
+        if politica == "drop":
+            return
+        if politica == "flush":
+            self.flush()
+        self._append(evento)
+
+    async def record_async(self, action: str, target_id: Optional[int] = None, actor_id: Optional[int] = None, details: Optional[dict] = None):
+        if not self.enabled:
+            return
+
+        evento = self._event(action, target_id, actor_id, details)
+        politica = self._overflow()
+        if politica == "drop":
+            return
+        if politica == "flush":
+            await run_in_threadpool(self.flush)
+        self._append(evento)
+
+    def _take_batch(self) -> list:
+        with self._lock:
+            quantidade = min(self.batch_size, len(self._buffer))
+            return [self._buffer.popleft() for _ in range(quantidade)]
+
+    def flush(self) -> int:
+        with self._flush_lock:
+            lote = self._take_batch()
+            if not lote:
+                return 0
+
+            db = self.session_factory()
+            try:
+                db.execute(insert(AuditEvent), lote)
+                db.commit()
+            except SQLAlchemyError as e:
+                db.rollback()
+                with self._lock:
+                    self.counters["failed_flushes"] += 1
+                    espaco = self.buffer_size - len(self._buffer)
+                    self._buffer.extendleft(reversed(lote[:espaco]))
+                    self.counters["dropped"] += len(lote) - min(len(lote), espaco)
+                logger.error("Erro ao gravar eventos de auditoria: %s", e)
+                return 0
+            finally:
+                db.close()
+
+            with self._lock:
+                self.counters["written"] += len(lote)
+            return len(lote)
+
+    def flush_all(self) -> int:
+        total = 0
+        while True:
+            gravados = self.flush()
+            if not gravados:
+                return total
+            total += gravados
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                await run_in_threadpool(self.flush_all)
+            except Exception as e:
+                logger.error("Erro na gravação periódica de auditoria: %s", str(e))
+
+    def start(self):
+        if not self.enabled or self._task is not None:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+            self._loop = None
+        await run_in_threadpool(self.flush_all)
+
+    def stats(self) -> dict:
+        with self._lock:
+            estatisticas = dict(self.counters)
+            estatisticas["buffered"] = len(self._buffer)
+        return estatisticas
+
+
+def changed_fields(payload) -> list:
+    return sorted(payload.model_dump(exclude_none=True))
+
+
+audit_writer = AuditWriter(
+    SessionLocal,
+    enabled=AUDIT_ENABLED,
+    buffer_size=AUDIT_BUFFER_SIZE,
+    batch_size=AUDIT_FLUSH_BATCH_SIZE,
+    interval=AUDIT_FLUSH_INTERVAL_SECONDS,
+    overflow_policy=AUDIT_OVERFLOW_POLICY,
+)
+
+register_gauges("audit", audit_writer.stats)
+atexit.register(audit_writer.flush_all)
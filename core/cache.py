@@ -0,0 +1,114 @@
+import threading
+import time
+from collections import OrderedDict
+from core.config import PRINCIPAL_CACHE_TTL_SECONDS, PRINCIPAL_CACHE_MAX_SIZE, LIST_CACHE_TTL_SECONDS, LIST_CACHE_MAX_SIZE
+from core.metrics import register_gauges
+from core.shared_state import SharedState, shared_state
+
+
+class TTLCache:
+    def __init__(self, max_size: int, ttl: float, name: str = None, shared: SharedState = None):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.generation = 0
+        self.name = name
+        self.shared = shared if shared is not None and shared.distributed else None
+        self.remote_invalidations = 0
+        self._shared_seen = self.shared.get(f"cache:{name}") if self.shared is not None else 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_size > 0 and self.ttl > 0
+
+    def get(self, key):
+        if not self.enabled:
+            return None
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                self.misses += 1
+                return None
+            value, expira = item
+            if expira <= time.monotonic():
+                del self._data[key]
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value, generation=None):
+        if not self.enabled:
+            return
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return
+            self._data[key] = (value, time.monotonic() + self.ttl)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+        self._publish()
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.generation += 1
+        self._publish()
+
+    def _drop_remote(self, seen: int):
+        self._data.clear()
+        self.generation += 1
+        self.remote_invalidations += 1
+        self._shared_seen = seen
+
+    def _publish(self):
+        if self.shared is None:
+            return
+        novo = self.shared.incr(f"cache:{self.name}")
+        with self._lock:
+            if novo != self._shared_seen + 1:
+                self._drop_remote(novo)
+            self._shared_seen = novo
+
+    def sync(self):
+        if self.shared is None:
+            return
+        atual = self.shared.get(f"cache:{self.name}")
+        with self._lock:
+            if atual != self._shared_seen:
+                self._drop_remote(atual)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "size": len(self._data),
+                "max_size": self.max_size,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "remote_invalidations": self.remote_invalidations,
+            }
+
+
+principal_cache = TTLCache(PRINCIPAL_CACHE_MAX_SIZE, PRINCIPAL_CACHE_TTL_SECONDS, "principal", shared_state)
+list_cache = TTLCache(LIST_CACHE_MAX_SIZE, LIST_CACHE_TTL_SECONDS, "list", shared_state)
+
+
+def invalidate_user(email: str):
+    principal_cache.invalidate(email)
+    list_cache.clear()
+
+
+register_gauges("principal_cache", principal_cache.stats)
+register_gauges("list_cache", list_cache.stats)
@@ -1,15 +1,355 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
-from core.config import DATABASE_URL
+import hashlib
+import itertools
+import threading
+import time
+from contextvars import ContextVar
+from fastapi import Request
+from sqlalchemy import create_engine, event, inspect, insert, select, text, func, Delete, Insert, Update
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool
+from sqlalchemy.exc import OperationalError, SQLAlchemyError, TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+from core.config import (
+    DATABASE_URL, ASYNC_DB, FULLTEXT_SEARCH, SESSION_EXPIRE_ON_COMMIT,
+    DATABASE_REPLICA_URLS, READ_YOUR_WRITES_SECONDS,
+    DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_RECYCLE, DB_POOL_TIMEOUT, DB_POOL_PRE_PING, DB_ECHO,
+    SQLITE_JOURNAL_MODE, SQLITE_SYNCHRONOUS, SQLITE_BUSY_TIMEOUT_MS, SQLITE_MMAP_SIZE, SQLITE_CACHE_SIZE,
+)
 
 from models.user import Base
+from models.refresh_token import RefreshToken  # noqa: F401
+from models.audit_event import AuditEvent  # noqa: F401
+from models.user_change import UserChange, ChangeConsumer  # noqa: F401
+from models.schema_version import SchemaVersion
+from core.metrics import instrument_engine, register_gauges
+from core.cache import TTLCache
 
-engine = create_engine(DATABASE_URL)
+SCHEMA_VERSION = 3
+STICKY_MAX_KEYS = 100000
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+_pool_metrics_lock = threading.Lock()
+
+pool_metrics = {
+    "checkouts": 0,
+    "timeouts": 0,
+    "wait_seconds_total": 0.0,
+    "wait_seconds_max": 0.0,
+}
+
+
+class _TimedPoolMixin:
+    def _do_get(self):
+        inicio = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            with _pool_metrics_lock:
+                pool_metrics["timeouts"] += 1
+            raise
+        finally:
+            espera = time.perf_counter() - inicio
+            with _pool_metrics_lock:
+                pool_metrics["checkouts"] += 1
+                pool_metrics["wait_seconds_total"] += espera
+                pool_metrics["wait_seconds_max"] = max(pool_metrics["wait_seconds_max"], espera)
+
+
+class TimedQueuePool(_TimedPoolMixin, QueuePool):
+    pass
+
+
+class TimedAsyncQueuePool(_TimedPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def _is_sqlite_memory(url: str) -> bool:
+    database = make_url(url).database
+    return not database or database == ":memory:" or "mode=memory" in url
+
+
+def _apply_sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    cursor.execute(f"PRAGMA busy_timeout = {SQLITE_BUSY_TIMEOUT_MS}")
+    cursor.execute(f"PRAGMA journal_mode = {SQLITE_JOURNAL_MODE}")
+    cursor.execute(f"PRAGMA synchronous = {SQLITE_SYNCHRONOUS}")
+    cursor.execute(f"PRAGMA mmap_size = {SQLITE_MMAP_SIZE}")
+    cursor.execute(f"PRAGMA cache_size = {SQLITE_CACHE_SIZE}")
+    cursor.close()
+
+
+def _engine_options(url: str, async_mode: bool = False) -> dict:
+    options = {"echo": DB_ECHO, "pool_pre_ping": DB_POOL_PRE_PING}
+
+    if url.startswith("sqlite"):
+        options["connect_args"] = {"check_same_thread": False, "timeout": SQLITE_BUSY_TIMEOUT_MS / 1000}
+        if _is_sqlite_memory(url):
+            return options
+
+    options.update({
+        "poolclass": TimedAsyncQueuePool if async_mode else TimedQueuePool,
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_timeout": DB_POOL_TIMEOUT,
+    })
+    return options
+
+
+def create_db_engine(url: str = DATABASE_URL):
+    db_engine = create_engine(url, **_engine_options(url))
+    if url.startswith("sqlite"):
+        event.listen(db_engine, "connect", _apply_sqlite_pragmas)
+    return db_engine
+
+
+def to_async_url(url: str) -> str:
+    if url.startswith("sqlite:"):
+        return url.replace("sqlite:", "sqlite+aiosqlite:", 1)
+    if url.startswith("postgresql:") or url.startswith("postgres:"):
+        return "postgresql+asyncpg:" + url.split(":", 1)[1]
+    if url.startswith("postgresql+psycopg2:"):
+        return url.replace("postgresql+psycopg2:", "postgresql+asyncpg:", 1)
+    return url
+
+
+def create_async_db_engine(url: str = DATABASE_URL):
+    async_url = to_async_url(url)
+    db_engine = create_async_engine(async_url, **_engine_options(url, async_mode=True))
+    if url.startswith("sqlite"):
+        event.listen(db_engine.sync_engine, "connect", _apply_sqlite_pragmas)
+    return db_engine
+
+
+def get_pool_stats() -> dict:
+    stats = {}
+    for nome, db_engine in (("sync", engine), ("async", async_engine.sync_engine if async_engine else None)):
+        if db_engine is None:
+            continue
+        pool = db_engine.pool
+        if isinstance(pool, QueuePool):
+            stats[nome] = {
+                "size": pool.size(),
+                "checked_in": pool.checkedin(),
+                "checked_out": pool.checkedout(),
+                "overflow": max(pool.overflow(), 0),
+            }
+        else:
+            stats[nome] = {"status": pool.status()}
+    with _pool_metrics_lock:
+        stats["wait"] = dict(pool_metrics)
+    return stats
+
+
+_read_only: ContextVar[bool] = ContextVar("db_read_only", default=False)
+
+
+class ReplicaSet:
+    def __init__(self, engines: list, async_engines: list = None):
+        self.engines = engines
+        self.async_engines = async_engines or []
+        self.healthy = [True] * len(engines)
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+        self.routed = [0] * len(engines)
+        self.fallbacks = 0
+        for indice, db_engine in enumerate(engines):
+            self._watch(indice, db_engine)
+        for indice, db_engine in enumerate(self.async_engines):
+            self._watch(indice, db_engine.sync_engine)
+
+    def _watch(self, indice: int, db_engine):
+        def on_error(context):
+            if context.is_disconnect or isinstance(context.sqlalchemy_exception, OperationalError):
+                self.mark(indice, False)
+        event.listen(db_engine, "handle_error", on_error)
+
+    def mark(self, indice: int, saudavel: bool):
+        with self._lock:
+            self.healthy[indice] = saudavel
+
+    def choose(self, async_mode: bool = False):
+        saudaveis = [indice for indice, ok in enumerate(self.healthy) if ok]
+        with self._lock:
+            if not saudaveis:
+                self.fallbacks += 1
+                return None
+            indice = saudaveis[next(self._counter) % len(saudaveis)]
+            self.routed[indice] += 1
+        return self.async_engines[indice].sync_engine if async_mode else self.engines[indice]
+
+    def check(self):
+        for indice, db_engine in enumerate(self.engines):
+            try:
+                with db_engine.connect() as conn:
+                    conn.execute(text("SELECT 1"))
+                self.mark(indice, True)
+            except SQLAlchemyError:
+                self.mark(indice, False)
+
+    def stats(self) -> dict:
+        with self._lock:
+            estatisticas = {"fallbacks": self.fallbacks}
+            for indice, (ok, total) in enumerate(zip(self.healthy, self.routed)):
+                estatisticas[f"r{indice}"] = {"healthy": int(ok), "routed": total}
+        return estatisticas
+
+
+class RoutingSession(Session):
+    def __init__(self, *args, replicas: ReplicaSet = None, async_mode: bool = False, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.replicas = replicas
+        self.async_mode = async_mode
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        if (
+            self.replicas is None
+            or not self.replicas.engines
+            or not _read_only.get()
+            or self._flushing
+            or self.info.get("primary")
+            or isinstance(clause, (Insert, Update, Delete))
+            or getattr(clause, "_for_update_arg", None) is not None
+        ):
+            return super().get_bind(mapper=mapper, clause=clause, **kwargs)
+        replica = self.replicas.choose(self.async_mode)
+        if replica is None:
+            return super().get_bind(mapper=mapper, clause=clause, **kwargs)
+        return replica
+
+
+def use_primary(db) -> bool:
+    roteado = bool(replicas.engines) and _read_only.get() and not db.info.get("primary")
+    db.info["primary"] = True
+    return roteado
+
+
+engine = create_db_engine()
+
+async_engine = create_async_db_engine() if ASYNC_DB else None
+
+replicas = ReplicaSet(
+    [create_db_engine(url) for url in DATABASE_REPLICA_URLS],
+    [create_async_db_engine(url) for url in DATABASE_REPLICA_URLS] if ASYNC_DB else None,
+)
+
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine, class_=RoutingSession, replicas=replicas, expire_on_commit=SESSION_EXPIRE_ON_COMMIT)
+
+AsyncSessionLocal = async_sessionmaker(bind=async_engine, class_=AsyncSession, sync_session_class=RoutingSession, replicas=replicas, async_mode=True, autoflush=False, expire_on_commit=False) if ASYNC_DB else None
+
+instrument_engine(engine)
+if async_engine is not None:
+    instrument_engine(async_engine.sync_engine)
+for replica_engine in replicas.engines:
+    instrument_engine(replica_engine)
+for replica_engine in replicas.async_engines:
+    instrument_engine(replica_engine.sync_engine)
+
+register_gauges("db_pool", get_pool_stats)
+if replicas.engines:
+    register_gauges("db_replicas", replicas.stats)
+
+_recent_writers = TTLCache(STICKY_MAX_KEYS, READ_YOUR_WRITES_SECONDS)
+
+
+def _writer_key(request: Request):
+    credencial = request.headers.get("authorization")
+    if not credencial:
+        return None
+    return hashlib.blake2b(credencial.encode(), digest_size=16).hexdigest()
+
+
+async def read_routing_middleware(request: Request, call_next):
+    if not replicas.engines:
+        return await call_next(request)
+
+    chave = _writer_key(request)
+    leitura = request.method in ("GET", "HEAD") and (chave is None or _recent_writers.get(chave) is None)
+    token = _read_only.set(leitura)
+    try:
+        response = await call_next(request)
+    finally:
+        _read_only.reset(token)
+
+    if not leitura and chave is not None and request.method not in ("GET", "HEAD") and response.status_code < 400:
+        _recent_writers.set(chave, True)
+    return response
+
+SQLITE_FTS_STATEMENTS = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS users_fts USING fts5(name, content='users', content_rowid='id', tokenize='trigram')",
+    "CREATE TRIGGER IF NOT EXISTS users_fts_ai AFTER INSERT ON users BEGIN "
+    "INSERT INTO users_fts(rowid, name) VALUES (new.id, new.name); END",
+    "CREATE TRIGGER IF NOT EXISTS users_fts_ad AFTER DELETE ON users BEGIN "
+    "INSERT INTO users_fts(users_fts, rowid, name) VALUES ('delete', old.id, old.name); END",
+    "CREATE TRIGGER IF NOT EXISTS users_fts_au AFTER UPDATE OF name ON users BEGIN "
+    "INSERT INTO users_fts(users_fts, rowid, name) VALUES ('delete', old.id, old.name); "
+    "INSERT INTO users_fts(rowid, name) VALUES (new.id, new.name); END",
+]
+
+POSTGRES_TRGM_STATEMENTS = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX IF NOT EXISTS ix_users_name_trgm ON users USING gin (name gin_trgm_ops)",
+]
+
+def create_search_index(bind=engine):
+    with bind.begin() as conn:
+        if bind.dialect.name == "sqlite":
+            existe = conn.execute(text("SELECT 1 FROM sqlite_master WHERE name = 'users_fts'")).first()
+            for statement in SQLITE_FTS_STATEMENTS:
+                conn.execute(text(statement))
+            if not existe:
+                conn.execute(text("INSERT INTO users_fts(users_fts) VALUES ('rebuild')"))
+        elif bind.dialect.name == "postgresql":
+            for statement in POSTGRES_TRGM_STATEMENTS:
+                conn.execute(text(statement))
+
+def add_missing_columns(bind=engine):
+    inspector = inspect(bind)
+    with bind.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            existentes = {coluna["name"] for coluna in inspector.get_columns(table.name)}
+            for coluna in table.columns:
+                if coluna.name in existentes:
+                    continue
+                tipo = coluna.type.compile(dialect=bind.dialect)
+                default = f" DEFAULT {coluna.server_default.arg}" if coluna.server_default is not None else ""
+                nulo = " NOT NULL" if not coluna.nullable and default else ""
+                conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {coluna.name} {tipo}{default}{nulo}"))
+
+def add_missing_indexes(bind=engine):
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=bind, checkfirst=True)
 
 def create_tables():
     Base.metadata.create_all(bind=engine)
+    add_missing_columns()
+    add_missing_indexes()
+    if FULLTEXT_SEARCH:
+        create_search_index()
+
+def get_schema_version(bind=engine):
+    try:
+        with bind.connect() as conn:
+            return conn.execute(select(func.max(SchemaVersion.version))).scalar()
+    except SQLAlchemyError:
+        return None
+
+def mark_schema_version(bind=engine, version: int = SCHEMA_VERSION):
+    with bind.begin() as conn:
+        if conn.execute(select(SchemaVersion.version).where(SchemaVersion.version == version)).first() is None:
+            conn.execute(insert(SchemaVersion).values(version=version))
+
+async def dispose_engines():
+    engine.dispose()
+    if async_engine is not None:
+        await async_engine.dispose()
+    for replica_engine in replicas.engines:
+        replica_engine.dispose()
+    for replica_engine in replicas.async_engines:
+        await replica_engine.dispose()
 
 def get_db():
     db = SessionLocal()
@@ -17,4 +357,7 @@ def get_db():
         yield db
     finally:
         db.close()
-    
\ No newline at end of file
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
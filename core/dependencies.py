@@ -1,10 +1,15 @@
 from fastapi import Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from core.database import get_db
-from core.security import get_current_user
+from core.security import get_current_user, get_current_user_async
 from models.user import User
 
 def is_admin(current_user: User = Depends(get_current_user)):
     if current_user.role != "admin":
         raise HTTPException(status_code=403, detail="Acesso permitido apenas para administradores.")
-    return current_user
\ No newline at end of file
+    return current_user
+
+def is_admin_async(current_user: User = Depends(get_current_user_async)):
+    if current_user.role != "admin":
+        raise HTTPException(status_code=403, detail="Acesso permitido apenas para administradores.")
+    return current_user
@@ -0,0 +1,194 @@
+import hashlib
+import math
+import threading
+import time
+from datetime import datetime, timedelta
+from sqlalchemy import func, or_, select
+from sqlalchemy.orm import Session
+from models.user import User
+from core.cache import TTLCache
+from core.config import EMAIL_FILTER_ENABLED, EMAIL_FILTER_CAPACITY, EMAIL_FILTER_ERROR_RATE, NEGATIVE_CACHE_TTL_SECONDS, NEGATIVE_CACHE_MAX_SIZE
+from core.metrics import register_gauges
+from utils.logger import logger
+
+BUILD_BATCH_SIZE = 5000
+TOP_UP_OVERLAP = timedelta(minutes=1)
+
+
+class BloomFilter:
+    def __init__(self, capacity: int, error_rate: float):
+        self.capacity = max(capacity, 1)
+        self.error_rate = error_rate
+        self.size = max(8, math.ceil(-self.capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / self.capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, item: str):
+        digest = hashlib.blake2b(item.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hashes)]
+
+    def add(self, item: str):
+        for pos in self._positions(item):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    def __contains__(self, item: str) -> bool:
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(item))
+
+    def false_positive_rate(self) -> float:
+        return (1 - math.exp(-self.hashes * self.count / self.size)) ** self.hashes
+
+    @property
+    def saturated(self) -> bool:
+        return self.count > self.capacity
+
+
+class EmailFilter:
+    def __init__(self, enabled: bool, capacity: int, error_rate: float, negative_cache: TTLCache):
+        self.enabled = enabled
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.negative_cache = negative_cache
+        self.bloom = None
+        self._lock = threading.Lock()
+        self._pending = None
+        self.filtered = 0
+        self.negative_hits = 0
+        self.false_positives = 0
+        self.rebuilds = 0
+        self.topped_up = 0
+        self.last_build = 0.0
+        self._max_id = 0
+        self._since = None
+
+    @property
+    def ready(self) -> bool:
+        return self.bloom is not None
+
+    @property
+    def generation(self) -> int:
+        return self.negative_cache.generation
+
+    def build(self, db: Session):
+        if not self.enabled:
+            return
+        inicio = datetime.utcnow()
+        total, max_id = db.execute(select(func.count(User.id), func.max(User.id))).one()
+        bloom = BloomFilter(max(self.capacity, total * 2), self.error_rate)
+        with self._lock:
+            self._pending = []
+        for email in db.execute(select(User.email).execution_options(yield_per=BUILD_BATCH_SIZE)).scalars():
+            bloom.add(email)
+        with self._lock:
+            for email in self._pending:
+                bloom.add(email)
+            self._pending = None
+            self.bloom = bloom
+            self._max_id = max_id or 0
+            self._since = inicio - TOP_UP_OVERLAP
+            self.rebuilds += 1
+            self.last_build = time.time()
+        self.negative_cache.clear()
+        logger.info("Filtro de e-mails construído - %s registros, %s bytes", bloom.count, len(bloom.bits))
+
+    def sync(self, db: Session):
+        if not self.enabled:
+            return
+        if self.bloom is None or self.bloom.saturated:
+            self.build(db)
+            return
+        self.top_up(db)
+
+    def top_up(self, db: Session):
+        inicio = datetime.utcnow()
+        rows = db.execute(
+            select(User.id, User.email).where(or_(User.id > self._max_id, User.updated_at >= self._since))
+        ).all()
+        novos = 0
+        with self._lock:
+            for user_id, email in rows:
+                self._max_id = max(self._max_id, user_id)
+                if email not in self.bloom:
+                    self.bloom.add(email)
+                    novos += 1
+            self._since = inicio - TOP_UP_OVERLAP
+            self.topped_up += novos
+        if novos:
+            self.negative_cache.clear()
+
+    def reset(self):
+        with self._lock:
+            self.bloom = None
+            self._pending = None
+            self._max_id = 0
+            self._since = None
+        self.negative_cache.clear()
+
+    def add(self, *emails: str):
+        if not self.enabled or not emails:
+            return
+        with self._lock:
+            for email in emails:
+                if self.bloom is not None:
+                    self.bloom.add(email)
+                if self._pending is not None:
+                    self._pending.append(email)
+        self.negative_cache.clear()
+
+    def might_exist(self, email: str) -> bool:
+        return not self.ready or email in self.bloom
+
+    def definitely_absent(self, email: str) -> bool:
+        if not email or not self.ready:
+            return False
+        if email not in self.bloom:
+            with self._lock:
+                self.filtered += 1
+            return True
+        if self.negative_cache.get(email):
+            with self._lock:
+                self.negative_hits += 1
+            return True
+        return False
+
+    def remember_missing(self, email: str, generation: int):
+        if not email or not self.ready:
+            return
+        if email in self.bloom:
+            with self._lock:
+                self.false_positives += 1
+        self.negative_cache.set(email, True, generation)
+
+    def stats(self) -> dict:
+        bloom = self.bloom
+        estatisticas = {
+            "ready": int(self.ready),
+            "configured_capacity": self.capacity,
+            "configured_error_rate": self.error_rate,
+            "filtered": self.filtered,
+            "negative_hits": self.negative_hits,
+            "false_positives": self.false_positives,
+            "rebuilds": self.rebuilds,
+            "topped_up": self.topped_up,
+            "last_build": self.last_build,
+        }
+        if bloom is not None:
+            estatisticas.update({
+                "capacity": bloom.capacity,
+                "items": bloom.count,
+                "bits": bloom.size,
+                "hashes": bloom.hashes,
+                "memory_bytes": len(bloom.bits),
+                "estimated_false_positive_rate": bloom.false_positive_rate(),
+            })
+        return estatisticas
+
+
+negative_email_cache = TTLCache(NEGATIVE_CACHE_MAX_SIZE, NEGATIVE_CACHE_TTL_SECONDS, "negative_email")
+email_filter = EmailFilter(EMAIL_FILTER_ENABLED, EMAIL_FILTER_CAPACITY, EMAIL_FILTER_ERROR_RATE, negative_email_cache)
+
+register_gauges("email_filter", email_filter.stats)
+register_gauges("negative_email_cache", negative_email_cache.stats)
@@ -1,10 +1,258 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Optional, Tuple
+from fastapi import HTTPException
 from passlib.context import CryptContext
+from core.config import (
+    HASH_WORKERS, HASH_QUEUE_LIMIT, PASSWORD_HASH_SCHEME, BCRYPT_ROUNDS,
+    ARGON2_TIME_COST, ARGON2_MEMORY_COST, ARGON2_PARALLELISM,
+)
+from core.metrics import record_hash, register_gauges
+from utils.logger import logger
+
+HASH_SCHEMES = ("bcrypt", "argon2")
+BCRYPT_ROUNDS_RANGE = (10, 16)
+ARGON2_TIME_COST_RANGE = (2, 10)
+
+
+def default_hash_params() -> dict:
+    return {
+        "scheme": PASSWORD_HASH_SCHEME,
+        "bcrypt_rounds": BCRYPT_ROUNDS,
+        "argon2_time_cost": ARGON2_TIME_COST,
+        "argon2_memory_cost": ARGON2_MEMORY_COST,
+        "argon2_parallelism": ARGON2_PARALLELISM,
+    }
+
+
+def build_crypt_context(params: dict) -> CryptContext:
+    if params["scheme"] not in HASH_SCHEMES:
+        raise ValueError(f"Esquema de hash inválido: {params['scheme']}, use um de: {', '.join(HASH_SCHEMES)}")
+
+    schemes = [params["scheme"]] + [scheme for scheme in HASH_SCHEMES if scheme != params["scheme"]]
+    rounds = params["bcrypt_rounds"]
+    return CryptContext(
+        schemes=schemes,
+        deprecated="auto",
+        bcrypt__rounds=rounds,
+        bcrypt__min_rounds=rounds,
+        bcrypt__max_rounds=rounds,
+        argon2__time_cost=params["argon2_time_cost"],
+        argon2__memory_cost=params["argon2_memory_cost"],
+        argon2__parallelism=params["argon2_parallelism"],
+    )
+
+
+hash_params = default_hash_params()
+pwd_context = build_crypt_context(hash_params)
+
+_executor = None
+_executor_lock = threading.Lock()
+_pending = 0
+_metrics_lock = threading.Lock()
+
+hash_metrics = {
+    "submitted": 0,
+    "completed": 0,
+    "rejected": 0,
+    "pending": 0,
+    "queue_wait_seconds": 0.0,
+    "compute_seconds": 0.0,
+    "rehashed": 0,
+}
+
+
+def _hash_job(password: str):
+    inicio = time.perf_counter()
+    resultado = pwd_context.hash(password)
+    return resultado, time.perf_counter() - inicio
+
+
+def _verify_job(password_plain: str, password_hash: str):
+    inicio = time.perf_counter()
+    resultado = pwd_context.verify(password_plain, password_hash)
+    return resultado, time.perf_counter() - inicio
+
+
+def _verify_and_update_job(password_plain: str, password_hash: str):
+    inicio = time.perf_counter()
+    resultado = pwd_context.verify_and_update(password_plain, password_hash)
+    return resultado, time.perf_counter() - inicio
+
+
+def _init_worker(params: dict):
+    global hash_params, pwd_context
+    hash_params = params
+    pwd_context = build_crypt_context(params)
+
+
+def get_hash_executor() -> ProcessPoolExecutor:
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ProcessPoolExecutor(max_workers=HASH_WORKERS, initializer=_init_worker, initargs=(hash_params,))
+    return _executor
+
+
+def shutdown_hash_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=True, cancel_futures=True)
+            _executor = None
+
+
+def configure_hashing(params: dict):
+    global hash_params, pwd_context
+    pwd_context = build_crypt_context(params)
+    hash_params = dict(params)
+    shutdown_hash_executor()
+    logger.info("Parâmetros de hash de senha configurados: %s", hash_params)
+
+
+def needs_rehash(password_hash: str) -> bool:
+    return pwd_context.needs_update(password_hash)
+
+
+def _measure(params: dict) -> float:
+    context = build_crypt_context(params)
+    inicio = time.perf_counter()
+    context.hash("calibracao-de-custo")
+    return time.perf_counter() - inicio
+
+
+def calibrate_hash_params(target_ms: float, params: Optional[dict] = None) -> dict:
+    params = dict(params or hash_params)
+    if params["scheme"] == "bcrypt":
+        chave, (minimo, maximo) = "bcrypt_rounds", BCRYPT_ROUNDS_RANGE
+    else:
+        chave, (minimo, maximo) = "argon2_time_cost", ARGON2_TIME_COST_RANGE
+
+    alvo = target_ms / 1000
+    params[chave] = minimo
+    while params[chave] < maximo and _measure({**params, chave: params[chave] + 1}) <= alvo:
+        params[chave] += 1
+
+    logger.info("Calibração de hash concluída - %s=%s para alvo de %sms", chave, params[chave], target_ms)
+    return params
+
+
+def _record(elapsed: float, compute: float):
+    with _metrics_lock:
+        hash_metrics["completed"] += 1
+        hash_metrics["compute_seconds"] += compute
+        hash_metrics["queue_wait_seconds"] += max(elapsed - compute, 0.0)
+
+
+def _submit(job, *args) -> Future:
+    global _pending
+
+    if HASH_WORKERS <= 0:
+        future = Future()
+        inicio = time.perf_counter()
+        resultado, compute = job(*args)
+        _record(time.perf_counter() - inicio, compute)
+        future.set_result(resultado)
+        return future
+
+    with _metrics_lock:
+        if _pending >= HASH_QUEUE_LIMIT:
+            hash_metrics["rejected"] += 1
+            raise HTTPException(status_code=503, detail="Servidor ocupado, tente novamente em instantes")
+        _pending += 1
+        hash_metrics["submitted"] += 1
+        hash_metrics["pending"] = _pending
+
+    inicio = time.perf_counter()
+    resultado_future = Future()
+
+    def _done(job_future: Future):
+        global _pending
+        with _metrics_lock:
+            _pending -= 1
+            hash_metrics["pending"] = _pending
+        try:
+            resultado, compute = job_future.result()
+        except BaseException as e:
+            resultado_future.set_exception(e)
+            return
+        _record(time.perf_counter() - inicio, compute)
+        resultado_future.set_result(resultado)
+
+    try:
+        get_hash_executor().submit(job, *args).add_done_callback(_done)
+    except BaseException:
+        with _metrics_lock:
+            _pending -= 1
+            hash_metrics["pending"] = _pending
+        raise
+    return resultado_future
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 def create_hash(password: str) -> str:
-    return pwd_context.hash(password)
+    inicio = time.perf_counter()
+    try:
+        return _submit(_hash_job, password).result()
+    finally:
+        record_hash("hash", time.perf_counter() - inicio)
+
 
 def verify_password(password_plain: str, password_hash: str) -> bool:
-    return pwd_context.verify(password_plain, password_hash)
+    inicio = time.perf_counter()
+    try:
+        return _submit(_verify_job, password_plain, password_hash).result()
+    finally:
+        record_hash("verify", time.perf_counter() - inicio)
+
+
+async def create_hash_async(password: str) -> str:
+    inicio = time.perf_counter()
+    try:
+        return await asyncio.wrap_future(_submit(_hash_job, password))
+    finally:
+        record_hash("hash", time.perf_counter() - inicio)
+
+
+async def verify_password_async(password_plain: str, password_hash: str) -> bool:
+    inicio = time.perf_counter()
+    try:
+        return await asyncio.wrap_future(_submit(_verify_job, password_plain, password_hash))
+    finally:
+        record_hash("verify", time.perf_counter() - inicio)
+
+
+async def verify_and_update_async(password_plain: str, password_hash: str) -> Tuple[bool, Optional[str]]:
+    inicio = time.perf_counter()
+    try:
+        valido, novo_hash = await asyncio.wrap_future(_submit(_verify_and_update_job, password_plain, password_hash))
+    finally:
+        record_hash("verify", time.perf_counter() - inicio)
+    if novo_hash is not None:
+        with _metrics_lock:
+            hash_metrics["rehashed"] += 1
+    return valido, novo_hash
+
+
+def create_hash_many(passwords: list) -> list:
+    hashes = []
+    inicio = 0
+    while inicio < len(passwords):
+        with _metrics_lock:
+            janela = max(1, (HASH_QUEUE_LIMIT - _pending) // 2)
+        futures = [_submit(_hash_job, password) for password in passwords[inicio:inicio + janela]]
+        hashes.extend(future.result() for future in futures)
+        inicio += janela
+    return hashes
+
+
+def get_hash_metrics() -> dict:
+    with _metrics_lock:
+        metricas = dict(hash_metrics)
+    metricas["params"] = hash_params
+    return metricas
+
 
+register_gauges("password_hash", get_hash_metrics)
@@ -0,0 +1,82 @@
+import hashlib
+from typing import Awaitable, Callable, Optional
+import orjson
+from fastapi import Request, Response
+from core.cache import list_cache
+from schemas.user import UserResponse
+from services.user_queries import RESPONSE_COLUMNS
+
+CACHE_CONTROL = "private, no-cache"
+
+
+def user_etag(user) -> str:
+    version = getattr(user, "version", None)
+    if version is None:
+        campos = UserResponse.model_validate(user).model_dump_json().encode("utf-8")
+        return '"' + hashlib.blake2b(campos, digest_size=12).hexdigest() + '"'
+    return f'"u{user.id}-v{version}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidatos = (parte.strip() for parte in if_none_match.split(","))
+    return any(candidato.removeprefix("W/") == etag for candidato in candidatos)
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": CACHE_CONTROL})
+
+
+def json_response(body: bytes, etag: str) -> Response:
+    return Response(content=body, media_type="application/json", headers={"ETag": etag, "Cache-Control": CACHE_CONTROL})
+
+
+def user_response(request: Request, user) -> Response:
+    etag = user_etag(user)
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return not_modified(etag)
+    return json_response(UserResponse.model_validate(user).model_dump_json().encode("utf-8"), etag)
+
+
+def encode_page(page: dict) -> bytes:
+    items = [dict(zip(RESPONSE_COLUMNS, row)) for row in page["items"]]
+    return orjson.dumps({"items": items, "next_cursor": page["next_cursor"]})
+
+
+def _page_entry(page: dict) -> tuple:
+    body = encode_page(page)
+    return body, '"' + hashlib.blake2b(body, digest_size=12).hexdigest() + '"'
+
+
+def _page_response(request: Request, entry: tuple) -> Response:
+    body, etag = entry
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return not_modified(etag)
+    return json_response(body, etag)
+
+
+def page_response(request: Request, current_user, key: tuple, produce: Callable[[], dict]) -> Response:
+    if current_user.role != "admin":
+        return _page_response(request, _page_entry(produce()))
+
+    entry = list_cache.get(key)
+    if entry is None:
+        generation = list_cache.generation
+        entry = _page_entry(produce())
+        list_cache.set(key, entry, generation=generation)
+    return _page_response(request, entry)
+
+
+async def apage_response(request: Request, current_user, key: tuple, produce: Callable[[], Awaitable[dict]]) -> Response:
+    if current_user.role != "admin":
+        return _page_response(request, _page_entry(await produce()))
+
+    entry = list_cache.get(key)
+    if entry is None:
+        generation = list_cache.generation
+        entry = _page_entry(await produce())
+        list_cache.set(key, entry, generation=generation)
+    return _page_response(request, entry)
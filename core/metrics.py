@@ -0,0 +1,161 @@
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from fastapi import Request
+from sqlalchemy import event
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 25, 50, 100)
+
+
+class Histogram:
+    def __init__(self, name: str, description: str, label_names: tuple, buckets: tuple = LATENCY_BUCKETS):
+        self.name = name
+        self.description = description
+        self.label_names = label_names
+        self.buckets = buckets
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels):
+        with self._lock:
+            serie = self._series.get(labels)
+            if serie is None:
+                serie = self._series[labels] = {"counts": [0] * (len(self.buckets) + 1), "sum": 0.0, "count": 0}
+            serie["counts"][bisect_left(self.buckets, value)] += 1
+            serie["sum"] += value
+            serie["count"] += 1
+
+    def render(self) -> list:
+        linhas = [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = {labels: {"counts": list(s["counts"]), "sum": s["sum"], "count": s["count"]} for labels, s in self._series.items()}
+        for labels, serie in sorted(series.items()):
+            base = [f'{nome}="{valor}"' for nome, valor in zip(self.label_names, labels)]
+            acumulado = 0
+            for limite, quantidade in zip(self.buckets + (float("inf"),), serie["counts"]):
+                acumulado += quantidade
+                le = "+Inf" if limite == float("inf") else repr(limite)
+                rotulos = ",".join(base + [f'le="{le}"'])
+                linhas.append(f"{self.name}_bucket{{{rotulos}}} {acumulado}")
+            sufixo = "{" + ",".join(base) + "}" if base else ""
+            linhas.append(f"{self.name}_sum{sufixo} {serie['sum']}")
+            linhas.append(f"{self.name}_count{sufixo} {serie['count']}")
+        return linhas
+
+
+class RequestStats:
+    __slots__ = ("db_queries", "db_seconds", "hash_seconds", "jwt_seconds")
+
+    def __init__(self):
+        self.db_queries = 0
+        self.db_seconds = 0.0
+        self.hash_seconds = 0.0
+        self.jwt_seconds = 0.0
+
+
+_request_stats: ContextVar[RequestStats] = ContextVar("request_stats", default=None)
+
+http_request_duration = Histogram("app_http_request_duration_seconds", "Latência das requisições HTTP por rota", ("method", "route", "status"))
+db_queries_per_request = Histogram("app_db_queries_per_request", "Quantidade de consultas SQL por requisição", ("route",), COUNT_BUCKETS)
+db_time_per_request = Histogram("app_db_time_per_request_seconds", "Tempo total em consultas SQL por requisição", ("route",))
+hash_duration = Histogram("app_password_hash_duration_seconds", "Tempo gasto em hash/verificação de senha", ("operation",))
+jwt_decode_duration = Histogram("app_jwt_decode_duration_seconds", "Tempo gasto decodificando tokens JWT", ())
+
+_histograms = [http_request_duration, db_queries_per_request, db_time_per_request, hash_duration, jwt_decode_duration]
+_gauges = {}
+
+
+def register_gauges(prefix: str, collector):
+    _gauges[prefix] = collector
+
+
+def record_hash(operation: str, seconds: float):
+    hash_duration.observe(seconds, operation)
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.hash_seconds += seconds
+
+
+@contextmanager
+def jwt_timer():
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - inicio
+        jwt_decode_duration.observe(elapsed)
+        stats = _request_stats.get()
+        if stats is not None:
+            stats.jwt_seconds += elapsed
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    inicio = conn.info["query_start"].pop()
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.db_queries += 1
+        stats.db_seconds += time.perf_counter() - inicio
+
+
+def instrument_engine(db_engine):
+    event.listen(db_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(db_engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def _server_timing(total: float, stats: RequestStats) -> str:
+    partes = [f"app;dur={total * 1000:.1f}", f'db;dur={stats.db_seconds * 1000:.1f};desc="{stats.db_queries} queries"']
+    if stats.hash_seconds:
+        partes.append(f"hash;dur={stats.hash_seconds * 1000:.1f}")
+    if stats.jwt_seconds:
+        partes.append(f"jwt;dur={stats.jwt_seconds * 1000:.1f}")
+    return ", ".join(partes)
+
+
+async def metrics_middleware(request: Request, call_next):
+    stats = RequestStats()
+    token = _request_stats.set(stats)
+    inicio = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+    finally:
+        total = time.perf_counter() - inicio
+        _request_stats.reset(token)
+        route = request.scope.get("route")
+        route_path = route.path if route is not None else "unmatched"
+        http_request_duration.observe(total, request.method, route_path, str(status))
+        db_queries_per_request.observe(stats.db_queries, route_path)
+        db_time_per_request.observe(stats.db_seconds, route_path)
+
+    response.headers["Server-Timing"] = _server_timing(total, stats)
+    return response
+
+
+def _flatten(prefix: str, valores: dict) -> dict:
+    planos = {}
+    for chave, valor in valores.items():
+        nome = f"{prefix}_{chave}"
+        if isinstance(valor, dict):
+            planos.update(_flatten(nome, valor))
+        elif isinstance(valor, (int, float)) and not isinstance(valor, bool):
+            planos[nome] = valor
+    return planos
+
+
+def render_metrics() -> str:
+    linhas = []
+    for histogram in _histograms:
+        linhas.extend(histogram.render())
+    for prefix, collector in _gauges.items():
+        for nome, valor in sorted(_flatten(f"app_{prefix}", collector()).items()):
+            linhas.append(f"# TYPE {nome} gauge")
+            linhas.append(f"{nome} {valor}")
+    return "\n".join(linhas) + "\n"
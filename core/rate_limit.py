@@ -0,0 +1,193 @@
+import math
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from collections import OrderedDict, deque
+from typing import Tuple
+from fastapi import HTTPException
+from core.config import (
+    LOGIN_RATE_LIMIT_ENABLED, LOGIN_RATE_LIMIT_BACKEND, LOGIN_RATE_WINDOW_SECONDS,
+    LOGIN_MAX_FAILURES_PER_IP, LOGIN_MAX_FAILURES_PER_EMAIL, LOGIN_LOCKOUT_SECONDS,
+    LOGIN_LOCKOUT_MAX_SECONDS, RATE_LIMIT_MAX_KEYS, REDIS_URL,
+)
+from core.metrics import register_gauges
+from utils.logger import logger
+
+
+class RateLimitBackend(ABC):
+    @abstractmethod
+    def hit(self, key: str, window: float) -> int:
+        raise NotImplementedError
+
+    @abstractmethod
+    def get_lockout(self, key: str) -> Tuple[float, int]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def set_lockout(self, key: str, until: float, strikes: int, ttl: float):
+        raise NotImplementedError
+
+    @abstractmethod
+    def reset(self, key: str):
+        raise NotImplementedError
+
+    def stats(self) -> dict:
+        return {}
+
+
+class MemoryRateLimitBackend(RateLimitBackend):
+    def __init__(self, max_keys: int, max_hits_per_key: int):
+        self.max_keys = max_keys
+        self.max_hits_per_key = max_hits_per_key
+        self._hits = OrderedDict()
+        self._lockouts = OrderedDict()
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def _bound(self, data: OrderedDict):
+        while len(data) > self.max_keys:
+            data.popitem(last=False)
+            self.evictions += 1
+
+    def hit(self, key: str, window: float) -> int:
+        agora = time.time()
+        with self._lock:
+            tentativas = self._hits.get(key)
+            if tentativas is None:
+                tentativas = self._hits[key] = deque(maxlen=self.max_hits_per_key)
+            self._hits.move_to_end(key)
+            tentativas.append(agora)
+            while tentativas and tentativas[0] <= agora - window:
+                tentativas.popleft()
+            self._bound(self._hits)
+            return len(tentativas)
+
+    def get_lockout(self, key: str) -> Tuple[float, int]:
+        with self._lock:
+            until, strikes, expira = self._lockouts.get(key, (0.0, 0, 0.0))
+            if expira and expira <= time.time():
+                del self._lockouts[key]
+                return 0.0, 0
+            return until, strikes
+
+    def set_lockout(self, key: str, until: float, strikes: int, ttl: float):
+        with self._lock:
+            self._lockouts[key] = (until, strikes, time.time() + ttl)
+            self._lockouts.move_to_end(key)
+            self._bound(self._lockouts)
+
+    def reset(self, key: str):
+        with self._lock:
+            self._hits.pop(key, None)
+            self._lockouts.pop(key, None)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"tracked_keys": len(self._hits), "locked_keys": len(self._lockouts), "evictions": self.evictions}
+
+
+class RedisRateLimitBackend(RateLimitBackend):
+    def __init__(self, url: str):
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("LOGIN_RATE_LIMIT_BACKEND=redis requer o pacote 'redis' instalado")
+        self.client = redis.Redis.from_url(url)
+
+    def hit(self, key: str, window: float) -> int:
+        agora = time.time()
+        pipe = self.client.pipeline()
+        pipe.zremrangebyscore(f"rl:{key}", 0, agora - window)
+        pipe.zadd(f"rl:{key}", {f"{agora}:{uuid.uuid4().hex[:8]}": agora})
+        pipe.zcard(f"rl:{key}")
+        pipe.expire(f"rl:{key}", math.ceil(window))
+        return pipe.execute()[2]
+
+    def get_lockout(self, key: str) -> Tuple[float, int]:
+        until, strikes = self.client.hmget(f"rl:lock:{key}", "until", "strikes")
+        return float(until or 0), int(strikes or 0)
+
+    def set_lockout(self, key: str, until: float, strikes: int, ttl: float):
+        pipe = self.client.pipeline()
+        pipe.hset(f"rl:lock:{key}", mapping={"until": until, "strikes": strikes})
+        pipe.expire(f"rl:lock:{key}", math.ceil(ttl))
+        pipe.execute()
+
+    def reset(self, key: str):
+        self.client.delete(f"rl:{key}", f"rl:lock:{key}")
+
+
+class LoginRateLimiter:
+    def __init__(self, backend: RateLimitBackend, enabled: bool = True, window: float = LOGIN_RATE_WINDOW_SECONDS,
+                 max_per_ip: int = LOGIN_MAX_FAILURES_PER_IP, max_per_email: int = LOGIN_MAX_FAILURES_PER_EMAIL,
+                 lockout: float = LOGIN_LOCKOUT_SECONDS, lockout_max: float = LOGIN_LOCKOUT_MAX_SECONDS):
+        self.backend = backend
+        self.enabled = enabled
+        self.window = window
+        self.max_per_ip = max_per_ip
+        self.max_per_email = max_per_email
+        self.lockout = lockout
+        self.lockout_max = lockout_max
+        self._lock = threading.Lock()
+        self.counters = {"checked": 0, "rejected": 0, "failures": 0, "lockouts": 0}
+
+    def _count(self, nome: str):
+        with self._lock:
+            self.counters[nome] += 1
+
+    def _keys(self, ip: str, email: str):
+        return ((f"ip:{ip}", self.max_per_ip), (f"email:{email.strip().lower()}", self.max_per_email))
+
+    def check(self, ip: str, email: str):
+        if not self.enabled:
+            return
+        self._count("checked")
+        agora = time.time()
+        for key, _ in self._keys(ip, email):
+            until, _ = self.backend.get_lockout(key)
+            if until > agora:
+                self._count("rejected")
+                raise HTTPException(
+                    status_code=429,
+                    detail="Muitas tentativas de login, tente novamente mais tarde",
+                    headers={"Retry-After": str(math.ceil(until - agora))},
+                )
+
+    def record_failure(self, ip: str, email: str):
+        if not self.enabled:
+            return
+        self._count("failures")
+        for key, limite in self._keys(ip, email):
+            if self.backend.hit(key, self.window) < limite:
+                continue
+            _, strikes = self.backend.get_lockout(key)
+            strikes += 1
+            duracao = min(self.lockout * 2 ** (strikes - 1), self.lockout_max)
+            self.backend.set_lockout(key, time.time() + duracao, strikes, duracao + self.window)
+            self._count("lockouts")
+            logger.warning("Login bloqueado por %ss após tentativas excessivas - %s", int(duracao), key)
+
+    def record_success(self, ip: str, email: str):
+        if not self.enabled:
+            return
+        self.backend.reset(self._keys(ip, email)[1][0])
+
+    def stats(self) -> dict:
+        with self._lock:
+            estatisticas = dict(self.counters)
+        estatisticas.update(self.backend.stats())
+        return estatisticas
+
+
+def create_rate_limit_backend(nome: str = LOGIN_RATE_LIMIT_BACKEND) -> RateLimitBackend:
+    if nome == "redis":
+        return RedisRateLimitBackend(REDIS_URL)
+    if nome == "memory":
+        return MemoryRateLimitBackend(RATE_LIMIT_MAX_KEYS, max(LOGIN_MAX_FAILURES_PER_IP, LOGIN_MAX_FAILURES_PER_EMAIL))
+    raise ValueError(f"Backend de rate limit inválido: {nome}, use 'memory' ou 'redis'")
+
+
+login_limiter = LoginRateLimiter(create_rate_limit_backend(), enabled=LOGIN_RATE_LIMIT_ENABLED)
+
+register_gauges("login_rate_limit", login_limiter.stats)
@@ -0,0 +1,92 @@
+import threading
+import time
+from datetime import datetime, timedelta
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from models.user import User
+from core.metrics import register_gauges
+from core.shared_state import SharedState, shared_state
+from utils.logger import logger
+
+REVOKED_FOREVER = 2 ** 62
+REFRESH_OVERLAP = timedelta(minutes=1)
+
+
+class TokenRevocationTable:
+    def __init__(self, shared: SharedState = None):
+        self._min_versions = {}
+        self._lock = threading.Lock()
+        self.last_refresh = 0.0
+        self.last_refresh_rows = 0
+        self._since = None
+        self.rejected = 0
+        self.shared = shared if shared is not None and shared.distributed else None
+        self._shared_seen = 0
+        self._overflow_seen = 0
+
+    def _apply(self, user_id: int, min_version: int):
+        with self._lock:
+            if min_version > self._min_versions.get(user_id, 0):
+                self._min_versions[user_id] = min_version
+
+    def update(self, user_id: int, min_version: int):
+        self._apply(user_id, min_version)
+        if self.shared is None:
+            return
+        if not self.shared.max_update("token_revocations", user_id, min_version):
+            logger.warning("Estado compartilhado cheio, revogação do usuário %s será lida do banco pelos demais workers", user_id)
+            novo = self.shared.incr("token_revocations:overflow")
+            if novo == self._overflow_seen + 1:
+                self._overflow_seen = novo
+            return
+        self.shared.incr("token_revocations")
+
+    def revoke_user(self, user_id: int):
+        self.update(user_id, REVOKED_FOREVER)
+
+    def is_revoked(self, user_id: int, version: int) -> bool:
+        revogado = version < self._min_versions.get(user_id, 0)
+        if revogado:
+            with self._lock:
+                self.rejected += 1
+        return revogado
+
+    def refresh(self, db: Session):
+        inicio = datetime.utcnow()
+        query = select(User.id, User.token_version).where(User.token_version > 0)
+        if self._since is not None:
+            query = query.where(User.updated_at >= self._since)
+        rows = db.execute(query).all()
+        for user_id, version in rows:
+            self._apply(user_id, version)
+        self._since = inicio - REFRESH_OVERLAP
+        self.last_refresh = time.time()
+        self.last_refresh_rows = len(rows)
+
+    def sync(self, db: Session = None):
+        if self.shared is None:
+            return
+        overflow = self.shared.get("token_revocations:overflow")
+        if overflow != self._overflow_seen and db is not None:
+            self.refresh(db)
+            self._overflow_seen = overflow
+        atual = self.shared.get("token_revocations")
+        if atual == self._shared_seen:
+            return
+        for user_id, version in self.shared.items("token_revocations").items():
+            self._apply(user_id, version)
+        self._shared_seen = atual
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"entries": len(self._min_versions), "rejected": self.rejected, "last_refresh": self.last_refresh, "last_refresh_rows": self.last_refresh_rows}
+
+
+def bump_token_version(user: User) -> int:
+    user.token_version = (user.token_version or 0) + 1
+    return user.token_version
+
+
+token_revocations = TokenRevocationTable(shared_state)
+
+register_gauges("token_revocations", token_revocations.stats)
@@ -1,22 +1,23 @@
 from datetime import datetime, timedelta
 from jose import jwt
-from core.config import SECRET_KEY, ALGORITHM, ACCESS_TOKEN_EXPIRE_MINUTES
-from core.database import SessionLocal
+from core.config import SECRET_KEY, ALGORITHM, ACCESS_TOKEN_EXPIRE_MINUTES, STATELESS_TOKENS
+from core.database import get_db, get_async_db, use_primary
 from fastapi import HTTPException, Depends
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
-from services.user_service import get_user_by_email
+from sqlalchemy.ext.asyncio import AsyncSession
+from core.cache import principal_cache
+from core.email_filter import email_filter
+from utils.logger import bind_log_context, logger
+from core.metrics import jwt_timer
+from core.revocation import token_revocations
+from models.user import User, NOT_DELETED
+from sqlalchemy import select
 from sqlalchemy.orm import Session
+from sqlalchemy.exc import SQLAlchemyError
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/endpoints/auth/login")
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
 
 def create_token_access(dados: dict):
     dados_para_codificar = dados.copy()
@@ -28,19 +29,124 @@ def create_token_access(dados: dict):
 
     return token_jwt
 
+class TokenPrincipal:
+    is_deleted = False
+
+    def __init__(self, payload: dict):
+        self.id = payload["uid"]
+        self.email = payload["sub"]
+        self.name = payload.get("name")
+        self.role = payload["role"]
+        self.is_active = payload["active"]
+        self.token_version = payload["ver"]
+
+
+def build_token_claims(user: User) -> dict:
+    dados = {"sub": user.email}
+    if STATELESS_TOKENS:
+        dados.update({
+            "uid": user.id,
+            "name": user.name,
+            "role": user.role,
+            "active": user.is_active,
+            "ver": user.token_version or 0,
+        })
+    return dados
+
+def principal_from_claims(payload: dict):
+    if not STATELESS_TOKENS or "uid" not in payload:
+        return None
+
+    if token_revocations.is_revoked(payload["uid"], payload.get("ver", 0)):
+        raise HTTPException(status_code=401, detail="Token revogado")
+
+    principal = TokenPrincipal(payload)
+    bind_log_context(user_id=principal.id)
+    return principal
+
+def principal_query(email: str):
+    return select(User).where(User.email == email, NOT_DELETED)
+
+def _database_error(e: SQLAlchemyError) -> HTTPException:
+    logger.error("Erro ao buscar usuário %s", e)
+    return HTTPException(status_code=500, detail="Erro interno no servidor")
+
 def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        with jwt_timer():
+            payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        email: str = payload.get("sub")
+
+        if email is None:
+            raise HTTPException(status_code=401, detail="Token inválido")
+
+        principal = principal_from_claims(payload)
+        if principal is not None:
+            return principal
+
+        user = principal_cache.get(email)
+        if user is not None:
+            bind_log_context(user_id=user.id)
+            return user
+
+        generation = email_filter.generation
+        if email_filter.definitely_absent(email):
+            raise HTTPException(status_code=401, detail="Usuário não encontrado")
+
+        try:
+            user = db.execute(principal_query(email)).scalars().first()
+            if user is None and use_primary(db):
+                user = db.execute(principal_query(email)).scalars().first()
+        except SQLAlchemyError as e:
+            raise _database_error(e)
+        if user is None:
+            email_filter.remember_missing(email, generation)
+            raise HTTPException(status_code=401, detail="Usuário não encontrado")
+
+        db.expunge(user)
+        principal_cache.set(email, user)
+        bind_log_context(user_id=user.id)
+        return user
+
+    except JWTError:
+        raise HTTPException(status_code=401, detail="Token inválido")
+
+async def get_current_user_async(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_async_db)):
+    try:
+        with jwt_timer():
+            payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         email: str = payload.get("sub")
 
         if email is None:
             raise HTTPException(status_code=401, detail="Token inválido")
 
-        user = get_user_by_email(db, email)
+        principal = principal_from_claims(payload)
+        if principal is not None:
+            return principal
+
+        user = principal_cache.get(email)
+        if user is not None:
+            bind_log_context(user_id=user.id)
+            return user
+
+        generation = email_filter.generation
+        if email_filter.definitely_absent(email):
+            raise HTTPException(status_code=401, detail="Usuário não encontrado")
+
+        try:
+            user = (await db.execute(principal_query(email))).scalars().first()
+            if user is None and use_primary(db):
+                user = (await db.execute(principal_query(email))).scalars().first()
+        except SQLAlchemyError as e:
+            raise _database_error(e)
         if user is None:
+            email_filter.remember_missing(email, generation)
             raise HTTPException(status_code=401, detail="Usuário não encontrado")
+
+        db.expunge(user)
+        principal_cache.set(email, user)
+        bind_log_context(user_id=user.id)
         return user
 
     except JWTError:
         raise HTTPException(status_code=401, detail="Token inválido")
-    
\ No newline at end of file
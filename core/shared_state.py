@@ -0,0 +1,244 @@
+import hashlib
+import mmap
+import os
+import struct
+import tempfile
+import threading
+import time
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from core.config import SHARED_STATE_BACKEND, SHARED_STATE_PATH, SHARED_STATE_SLOTS, REDIS_URL, ACCESS_TOKEN_EXPIRE_MINUTES
+from core.metrics import register_gauges
+
+_MASK = 2 ** 64 - 1
+COUNTER_SLOTS = 64
+
+
+class SharedState(ABC):
+    distributed = False
+
+    @abstractmethod
+    def incr(self, name: str) -> int:
+        raise NotImplementedError
+
+    @abstractmethod
+    def get(self, name: str) -> int:
+        raise NotImplementedError
+
+    @abstractmethod
+    def max_update(self, name: str, key: int, value: int) -> bool:
+        raise NotImplementedError
+
+    @abstractmethod
+    def items(self, name: str) -> dict:
+        raise NotImplementedError
+
+    @abstractmethod
+    def reset(self):
+        raise NotImplementedError
+
+    def stats(self) -> dict:
+        return {}
+
+
+class MemorySharedState(SharedState):
+    def __init__(self):
+        self._counters = {}
+        self._maps = {}
+        self._lock = threading.Lock()
+
+    def incr(self, name: str) -> int:
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + 1
+            return self._counters[name]
+
+    def get(self, name: str) -> int:
+        return self._counters.get(name, 0)
+
+    def max_update(self, name: str, key: int, value: int) -> bool:
+        with self._lock:
+            valores = self._maps.setdefault(name, {})
+            if value > valores.get(key, value - 1):
+                valores[key] = value
+        return True
+
+    def items(self, name: str) -> dict:
+        with self._lock:
+            return dict(self._maps.get(name, {}))
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._maps.clear()
+
+
+class SharedMemoryState(SharedState):
+    distributed = True
+    _slot = struct.Struct("<Qqqd")
+
+    def __init__(self, path: str, slots: int, ttl: float = None):
+        self.path = path
+        self.slots = slots
+        self.counter_slots = COUNTER_SLOTS
+        self.ttl = ttl
+        self.size = (COUNTER_SLOTS + slots) * self._slot.size
+        self.overflows = 0
+        self._pid = None
+        self._fd = None
+        self._mm = None
+        self._lock = threading.Lock()
+
+    def _ensure_open(self):
+        if self._pid == os.getpid():
+            return
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+        if os.fstat(fd).st_size < self.size:
+            os.ftruncate(fd, self.size)
+        self._mm = mmap.mmap(fd, self.size)
+        self._fd = fd
+        self._pid = os.getpid()
+
+    @contextmanager
+    def _locked(self, exclusive: bool = True):
+        import fcntl
+        with self._lock:
+            self._ensure_open()
+            fcntl.flock(self._fd, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            try:
+                yield self._mm
+            finally:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+    @staticmethod
+    def _tag(name: str) -> int:
+        return int.from_bytes(hashlib.blake2b(name.encode(), digest_size=8).digest(), "little") or 1
+
+    def _expired(self, atualizado: float, agora: float) -> bool:
+        return self.ttl is not None and atualizado < agora - self.ttl
+
+    def _find_counter(self, mm, tag: int):
+        for passo in range(self.counter_slots):
+            offset = ((tag + passo) % self.counter_slots) * self._slot.size
+            slot_tag, _, valor, _ = self._slot.unpack_from(mm, offset)
+            if slot_tag == 0:
+                return offset, None
+            if slot_tag == tag:
+                return offset, valor
+        raise RuntimeError(f"Contadores compartilhados esgotados ({self.counter_slots} posições)")
+
+    def _find_entry(self, mm, tag: int, key: int, agora: float):
+        area = self.slots
+        inicio = (tag ^ (key * 0x9E3779B97F4A7C15)) & _MASK
+        livre = None
+        for passo in range(area):
+            offset = (self.counter_slots + (inicio + passo) % area) * self._slot.size
+            slot_tag, slot_key, valor, atualizado = self._slot.unpack_from(mm, offset)
+            if slot_tag == 0:
+                return (livre if livre is not None else offset), None
+            vencido = self._expired(atualizado, agora)
+            if slot_tag == tag and slot_key == key:
+                return offset, None if vencido else valor
+            if vencido and livre is None:
+                livre = offset
+        return livre, None
+
+    def incr(self, name: str) -> int:
+        tag = self._tag(f"c:{name}")
+        with self._locked() as mm:
+            offset, valor = self._find_counter(mm, tag)
+            valor = (valor or 0) + 1
+            self._slot.pack_into(mm, offset, tag, 0, valor, 0.0)
+            return valor
+
+    def get(self, name: str) -> int:
+        with self._locked(exclusive=False) as mm:
+            return self._find_counter(mm, self._tag(f"c:{name}"))[1] or 0
+
+    def max_update(self, name: str, key: int, value: int) -> bool:
+        tag = self._tag(f"m:{name}")
+        agora = time.time()
+        with self._locked() as mm:
+            offset, atual = self._find_entry(mm, tag, key, agora)
+            if offset is None:
+                self.overflows += 1
+                return False
+            if atual is None or value > atual:
+                self._slot.pack_into(mm, offset, tag, key, value, agora)
+            return True
+
+    def items(self, name: str) -> dict:
+        tag = self._tag(f"m:{name}")
+        agora = time.time()
+        with self._locked(exclusive=False) as mm:
+            return {
+                key: valor
+                for slot_tag, key, valor, atualizado in self._slot.iter_unpack(mm[self.counter_slots * self._slot.size:])
+                if slot_tag == tag and not self._expired(atualizado, agora)
+            }
+
+    def reset(self):
+        with self._locked() as mm:
+            mm[:] = bytes(self.size)
+
+    def stats(self) -> dict:
+        agora = time.time()
+        with self._locked(exclusive=False) as mm:
+            slots = list(self._slot.iter_unpack(mm))
+        entradas = slots[self.counter_slots:]
+        return {
+            "slots": self.slots,
+            "counter_slots": self.counter_slots,
+            "counters": sum(1 for slot_tag, _, _, _ in slots[:self.counter_slots] if slot_tag),
+            "used": sum(1 for slot_tag, _, _, atualizado in entradas if slot_tag and not self._expired(atualizado, agora)),
+            "overflows": self.overflows,
+        }
+
+
+class RedisSharedState(SharedState):
+    distributed = True
+
+    def __init__(self, url: str, prefix: str = "state:"):
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("SHARED_STATE_BACKEND=redis requer o pacote 'redis' instalado")
+        self.client = redis.Redis.from_url(url)
+        self.prefix = prefix
+
+    def incr(self, name: str) -> int:
+        return self.client.incr(f"{self.prefix}c:{name}")
+
+    def get(self, name: str) -> int:
+        return int(self.client.get(f"{self.prefix}c:{name}") or 0)
+
+    def max_update(self, name: str, key: int, value: int) -> bool:
+        self.client.zadd(f"{self.prefix}m:{name}", {str(key): value}, gt=True)
+        return True
+
+    def items(self, name: str) -> dict:
+        return {int(key): int(valor) for key, valor in self.client.zrange(f"{self.prefix}m:{name}", 0, -1, withscores=True)}
+
+    def reset(self):
+        chaves = list(self.client.scan_iter(f"{self.prefix}*"))
+        if chaves:
+            self.client.delete(*chaves)
+
+
+def default_shared_state_path() -> str:
+    base = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+    return os.path.join(base, "crud_usuarios_state")
+
+
+def create_shared_state(nome: str = SHARED_STATE_BACKEND) -> SharedState:
+    if nome == "memory":
+        return MemorySharedState()
+    if nome == "shm":
+        return SharedMemoryState(SHARED_STATE_PATH or default_shared_state_path(), SHARED_STATE_SLOTS, ACCESS_TOKEN_EXPIRE_MINUTES * 60)
+    if nome == "redis":
+        return RedisSharedState(REDIS_URL)
+    raise ValueError(f"Backend de estado compartilhado inválido: {nome}, use 'memory', 'shm' ou 'redis'")
+
+
+shared_state = create_shared_state()
+
+register_gauges("shared_state", shared_state.stats)
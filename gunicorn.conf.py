@@ -0,0 +1,20 @@
+import multiprocessing
+import os
+import subprocess
+import sys
+
+bind = os.getenv("BIND", "0.0.0.0:8000")
+workers = int(os.getenv("WEB_CONCURRENCY") or multiprocessing.cpu_count())
+worker_class = "uvicorn.workers.UvicornWorker"
+keepalive = 5
+graceful_timeout = 30
+
+
+def on_starting(server):
+    subprocess.run([sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)), "init_db.py")], check=True)
+    os.environ["DB_BOOTSTRAP_ON_STARTUP"] = "false"
+
+    from core.shared_state import shared_state
+    shared_state.reset()
+    if workers > 1 and not shared_state.distributed:
+        server.log.warning("SHARED_STATE_BACKEND=memory com %s workers: caches e revogações não são compartilhados entre processos", workers)
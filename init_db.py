@@ -1,26 +1,14 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, Session
-from models.user import Base, User
-import os
-from core.database import create_tables
-from core.hashing import create_hash
-
-BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-DATABASE_URL = f"sqlite:///{os.path.join(BASE_DIR, 'crud_user.db')}"
-
-engine = create_engine(DATABASE_URL, echo=True)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-
-def create_tables():
-    Base.metadata.create_all(bind=engine)
-
-if __name__ == "__main__":
-    create_tables()
-    print("Banco de dados inicializado com sucesso!")
+import sys
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from models.user import User
+from core.database import SessionLocal, SCHEMA_VERSION, create_tables, get_schema_version, mark_schema_version
+from utils.logger import logger
 
 def create_master_admin(db: Session):
-    existing_admin = db.query(User).filter(User.email == "admin@admin.com").first()
+    existing_admin = db.execute(select(User.id).where(User.email == "admin@admin.com")).first()
     if not existing_admin:
+        from core.hashing import create_hash
         admin_user = User(
             name="Admin Master",
             email="admin@admin.com",
@@ -31,4 +19,23 @@ def create_master_admin(db: Session):
         )
         db.add(admin_user)
         db.commit()
-        print("Admin master criado com sucesso.") 
\ No newline at end of file
+        print("Admin master criado com sucesso.")
+
+def bootstrap_database(force: bool = False) -> bool:
+    versao = get_schema_version()
+    if versao == SCHEMA_VERSION and not force:
+        return False
+
+    create_tables()
+    db = SessionLocal()
+    try:
+        create_master_admin(db)
+    finally:
+        db.close()
+    mark_schema_version()
+    logger.info("Banco de dados migrado da versão %s para a versão %s", versao, SCHEMA_VERSION)
+    return True
+
+if __name__ == "__main__":
+    bootstrap_database(force="--force" in sys.argv)
+    print("Banco de dados inicializado com sucesso!")
@@ -1,19 +1,116 @@
-from fastapi import FastAPI
-from api.v1.endpoints import user, auth
-from init_db import create_master_admin
-from core.database import SessionLocal
+import asyncio
+import uuid
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import PlainTextResponse
+from core.config import ASYNC_DB, STATELESS_TOKENS, TOKEN_REVOCATION_REFRESH_SECONDS, REFRESH_TOKEN_SWEEP_SECONDS, HASH_CALIBRATE_TARGET_MS, SOFT_DELETE, USER_PURGE_INTERVAL_SECONDS, DB_BOOTSTRAP_ON_STARTUP, SHARED_STATE_SYNC_SECONDS, REPLICA_HEALTH_CHECK_SECONDS, CHANGE_FEED_ENABLED, CHANGE_FEED_COMPACT_SECONDS, EMAIL_FILTER_SYNC_SECONDS
+from core.database import SessionLocal, dispose_engines, replicas, read_routing_middleware
+from core.hashing import shutdown_hash_executor
+from utils.logger import new_log_context, reset_log_context, stop_logging
+from core.metrics import metrics_middleware, render_metrics
+from core.revocation import token_revocations
+from core.audit import audit_writer
+from core.cache import principal_cache, list_cache
+from core.email_filter import email_filter
+from core.shared_state import shared_state
+from services.token_service import purge_expired_refresh_tokens
+from services.user_service import purge_deleted_users
+from services.change_feed import change_notifier, compact_user_changes
+from utils.logger import logger
 
-app = FastAPI()
+if ASYNC_DB:
+    from api.v1.endpoints import user_async as user, auth_async as auth, audit_async as audit, changes_async as changes
+else:
+    from api.v1.endpoints import user, auth, audit, changes
+
+def with_session(job):
+    db = SessionLocal()
+    try:
+        return job(db)
+    finally:
+        db.close()
+
+async def run_periodically(interval: float, job, descricao: str):
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await run_in_threadpool(with_session, job)
+        except Exception as e:
+            logger.error("Erro na tarefa periódica '%s': %s", descricao, str(e))
+
+def sync_shared_state(db):
+    principal_cache.sync()
+    list_cache.sync()
+    token_revocations.sync(db)
+
+def check_replicas(db):
+    replicas.check()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if HASH_CALIBRATE_TARGET_MS > 0:
+        from core.hashing import configure_hashing, calibrate_hash_params
+        configure_hashing(calibrate_hash_params(HASH_CALIBRATE_TARGET_MS))
+    if DB_BOOTSTRAP_ON_STARTUP:
+        from init_db import bootstrap_database
+        await run_in_threadpool(bootstrap_database)
+
+    audit_writer.start()
+    change_notifier.bind()
+    background_tasks = [
+        asyncio.create_task(run_periodically(REFRESH_TOKEN_SWEEP_SECONDS, purge_expired_refresh_tokens, "limpeza de refresh tokens")),
+    ]
+    if SOFT_DELETE:
+        background_tasks.append(asyncio.create_task(run_periodically(USER_PURGE_INTERVAL_SECONDS, purge_deleted_users, "expurgo de usuários excluídos")))
+    if STATELESS_TOKENS:
+        await run_in_threadpool(with_session, token_revocations.refresh)
+        background_tasks.append(asyncio.create_task(run_periodically(TOKEN_REVOCATION_REFRESH_SECONDS, token_revocations.refresh, "revogação de tokens")))
+    if email_filter.enabled:
+        await run_in_threadpool(with_session, email_filter.build)
+        background_tasks.append(asyncio.create_task(run_periodically(EMAIL_FILTER_SYNC_SECONDS, email_filter.sync, "sincronização do filtro de e-mails")))
+    if shared_state.distributed:
+        background_tasks.append(asyncio.create_task(run_periodically(SHARED_STATE_SYNC_SECONDS, sync_shared_state, "sincronização de estado compartilhado")))
+    if CHANGE_FEED_ENABLED:
+        background_tasks.append(asyncio.create_task(run_periodically(CHANGE_FEED_COMPACT_SECONDS, compact_user_changes, "compactação do feed de alterações")))
+    if replicas.engines:
+        background_tasks.append(asyncio.create_task(run_periodically(REPLICA_HEALTH_CHECK_SECONDS, check_replicas, "verificação das réplicas")))
+    app.state.background_tasks = background_tasks
+
+    yield
+
+    for task in background_tasks:
+        task.cancel()
+    shutdown_hash_executor()
+    await audit_writer.stop()
+    await dispose_engines()
+    stop_logging()
+
+app = FastAPI(lifespan=lifespan)
+
+app.middleware("http")(read_routing_middleware)
+app.middleware("http")(metrics_middleware)
+
+@app.middleware("http")
+async def request_context_middleware(request: Request, call_next):
+    request_id = request.headers.get("X-Request-ID") or uuid.uuid4().hex
+    token = new_log_context(request_id=request_id, user_id=None)
+    try:
+        response = await call_next(request)
+    finally:
+        reset_log_context(token)
+    response.headers["X-Request-ID"] = request_id
+    return response
 
 @app.get("/")
 def read_root():
     return {"message": "API funcionando!"}
 
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
 app.include_router(user.router, prefix="/api/v1/endpoints")
 app.include_router(auth.router, prefix="/api/v1/endpoints/auth")
-
-@app.on_event("startup")
-def startup_event():
-    db = SessionLocal()
-    create_master_admin(db)
-    db.close()
\ No newline at end of file
+app.include_router(audit.router, prefix="/api/v1/endpoints")
+app.include_router(changes.router, prefix="/api/v1/endpoints")
@@ -0,0 +1,20 @@
+from datetime import datetime
+from sqlalchemy import Column, Integer, String, DateTime, Text, Index
+from models.user import Base
+
+class AuditEvent(Base):
+    __tablename__ = "audit_events"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False, index=True)
+    action = Column(String(32), nullable=False)
+    actor_id = Column(Integer, nullable=True)
+    target_id = Column(Integer, nullable=True)
+    request_id = Column(String(64), nullable=True)
+    details = Column(Text, nullable=True)
+
+    __table_args__ = (
+        Index("ix_audit_events_target_id", "target_id", "id"),
+        Index("ix_audit_events_actor_id", "actor_id", "id"),
+        Index("ix_audit_events_action_id", "action", "id"),
+    )
@@ -0,0 +1,9 @@
+from datetime import datetime
+from sqlalchemy import Column, Integer, DateTime
+from models.user import Base
+
+class SchemaVersion(Base):
+    __tablename__ = "schema_version"
+
+    version = Column(Integer, primary_key=True, autoincrement=False)
+    applied_at = Column(DateTime, default=datetime.utcnow, nullable=False)
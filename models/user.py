@@ -1,4 +1,5 @@
-from sqlalchemy import Column, Integer, String, Boolean
+from datetime import datetime
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Index, event
 from sqlalchemy.orm import declarative_base
 
 Base = declarative_base()
@@ -6,6 +7,7 @@ Base = declarative_base()
 class User(Base):
     __tablename__ = "users"
     __table_args__ = {'sqlite_autoincrement': True}
+    __mapper_args__ = {'eager_defaults': True}
 
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
     name = Column(String, nullable=False)
@@ -13,6 +15,21 @@ class User(Base):
     password = Column(String, nullable=False)
     role = Column(String, default="user")
     is_active = Column(Boolean, default=True)
-    is_deleted = Column(Boolean, default=False)
+    is_deleted = Column(Boolean, default=False, server_default="0")
+    deleted_at = Column(DateTime, nullable=True)
+    token_version = Column(Integer, default=0, server_default="0", nullable=False)
+    version = Column(Integer, default=1, server_default="1", nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, nullable=True)
 
-    
\ No newline at end of file
+@event.listens_for(User, "before_update")
+def bump_row_version(mapper, connection, target):
+    target.version = (target.version or 0) + 1
+    target.updated_at = datetime.utcnow()
+
+NOT_DELETED = User.is_deleted.is_(False)
+
+Index("ix_users_live_id", User.id, sqlite_where=NOT_DELETED, postgresql_where=NOT_DELETED)
+Index("ix_users_live_email", User.email, sqlite_where=NOT_DELETED, postgresql_where=NOT_DELETED)
+Index("ix_users_active_role", User.is_active, User.role)
+Index("ix_users_updated_at", User.updated_at)
+Index("ix_users_deleted_at", User.deleted_at, sqlite_where=User.is_deleted.is_(True), postgresql_where=User.is_deleted.is_(True))
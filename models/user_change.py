@@ -0,0 +1,21 @@
+from datetime import datetime
+from sqlalchemy import Column, Integer, String, DateTime, Text
+from models.user import Base
+
+class UserChange(Base):
+    __tablename__ = "user_changes"
+    __table_args__ = {'sqlite_autoincrement': True}
+
+    seq = Column(Integer, primary_key=True, autoincrement=True)
+    user_id = Column(Integer, nullable=False)
+    op = Column(String(16), nullable=False)
+    version = Column(Integer, nullable=True)
+    payload = Column(Text, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False, index=True)
+
+class ChangeConsumer(Base):
+    __tablename__ = "change_consumers"
+
+    name = Column(String(64), primary_key=True)
+    last_seq = Column(Integer, default=0, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
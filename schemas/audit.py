@@ -0,0 +1,19 @@
+from datetime import datetime
+from pydantic import BaseModel
+from typing import List, Optional
+
+class AuditEventResponse(BaseModel):
+    id: int
+    created_at: datetime
+    action: str
+    actor_id: Optional[int] = None
+    target_id: Optional[int] = None
+    request_id: Optional[str] = None
+    details: Optional[str] = None
+
+    class Config:
+        from_attributes = True
+
+class AuditEventPage(BaseModel):
+    items: List[AuditEventResponse]
+    next_cursor: Optional[str] = None
@@ -0,0 +1,15 @@
+from datetime import datetime
+from pydantic import BaseModel
+from typing import List, Optional
+
+class UserChangeResponse(BaseModel):
+    seq: int
+    user_id: int
+    op: str
+    version: Optional[int] = None
+    created_at: datetime
+    user: Optional[dict] = None
+
+class UserChangePage(BaseModel):
+    changes: List[UserChangeResponse]
+    last_seq: int
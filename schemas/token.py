@@ -0,0 +1,7 @@
+from pydantic import BaseModel
+
+class RefreshRequest(BaseModel):
+    refresh_token: str
+
+    class Config:
+        extra = "forbid"
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, ConfigDict, EmailStr
-from typing import Optional
+from typing import List, Optional
 
 class UserCreate(BaseModel):
     name: str
@@ -32,4 +32,24 @@ class UserPatch(BaseModel):
     name: Optional[str] = None
     email: Optional[EmailStr] = None
     password: Optional[str] = None
-    is_active: Optional[bool] = None
\ No newline at end of file
+    is_active: Optional[bool] = None
+
+class UserPage(BaseModel):
+    items: List[UserResponse]
+    next_cursor: Optional[str] = None
+
+class UserBatchRequest(BaseModel):
+    ids: List[int]
+
+    class Config:
+        extra = "forbid"
+
+class UserBatchResult(BaseModel):
+    id: int
+    status: str
+    detail: Optional[str] = None
+
+class UserBatchResponse(BaseModel):
+    action: str
+    changed: int
+    results: List[UserBatchResult]
@@ -0,0 +1,21 @@
+import argparse
+from core.hashing import HASH_SCHEMES, calibrate_hash_params, default_hash_params
+
+parser = argparse.ArgumentParser(description="Calcula o custo de hash de senha que atinge a latência alvo neste host")
+parser.add_argument("--target-ms", type=float, default=250)
+parser.add_argument("--scheme", choices=HASH_SCHEMES, default=None)
+args = parser.parse_args()
+
+params = default_hash_params()
+if args.scheme:
+    params["scheme"] = args.scheme
+
+params = calibrate_hash_params(args.target_ms, params)
+
+print(f"PASSWORD_HASH_SCHEME={params['scheme']}")
+if params["scheme"] == "bcrypt":
+    print(f"BCRYPT_ROUNDS={params['bcrypt_rounds']}")
+else:
+    print(f"ARGON2_TIME_COST={params['argon2_time_cost']}")
+    print(f"ARGON2_MEMORY_COST={params['argon2_memory_cost']}")
+    print(f"ARGON2_PARALLELISM={params['argon2_parallelism']}")
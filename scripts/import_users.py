@@ -0,0 +1,30 @@
+import argparse
+import json
+from core.database import SessionLocal
+from core.config import BULK_IMPORT_BATCH_SIZE
+from services.import_service import import_users, parse_rows, detect_format
+
+parser = argparse.ArgumentParser(description="Importa usuários em lote a partir de um arquivo NDJSON ou CSV")
+parser.add_argument("arquivo")
+parser.add_argument("--format", choices=["ndjson", "csv"], default=None)
+parser.add_argument("--batch-size", type=int, default=BULK_IMPORT_BATCH_SIZE)
+parser.add_argument("--show-errors", action="store_true")
+args = parser.parse_args()
+
+fmt = args.format or detect_format(args.arquivo)
+db = SessionLocal()
+
+try:
+    with open(args.arquivo, encoding="utf-8", newline="") as arquivo:
+        relatorio = import_users(db, parse_rows(arquivo, fmt), args.batch_size)
+finally:
+    db.close()
+
+print(f"Linhas processadas: {relatorio['total']}")
+print(f"Usuários criados: {relatorio['created']}")
+print(f"Linhas com erro: {relatorio['failed']}")
+print(f"Tempo total: {relatorio['elapsed_seconds']}s ({relatorio['rows_per_second']} linhas/s)")
+
+if args.show_errors:
+    for erro in relatorio["errors"]:
+        print(json.dumps(erro, ensure_ascii=False))
@@ -0,0 +1,31 @@
+import argparse
+import sqlite3
+import time
+
+parser = argparse.ArgumentParser(description="Copia o banco SQLite principal para arquivos que simulam réplicas de leitura")
+parser.add_argument("--source", default="crud_user.db")
+parser.add_argument("--replicas", default="replica1.db", help="arquivos de réplica separados por vírgula")
+parser.add_argument("--interval", type=float, default=0, help="repete a cópia a cada N segundos, simulando atraso de replicação")
+args = parser.parse_args()
+
+
+def copy_to_replicas(source: str, destinos: list):
+    origem = sqlite3.connect(source)
+    try:
+        for destino in destinos:
+            replica = sqlite3.connect(destino)
+            try:
+                origem.backup(replica)
+            finally:
+                replica.close()
+    finally:
+        origem.close()
+
+
+destinos = [caminho.strip() for caminho in args.replicas.split(",") if caminho.strip()]
+while True:
+    copy_to_replicas(args.source, destinos)
+    print(f"Réplicas atualizadas: {', '.join(destinos)}")
+    if args.interval <= 0:
+        break
+    time.sleep(args.interval)
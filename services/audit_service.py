@@ -0,0 +1,50 @@
+from datetime import datetime
+from typing import Optional
+from fastapi import HTTPException
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from sqlalchemy.exc import SQLAlchemyError
+from models.audit_event import AuditEvent
+from services.user_queries import encode_cursor, decode_cursor
+from utils.logger import logger
+
+AUDIT_PAGE_MAX = 500
+
+
+def build_audit_query(limit: int, user_id: Optional[int] = None, actor_id: Optional[int] = None, action: Optional[str] = None,
+                      since: Optional[datetime] = None, until: Optional[datetime] = None, cursor: Optional[str] = None):
+    if limit < 1 or limit > AUDIT_PAGE_MAX:
+        raise HTTPException(status_code=400, detail=f"O limite deve estar entre 1 e {AUDIT_PAGE_MAX}")
+
+    query = select(AuditEvent)
+    if user_id is not None:
+        query = query.where(AuditEvent.target_id == user_id)
+    if actor_id is not None:
+        query = query.where(AuditEvent.actor_id == actor_id)
+    if action is not None:
+        query = query.where(AuditEvent.action == action)
+    if since is not None:
+        query = query.where(AuditEvent.created_at >= since)
+    if until is not None:
+        query = query.where(AuditEvent.created_at < until)
+    if cursor:
+        query = query.where(AuditEvent.id < decode_cursor(cursor))
+    return query.order_by(AuditEvent.id.desc()).limit(limit + 1)
+
+
+def paginate_events(events: list, limit: int) -> dict:
+    next_cursor = None
+    if len(events) > limit:
+        events = events[:limit]
+        next_cursor = encode_cursor(events[-1].id)
+    return {"items": events, "next_cursor": next_cursor}
+
+
+def list_audit_events(db: Session, limit: int = 50, **filtros) -> dict:
+    query = build_audit_query(limit, **filtros)
+    try:
+        events = db.execute(query).scalars().all()
+        return paginate_events(events, limit)
+    except SQLAlchemyError as e:
+        logger.error("Erro ao consultar eventos de auditoria %s", e)
+        raise HTTPException(status_code=500, detail="Erro interno no servidor")
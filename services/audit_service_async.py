@@ -0,0 +1,15 @@
+from fastapi import HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.exc import SQLAlchemyError
+from services.audit_service import build_audit_query, paginate_events
+from utils.logger import logger
+
+
+async def list_audit_events(db: AsyncSession, limit: int = 50, **filtros) -> dict:
+    query = build_audit_query(limit, **filtros)
+    try:
+        events = (await db.execute(query)).scalars().all()
+        return paginate_events(events, limit)
+    except SQLAlchemyError as e:
+        logger.error("Erro ao consultar eventos de auditoria %s", e)
+        raise HTTPException(status_code=500, detail="Erro interno no servidor")
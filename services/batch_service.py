@@ -0,0 +1,146 @@
+from datetime import datetime
+from typing import List
+from fastapi import HTTPException
+from sqlalchemy import delete, select, update
+from sqlalchemy.orm import Session
+from sqlalchemy.exc import SQLAlchemyError
+from models.user import User, NOT_DELETED
+from models.refresh_token import RefreshToken
+from core.cache import invalidate_user
+from core.config import BATCH_MAX_IDS, SOFT_DELETE
+from core.revocation import token_revocations
+from core.audit import audit_writer
+from services.change_feed import record_bulk_changes
+from utils.logger import logger
+
+BATCH_ACTIONS = ("activate", "deactivate", "promote", "delete")
+CHANGED_STATUSES = ("updated", "deleted")
+
+_SET_VALUES = {
+    "activate": {"is_active": True},
+    "deactivate": {"is_active": False},
+    "promote": {"role": "admin"},
+}
+
+
+def check_batch_request(action: str, ids: List[int], current_user: User) -> List[int]:
+    if action == "promote" and current_user.role != "admin":
+        logger.error("Usuário %s tentou promover usuários em lote (operação negada)", current_user.id)
+        raise HTTPException(status_code=403, detail="Apenas admins podem promover outros usuários a admin")
+
+    ids = list(dict.fromkeys(ids))
+    if not ids:
+        raise HTTPException(status_code=400, detail="Informe ao menos um ID")
+    if len(ids) > BATCH_MAX_IDS:
+        raise HTTPException(status_code=400, detail=f"Máximo de {BATCH_MAX_IDS} IDs por requisição")
+    return ids
+
+
+def _row_outcome(action: str, row, current_user: User):
+    if row is None:
+        return "not_found", "Usuário não encontrado"
+
+    admin = current_user.role == "admin"
+    proprio = current_user.id == row.id
+
+    if action in ("activate", "deactivate"):
+        if not admin and not proprio:
+            return "forbidden", "Acesso negado"
+        if action == "activate" and row.is_active:
+            return "unchanged", "Usuário já está ativo"
+        if action == "deactivate" and not row.is_active:
+            return "unchanged", "Usuário já está desativado"
+        return "updated", None
+
+    if action == "promote":
+        if row.role == "admin":
+            return "unchanged", "Usuário já é admin"
+        return "updated", None
+
+    if admin and proprio:
+        return "forbidden", "Admins não podem excluir a si mesmos."
+    if not admin and not proprio:
+        return "forbidden", "Você não tem permissão para excluir este usuário."
+    if admin and row.role == "admin":
+        return "forbidden", "Você não pode excluir outro administrador."
+    return "deleted", None
+
+
+def load_statement(ids: List[int]):
+    return select(User.id, User.email, User.role, User.is_active, User.token_version).where(User.id.in_(ids), NOT_DELETED)
+
+
+def plan_batch(action: str, ids: List[int], rows, current_user: User):
+    por_id = {row.id: row for row in rows}
+    resultados = []
+    alvos = []
+    for user_id in ids:
+        status, detail = _row_outcome(action, por_id.get(user_id), current_user)
+        resultados.append({"id": user_id, "status": status, "detail": detail})
+        if status in CHANGED_STATUSES:
+            alvos.append(por_id[user_id])
+    return resultados, alvos
+
+
+def write_statement(action: str, ids: List[int]):
+    if action == "delete" and not SOFT_DELETE:
+        return delete(User).where(User.id.in_(ids)).execution_options(synchronize_session=False)
+    valores = {"is_deleted": True, "deleted_at": datetime.utcnow()} if action == "delete" else _SET_VALUES[action]
+    return (
+        update(User)
+        .where(User.id.in_(ids))
+        .values(token_version=User.token_version + 1, version=User.version + 1, updated_at=datetime.utcnow(), **valores)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def token_cleanup_statement(ids: List[int]):
+    return delete(RefreshToken).where(RefreshToken.user_id.in_(ids)).execution_options(synchronize_session=False)
+
+
+def change_op(action: str) -> str:
+    return "delete" if action == "delete" else "update"
+
+
+def snapshot_before_write(action: str) -> bool:
+    return action == "delete" and not SOFT_DELETE
+
+
+def after_commit(action: str, alvos, current_user: User):
+    for row in alvos:
+        invalidate_user(row.email)
+        if action == "delete":
+            token_revocations.revoke_user(row.id)
+        else:
+            token_revocations.update(row.id, (row.token_version or 0) + 1)
+    logger.info("Operação em lote '%s' concluída - %s usuários alterados", action, len(alvos))
+
+
+def summarize_batch(action: str, resultados: list) -> dict:
+    alterados = sum(1 for resultado in resultados if resultado["status"] in CHANGED_STATUSES)
+    return {"action": action, "changed": alterados, "results": resultados}
+
+
+def run_batch(db: Session, action: str, ids: List[int], current_user: User) -> dict:
+    ids = check_batch_request(action, ids, current_user)
+    try:
+        rows = db.execute(load_statement(ids)).all()
+        resultados, alvos = plan_batch(action, ids, rows, current_user)
+        if alvos:
+            ids_alvo = [row.id for row in alvos]
+            if snapshot_before_write(action):
+                record_bulk_changes(db, change_op(action), User.id.in_(ids_alvo))
+                db.execute(token_cleanup_statement(ids_alvo))
+            db.execute(write_statement(action, ids_alvo))
+            if not snapshot_before_write(action):
+                record_bulk_changes(db, change_op(action), User.id.in_(ids_alvo))
+            db.commit()
+            after_commit(action, alvos, current_user)
+            for row in alvos:
+                audit_writer.record(action, row.id, current_user.id, {"batch": True})
+        return summarize_batch(action, resultados)
+
+    except SQLAlchemyError as e:
+        db.rollback()
+        logger.error("Erro na operação em lote '%s': %s", action, e)
+        raise HTTPException(status_code=500, detail="Erro interno no servidor")
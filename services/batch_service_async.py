@@ -0,0 +1,34 @@
+from typing import List
+from fastapi import HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.exc import SQLAlchemyError
+from models.user import User
+from core.audit import audit_writer
+from services.batch_service import check_batch_request, load_statement, plan_batch, write_statement, token_cleanup_statement, after_commit, summarize_batch, change_op, snapshot_before_write
+from services.change_feed_async import record_bulk_changes
+from utils.logger import logger
+
+
+async def run_batch(db: AsyncSession, action: str, ids: List[int], current_user: User) -> dict:
+    ids = check_batch_request(action, ids, current_user)
+    try:
+        rows = (await db.execute(load_statement(ids))).all()
+        resultados, alvos = plan_batch(action, ids, rows, current_user)
+        if alvos:
+            ids_alvo = [row.id for row in alvos]
+            if snapshot_before_write(action):
+                await record_bulk_changes(db, change_op(action), User.id.in_(ids_alvo))
+                await db.execute(token_cleanup_statement(ids_alvo))
+            await db.execute(write_statement(action, ids_alvo))
+            if not snapshot_before_write(action):
+                await record_bulk_changes(db, change_op(action), User.id.in_(ids_alvo))
+            await db.commit()
+            after_commit(action, alvos, current_user)
+            for row in alvos:
+                await audit_writer.record_async(action, row.id, current_user.id, {"batch": True})
+        return summarize_batch(action, resultados)
+
+    except SQLAlchemyError as e:
+        await db.rollback()
+        logger.error("Erro na operação em lote '%s': %s", action, e)
+        raise HTTPException(status_code=500, detail="Erro interno no servidor")
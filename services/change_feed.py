@@ -0,0 +1,224 @@
+import asyncio
+import json
+import time
+from datetime import datetime, timedelta
+from typing import Optional
+from fastapi import HTTPException, Request
+from sqlalchemy import delete, event, func, insert, inspect, or_, select
+from sqlalchemy.orm import Session
+from sqlalchemy.exc import SQLAlchemyError
+from models.user import User
+from models.user_change import UserChange, ChangeConsumer
+from core.config import (
+    CHANGE_FEED_ENABLED, CHANGE_FEED_BATCH_SIZE, CHANGE_FEED_POLL_SECONDS, CHANGE_FEED_MAX_WAIT_SECONDS,
+    CHANGE_FEED_RETENTION_HOURS, CHANGE_FEED_COMPACT_BATCH_SIZE,
+)
+from core.database import SessionLocal, use_primary
+from services.user_queries import RESPONSE_COLUMNS
+from utils.logger import logger
+
+SNAPSHOT_COLUMNS = RESPONSE_COLUMNS + ("version",)
+SSE_HEARTBEAT_SECONDS = 15
+
+
+class ChangeNotifier:
+    def __init__(self):
+        self._loop = None
+        self._event = None
+
+    def bind(self):
+        self._loop = asyncio.get_running_loop()
+        self._event = asyncio.Event()
+
+    def notify(self):
+        if self._loop is None:
+            return
+        try:
+            self._loop.call_soon_threadsafe(self._wake)
+        except RuntimeError:
+            pass
+
+    def _wake(self):
+        evento, self._event = self._event, asyncio.Event()
+        evento.set()
+
+    async def wait(self, timeout: float):
+        if self._event is None:
+            await asyncio.sleep(timeout)
+            return
+        try:
+            await asyncio.wait_for(self._event.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+
+
+change_notifier = ChangeNotifier()
+
+
+def change_row(op: str, snapshot: dict) -> dict:
+    return {
+        "user_id": snapshot["id"],
+        "op": op,
+        "version": snapshot.get("version"),
+        "payload": json.dumps(snapshot, ensure_ascii=False),
+        "created_at": datetime.utcnow(),
+    }
+
+
+def _snapshot(user: User) -> dict:
+    return {coluna: getattr(user, coluna) for coluna in SNAPSHOT_COLUMNS}
+
+
+def _collect_changes(session: Session, flush_context):
+    if not CHANGE_FEED_ENABLED:
+        return
+
+    rows = [change_row("create", _snapshot(user)) for user in session.new if isinstance(user, User)]
+    for user in session.dirty:
+        if isinstance(user, User) and session.is_modified(user):
+            excluido = inspect(user).attrs.is_deleted.history.added == [True]
+            rows.append(change_row("delete" if excluido else "update", _snapshot(user)))
+    rows.extend(change_row("delete", _snapshot(user)) for user in session.deleted if isinstance(user, User))
+
+    if rows:
+        session.connection().execute(insert(UserChange), rows)
+        session.info["user_changes"] = True
+
+
+def _notify_commit(session: Session):
+    if session.info.pop("user_changes", False):
+        change_notifier.notify()
+
+
+def _discard(session: Session):
+    session.info.pop("user_changes", None)
+
+
+event.listen(Session, "after_flush", _collect_changes)
+event.listen(Session, "after_commit", _notify_commit)
+event.listen(Session, "after_rollback", _discard)
+
+
+def snapshot_statement(where):
+    return select(*(getattr(User, coluna) for coluna in SNAPSHOT_COLUMNS)).where(where)
+
+
+def bulk_change_rows(op: str, rows) -> list:
+    return [change_row(op, dict(row._mapping)) for row in rows]
+
+
+def record_bulk_changes(db: Session, op: str, where):
+    if not CHANGE_FEED_ENABLED:
+        return
+    rows = db.execute(snapshot_statement(where)).all()
+    if rows:
+        db.execute(insert(UserChange), bulk_change_rows(op, rows))
+        db.info["user_changes"] = True
+
+
+def check_feed_params(after: int, limit: int, wait: float = 0):
+    if after < 0:
+        raise HTTPException(status_code=400, detail="O parâmetro 'after' não pode ser negativo")
+    if limit < 1 or limit > CHANGE_FEED_BATCH_SIZE:
+        raise HTTPException(status_code=400, detail=f"O limite deve estar entre 1 e {CHANGE_FEED_BATCH_SIZE}")
+    return min(max(wait, 0), CHANGE_FEED_MAX_WAIT_SECONDS)
+
+
+def build_changes_query(after: int, limit: int):
+    return select(UserChange).where(UserChange.seq > after).order_by(UserChange.seq).limit(limit)
+
+
+def serialize_change(change: UserChange) -> dict:
+    return {
+        "seq": change.seq,
+        "user_id": change.user_id,
+        "op": change.op,
+        "version": change.version,
+        "created_at": change.created_at.isoformat(),
+        "user": json.loads(change.payload) if change.payload else None,
+    }
+
+
+def changes_page(changes: list, after: int) -> dict:
+    return {"changes": [serialize_change(change) for change in changes], "last_seq": changes[-1].seq if changes else after}
+
+
+def acknowledge(db: Session, consumer: str, seq: int):
+    use_primary(db)
+    registro = db.get(ChangeConsumer, consumer)
+    if registro is None:
+        db.add(ChangeConsumer(name=consumer, last_seq=seq))
+    elif seq > registro.last_seq or registro.updated_at < datetime.utcnow() - timedelta(minutes=1):
+        registro.last_seq = max(seq, registro.last_seq)
+        registro.updated_at = datetime.utcnow()
+    else:
+        return
+    db.commit()
+
+
+def fetch_changes_page(after: int, limit: int, consumer: Optional[str] = None) -> dict:
+    db = SessionLocal()
+    try:
+        if consumer:
+            acknowledge(db, consumer, after)
+        return changes_page(db.execute(build_changes_query(after, limit)).scalars().all(), after)
+    except SQLAlchemyError as e:
+        logger.error("Erro ao consultar feed de alterações %s", e)
+        raise HTTPException(status_code=500, detail="Erro interno no servidor")
+    finally:
+        db.close()
+
+
+async def long_poll(fetch_page, after: int, consumer: Optional[str], wait: float) -> dict:
+    prazo = time.monotonic() + wait
+    page = await fetch_page(after, consumer)
+    while not page["changes"]:
+        restante = prazo - time.monotonic()
+        if restante <= 0:
+            break
+        await change_notifier.wait(min(CHANGE_FEED_POLL_SECONDS, restante))
+        page = await fetch_page(after, None)
+    return page
+
+
+async def sse_events(request: Request, fetch_page, after: int, consumer: Optional[str]):
+    cursor = after
+    ultimo_envio = time.monotonic()
+    page = await fetch_page(cursor, consumer)
+    while not await request.is_disconnected():
+        if page["changes"]:
+            cursor = page["last_seq"]
+            ultimo_envio = time.monotonic()
+            yield f"id: {cursor}\nevent: changes\ndata: {json.dumps(page, ensure_ascii=False)}\n\n"
+        else:
+            if time.monotonic() - ultimo_envio >= SSE_HEARTBEAT_SECONDS:
+                ultimo_envio = time.monotonic()
+                yield ": keepalive\n\n"
+            await change_notifier.wait(CHANGE_FEED_POLL_SECONDS)
+        page = await fetch_page(cursor, None)
+
+
+def compact_user_changes(db: Session, retention_hours: float = CHANGE_FEED_RETENTION_HOURS, batch_size: int = CHANGE_FEED_COMPACT_BATCH_SIZE, max_batches: int = 100) -> int:
+    limite = datetime.utcnow() - timedelta(hours=retention_hours)
+    db.execute(delete(ChangeConsumer).where(ChangeConsumer.updated_at < limite))
+    consumido = db.execute(select(func.min(ChangeConsumer.last_seq))).scalar()
+    db.commit()
+
+    condicao = UserChange.created_at < limite
+    if consumido is not None:
+        condicao = or_(condicao, UserChange.seq <= consumido)
+
+    total = 0
+    for _ in range(max_batches):
+        seqs = db.execute(select(UserChange.seq).where(condicao).order_by(UserChange.seq).limit(batch_size)).scalars().all()
+        if not seqs:
+            break
+        db.execute(delete(UserChange).where(UserChange.seq.in_(seqs)))
+        db.commit()
+        total += len(seqs)
+        if len(seqs) < batch_size:
+            break
+
+    if total:
+        logger.info("Compactação do feed de alterações concluída - %s registros removidos", total)
+    return total
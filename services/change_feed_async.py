@@ -0,0 +1,44 @@
+from typing import Optional
+from fastapi import HTTPException
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.exc import SQLAlchemyError
+from datetime import datetime, timedelta
+from models.user_change import UserChange, ChangeConsumer
+from core.config import CHANGE_FEED_ENABLED
+from core.database import AsyncSessionLocal, use_primary
+from services.change_feed import snapshot_statement, bulk_change_rows, build_changes_query, changes_page
+from utils.logger import logger
+
+
+async def record_bulk_changes(db: AsyncSession, op: str, where):
+    if not CHANGE_FEED_ENABLED:
+        return
+    rows = (await db.execute(snapshot_statement(where))).all()
+    if rows:
+        await db.execute(insert(UserChange), bulk_change_rows(op, rows))
+        db.info["user_changes"] = True
+
+
+async def acknowledge(db: AsyncSession, consumer: str, seq: int):
+    use_primary(db)
+    registro = await db.get(ChangeConsumer, consumer)
+    if registro is None:
+        db.add(ChangeConsumer(name=consumer, last_seq=seq))
+    elif seq > registro.last_seq or registro.updated_at < datetime.utcnow() - timedelta(minutes=1):
+        registro.last_seq = max(seq, registro.last_seq)
+        registro.updated_at = datetime.utcnow()
+    else:
+        return
+    await db.commit()
+
+
+async def fetch_changes_page(after: int, limit: int, consumer: Optional[str] = None) -> dict:
+    async with AsyncSessionLocal() as db:
+        try:
+            if consumer:
+                await acknowledge(db, consumer, after)
+            return changes_page((await db.execute(build_changes_query(after, limit))).scalars().all(), after)
+        except SQLAlchemyError as e:
+            logger.error("Erro ao consultar feed de alterações %s", e)
+            raise HTTPException(status_code=500, detail="Erro interno no servidor")
@@ -0,0 +1,89 @@
+import csv
+import io
+import json
+import zlib
+from typing import AsyncIterator, Iterator, Optional
+from fastapi import HTTPException
+from sqlalchemy import select
+from models.user import User
+from core.database import SessionLocal, AsyncSessionLocal
+from core.config import EXPORT_BATCH_SIZE
+from services.user_queries import apply_user_filters, RESPONSE_COLUMNS
+from utils.logger import logger
+
+EXPORT_FORMATS = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+EXPORT_COLUMNS = RESPONSE_COLUMNS
+
+
+def check_format(fmt: str) -> str:
+    if fmt not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Formato inválido, use um de: {', '.join(EXPORT_FORMATS)}")
+    return EXPORT_FORMATS[fmt]
+
+
+def build_export_query(dialect_name: str, name: Optional[str] = None, email: Optional[str] = None, search: str = "contains"):
+    query = select(*(getattr(User, coluna) for coluna in EXPORT_COLUMNS))
+    query = apply_user_filters(query, dialect_name, name=name, email=email, search=search)
+    return query.order_by(User.id).execution_options(yield_per=EXPORT_BATCH_SIZE, stream_results=True)
+
+
+def _encode_rows(rows, fmt: str) -> bytes:
+    if fmt == "csv":
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows(rows)
+        return buffer.getvalue().encode("utf-8")
+    return "".join(json.dumps(dict(zip(EXPORT_COLUMNS, row)), ensure_ascii=False) + "\n" for row in rows).encode("utf-8")
+
+
+def _header(fmt: str) -> bytes:
+    if fmt == "csv":
+        return (",".join(EXPORT_COLUMNS) + "\r\n").encode("utf-8")
+    return b""
+
+
+def iter_export(fmt: str, name: Optional[str] = None, email: Optional[str] = None, search: str = "contains") -> Iterator[bytes]:
+    db = SessionLocal()
+    try:
+        query = build_export_query(db.get_bind().dialect.name, name=name, email=email, search=search)
+        yield _header(fmt)
+        total = 0
+        for partition in db.execute(query).partitions():
+            total += len(partition)
+            yield _encode_rows(partition, fmt)
+        logger.info("Exportação de usuários concluída - %s registros", total)
+    finally:
+        db.close()
+
+
+async def aiter_export(fmt: str, name: Optional[str] = None, email: Optional[str] = None, search: str = "contains") -> AsyncIterator[bytes]:
+    async with AsyncSessionLocal() as db:
+        query = build_export_query(db.get_bind().dialect.name, name=name, email=email, search=search)
+        yield _header(fmt)
+        total = 0
+        result = await db.stream(query)
+        async for partition in result.partitions():
+            total += len(partition)
+            yield _encode_rows(partition, fmt)
+        logger.info("Exportação de usuários concluída - %s registros", total)
+
+
+def gzip_chunks(chunks: Iterator[bytes]) -> Iterator[bytes]:
+    compressor = zlib.compressobj(wbits=31)
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+async def agzip_chunks(chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    compressor = zlib.compressobj(wbits=31)
+    async for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+def accepts_gzip(accept_encoding: Optional[str]) -> bool:
+    return bool(accept_encoding) and "gzip" in accept_encoding.lower()
@@ -0,0 +1,157 @@
+import csv
+import json
+import time
+from itertools import islice
+from typing import Iterable, Iterator, TextIO
+from pydantic import ValidationError
+from sqlalchemy import insert, select
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from sqlalchemy.orm import Session
+from fastapi import HTTPException
+from models.user import User
+from schemas.user import UserCreate
+from core.hashing import create_hash_many
+from core.config import BULK_IMPORT_BATCH_SIZE
+from core.cache import list_cache
+from core.email_filter import email_filter
+from services.change_feed import record_bulk_changes
+from utils.logger import logger
+
+IMPORT_FORMATS = ("ndjson", "csv")
+EXTRA_COLUMNS = "_extra"
+
+
+def detect_format(filename: str = None, content_type: str = None) -> str:
+    if filename and filename.lower().endswith(".csv"):
+        return "csv"
+    if content_type and "csv" in content_type:
+        return "csv"
+    return "ndjson"
+
+
+def parse_rows(stream: TextIO, fmt: str) -> Iterator[tuple]:
+    if fmt not in IMPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Formato inválido, use um de: {', '.join(IMPORT_FORMATS)}")
+
+    if fmt == "csv":
+        reader = csv.DictReader(stream, restkey=EXTRA_COLUMNS)
+        for row in reader:
+            yield reader.line_num, row
+        return
+
+    for line_num, line in enumerate(stream, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield line_num, json.loads(line)
+        except json.JSONDecodeError:
+            yield line_num, None
+
+
+def _validate(line_num: int, raw) -> tuple:
+    if not isinstance(raw, dict):
+        return None, {"line": line_num, "email": None, "error": "Linha inválida"}
+    if EXTRA_COLUMNS in raw:
+        return None, {"line": line_num, "email": raw.get("email"), "error": "Linha com mais colunas que o cabeçalho"}
+    try:
+        user = UserCreate(**raw)
+    except ValidationError as e:
+        detalhe = e.errors()[0]
+        campo = ".".join(str(parte) for parte in detalhe["loc"])
+        return None, {"line": line_num, "email": raw.get("email"), "error": f"{campo}: {detalhe['msg']}"}
+    if user.name == "" or user.password == "":
+        return None, {"line": line_num, "email": user.email, "error": "Nome e senha não podem ser vazios"}
+    return user, None
+
+
+def _insert_batch(db: Session, rows: list, report: dict):
+    try:
+        db.execute(insert(User), [values for _, values in rows])
+        record_bulk_changes(db, "create", User.email.in_([values["email"] for _, values in rows]))
+        db.commit()
+        report["created"] += len(rows)
+        email_filter.add(*(values["email"] for _, values in rows))
+        return
+    except IntegrityError:
+        db.rollback()
+
+    for line_num, values in rows:
+        try:
+            db.execute(insert(User), [values])
+            record_bulk_changes(db, "create", User.email == values["email"])
+            db.commit()
+            report["created"] += 1
+            email_filter.add(values["email"])
+        except IntegrityError:
+            db.rollback()
+            report["errors"].append({"line": line_num, "email": values["email"], "error": "E-mail já cadastrado"})
+
+
+def _process_batch(db: Session, batch: list, report: dict):
+    validos = []
+    emails_no_lote = set()
+
+    for line_num, raw in batch:
+        user, erro = _validate(line_num, raw)
+        if erro:
+            report["errors"].append(erro)
+            continue
+        if user.email in emails_no_lote:
+            report["errors"].append({"line": line_num, "email": user.email, "error": "E-mail duplicado no arquivo"})
+            continue
+        emails_no_lote.add(user.email)
+        validos.append((line_num, user))
+
+    if not validos:
+        return
+
+    candidatos = [email for email in emails_no_lote if email_filter.might_exist(email)]
+    existentes = set(db.execute(select(User.email).where(User.email.in_(candidatos))).scalars()) if candidatos else set()
+    novos = []
+    for line_num, user in validos:
+        if user.email in existentes:
+            report["errors"].append({"line": line_num, "email": user.email, "error": "E-mail já cadastrado"})
+        else:
+            novos.append((line_num, user))
+
+    hashes = create_hash_many([user.password for _, user in novos])
+    rows = [
+        (line_num, {"name": user.name, "email": user.email, "password": hashed, "role": "user", "is_active": True, "is_deleted": False})
+        for (line_num, user), hashed in zip(novos, hashes)
+    ]
+    if rows:
+        _insert_batch(db, rows, report)
+
+
+def import_users(db: Session, rows: Iterable[tuple], batch_size: int = BULK_IMPORT_BATCH_SIZE) -> dict:
+    if batch_size < 1:
+        raise HTTPException(status_code=400, detail="batch_size deve ser maior que zero")
+    report = {"total": 0, "created": 0, "failed": 0, "errors": [], "elapsed_seconds": 0.0, "rows_per_second": 0.0}
+    inicio = time.perf_counter()
+    rows = iter(rows)
+
+    try:
+        while True:
+            batch = list(islice(rows, batch_size))
+            if not batch:
+                break
+            report["total"] += len(batch)
+            _process_batch(db, batch, report)
+            logger.info("Importação em lote: %s linhas processadas, %s usuários criados", report['total'], report['created'])
+
+    except SQLAlchemyError as e:
+        db.rollback()
+        logger.error("Erro no banco de dados durante importação em lote: %s", e)
+        raise HTTPException(status_code=500, detail="Erro interno no servidor")
+
+    if report["created"]:
+        list_cache.clear()
+
+    elapsed = time.perf_counter() - inicio
+    report["errors"].sort(key=lambda erro: erro["line"])
+    report["failed"] = len(report["errors"])
+    report["elapsed_seconds"] = round(elapsed, 3)
+    report["rows_per_second"] = round(report["total"] / elapsed, 1) if elapsed > 0 else 0.0
+    logger.info("Importação concluída - %s criados, %s com erro, %s linhas/s", report['created'], report['failed'], report['rows_per_second'])
+    return report
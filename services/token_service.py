@@ -0,0 +1,138 @@
+import hashlib
+import secrets
+import threading
+import uuid
+from datetime import datetime, timedelta
+from typing import Optional, Tuple
+from fastapi import HTTPException
+from sqlalchemy import delete, select, update
+from sqlalchemy.orm import Session
+from sqlalchemy.exc import SQLAlchemyError
+from models.refresh_token import RefreshToken
+from models.user import User
+from core.config import REFRESH_TOKEN_EXPIRE_DAYS
+from core.metrics import register_gauges
+from utils.logger import logger
+
+_metrics_lock = threading.Lock()
+
+refresh_metrics = {
+    "issued": 0,
+    "rotated": 0,
+    "rejected": 0,
+    "reuse_detected": 0,
+    "purged": 0,
+}
+
+
+def count_refresh(evento: str, quantidade: int = 1):
+    with _metrics_lock:
+        refresh_metrics[evento] += quantidade
+
+
+def get_refresh_metrics() -> dict:
+    with _metrics_lock:
+        return dict(refresh_metrics)
+
+
+register_gauges("refresh_tokens", get_refresh_metrics)
+
+
+def hash_refresh_token(token: str) -> str:
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+def build_refresh_token(user: User, family_id: Optional[str] = None) -> Tuple[str, RefreshToken]:
+    token = secrets.token_urlsafe(32)
+    registro = RefreshToken(
+        user_id=user.id,
+        token_hash=hash_refresh_token(token),
+        family_id=family_id or uuid.uuid4().hex,
+        token_version=user.token_version or 0,
+        expires_at=datetime.utcnow() + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS),
+    )
+    count_refresh("issued")
+    return token, registro
+
+
+def lookup_statement(token: str):
+    return select(RefreshToken, User).join(User, User.id == RefreshToken.user_id).where(RefreshToken.token_hash == hash_refresh_token(token))
+
+
+def claim_statement(registro: RefreshToken):
+    return update(RefreshToken).where(RefreshToken.id == registro.id, RefreshToken.revoked.is_(False)).values(revoked=True)
+
+
+def revoke_family_statement(family_id: str):
+    return update(RefreshToken).where(RefreshToken.family_id == family_id).values(revoked=True)
+
+
+def purge_statement():
+    return delete(RefreshToken).where(RefreshToken.expires_at < datetime.utcnow())
+
+
+def rejection_reason(registro: RefreshToken, user: User) -> Optional[str]:
+    if registro.revoked:
+        return "Refresh token reutilizado"
+    if registro.expires_at <= datetime.utcnow():
+        return "Refresh token expirado"
+    if user.is_deleted or not user.is_active or (user.token_version or 0) != registro.token_version:
+        return "Refresh token revogado"
+    return None
+
+
+def reject(registro: Optional[RefreshToken], detail: str):
+    count_refresh("rejected")
+    if detail == "Refresh token reutilizado":
+        count_refresh("reuse_detected")
+        logger.warning("Reutilização de refresh token detectada - usuário: %s, família: %s", registro.user_id, registro.family_id)
+    raise HTTPException(status_code=401, detail=detail)
+
+
+def issue_refresh_token(db: Session, user: User) -> str:
+    try:
+        token, registro = build_refresh_token(user)
+        db.add(registro)
+        db.commit()
+        return token
+    except SQLAlchemyError as e:
+        db.rollback()
+        logger.error("Erro ao emitir refresh token: %s", str(e))
+        raise HTTPException(status_code=500, detail="Erro interno no servidor")
+
+
+def rotate_refresh_token(db: Session, token: str) -> Tuple[User, str]:
+    try:
+        row = db.execute(lookup_statement(token)).first()
+        if row is None:
+            reject(None, "Refresh token inválido")
+        registro, user = row
+
+        motivo = rejection_reason(registro, user)
+        if motivo is None and db.execute(claim_statement(registro)).rowcount != 1:
+            motivo = "Refresh token reutilizado"
+        if motivo is not None:
+            if motivo != "Refresh token expirado":
+                db.execute(revoke_family_statement(registro.family_id))
+                db.commit()
+            reject(registro, motivo)
+
+        novo, novo_registro = build_refresh_token(user, registro.family_id)
+        db.add(novo_registro)
+        db.expunge(user)
+        db.commit()
+        count_refresh("rotated")
+        return user, novo
+    except SQLAlchemyError as e:
+        db.rollback()
+        logger.error("Erro ao renovar refresh token: %s", str(e))
+        raise HTTPException(status_code=500, detail="Erro interno no servidor")
+
+
+def purge_expired_refresh_tokens(db: Session) -> int:
+    removidos = db.execute(purge_statement()).rowcount
+    db.commit()
+    count_refresh("purged", removidos)
+    if removidos:
+        logger.info("Refresh tokens expirados removidos: %s", removidos)
+    return removidos
@@ -0,0 +1,49 @@
+from typing import Tuple
+from fastapi import HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.exc import SQLAlchemyError
+from models.user import User
+from services.token_service import (
+    build_refresh_token, lookup_statement, claim_statement, revoke_family_statement,
+    rejection_reason, reject, count_refresh,
+)
+from utils.logger import logger
+
+
+async def issue_refresh_token(db: AsyncSession, user: User) -> str:
+    try:
+        token, registro = build_refresh_token(user)
+        db.add(registro)
+        await db.commit()
+        return token
+    except SQLAlchemyError as e:
+        await db.rollback()
+        logger.error("Erro ao emitir refresh token: %s", str(e))
+        raise HTTPException(status_code=500, detail="Erro interno no servidor")
+
+
+async def rotate_refresh_token(db: AsyncSession, token: str) -> Tuple[User, str]:
+    try:
+        row = (await db.execute(lookup_statement(token))).first()
+        if row is None:
+            reject(None, "Refresh token inválido")
+        registro, user = row
+
+        motivo = rejection_reason(registro, user)
+        if motivo is None and (await db.execute(claim_statement(registro))).rowcount != 1:
+            motivo = "Refresh token reutilizado"
+        if motivo is not None:
+            if motivo != "Refresh token expirado":
+                await db.execute(revoke_family_statement(registro.family_id))
+                await db.commit()
+            reject(registro, motivo)
+
+        novo, novo_registro = build_refresh_token(user, registro.family_id)
+        db.add(novo_registro)
+        await db.commit()
+        count_refresh("rotated")
+        return user, novo
+    except SQLAlchemyError as e:
+        await db.rollback()
+        logger.error("Erro ao renovar refresh token: %s", str(e))
+        raise HTTPException(status_code=500, detail="Erro interno no servidor")
@@ -0,0 +1,95 @@
+import base64
+import json
+from typing import Optional
+from fastapi import HTTPException
+from sqlalchemy import select, text
+from models.user import User, NOT_DELETED
+from core.config import FULLTEXT_SEARCH
+
+SEARCH_MODES = ("contains", "prefix")
+RESPONSE_COLUMNS = ("id", "name", "email", "role", "is_deleted", "is_active")
+FTS_MIN_LENGTH = 3
+
+
+def encode_cursor(last_id: int) -> str:
+    raw = json.dumps({"id": last_id}, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> int:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        return int(json.loads(base64.urlsafe_b64decode(padded))["id"])
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=400, detail="Cursor inválido")
+
+
+def _prefix_upper_bound(prefix: str) -> str:
+    return prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+
+def _name_filter(name: str, search: str, dialect_name: str):
+    if search == "prefix":
+        return User.name.startswith(name, autoescape=True)
+
+    if FULLTEXT_SEARCH and dialect_name == "sqlite" and len(name) >= FTS_MIN_LENGTH:
+        termo = '"' + name.replace('"', '""') + '"'
+        return User.id.in_(
+            select(text("rowid")).select_from(text("users_fts")).where(text("users_fts MATCH :termo").bindparams(termo=termo))
+        )
+
+    if dialect_name == "postgresql":
+        return User.name.icontains(name, autoescape=True)
+
+    return User.name.contains(name, autoescape=True)
+
+
+def _email_filter(email: str, search: str):
+    if search == "prefix":
+        return (User.email >= email) & (User.email < _prefix_upper_bound(email))
+    return User.email.contains(email, autoescape=True)
+
+
+def check_search_mode(search: str):
+    if search not in SEARCH_MODES:
+        raise HTTPException(status_code=400, detail=f"Modo de busca inválido, use um de: {', '.join(SEARCH_MODES)}")
+
+
+def apply_user_filters(query, dialect_name: str, name: Optional[str] = None, email: Optional[str] = None, search: str = "contains"):
+    check_search_mode(search)
+
+    query = query.where(NOT_DELETED)
+    if name:
+        query = query.where(_name_filter(name, search, dialect_name))
+    if email:
+        query = query.where(_email_filter(email, search))
+    return query
+
+
+def build_list_users_query(
+    dialect_name: str,
+    limit: int,
+    cursor: Optional[str] = None,
+    skip: int = 0,
+    name: Optional[str] = None,
+    email: Optional[str] = None,
+    search: str = "contains",
+    lean: bool = True,
+):
+    colunas = [getattr(User, coluna) for coluna in RESPONSE_COLUMNS] if lean else [User]
+    query = apply_user_filters(select(*colunas), dialect_name, name=name, email=email, search=search)
+
+    if cursor:
+        query = query.where(User.id > decode_cursor(cursor))
+    elif skip:
+        query = query.offset(skip)
+
+    return query.order_by(User.id).limit(limit + 1)
+
+
+def paginate(users: list, limit: int) -> dict:
+    next_cursor = None
+    if limit > 0 and len(users) > limit:
+        users = users[:limit]
+        next_cursor = encode_cursor(users[-1].id)
+    return {"items": users, "next_cursor": next_cursor}
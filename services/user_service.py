@@ -1,8 +1,18 @@
+from datetime import datetime, timedelta
+from sqlalchemy import delete, select
 from sqlalchemy.orm import Session
-from sqlalchemy.exc import SQLAlchemyError
-from models.user import User
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from models.user import User, NOT_DELETED
 from schemas.user import UserCreate, UserUpdate, UserPatch
 from core.hashing import create_hash
+from core.cache import invalidate_user, list_cache
+from core.revocation import token_revocations, bump_token_version
+from core.audit import audit_writer, changed_fields
+from core.email_filter import email_filter
+import services.change_feed  # noqa: F401
+from core.config import SOFT_DELETE, USER_RETENTION_DAYS, USER_PURGE_BATCH_SIZE, USER_PURGE_MAX_BATCHES
+from models.refresh_token import RefreshToken
+from services.user_queries import build_list_users_query, paginate
 from typing import Optional
 from pydantic import EmailStr
 from fastapi import HTTPException
@@ -20,42 +30,62 @@ def create_user(db: Session, user: UserCreate):
             logger.error("Erro ao criar usuário")
             raise HTTPException(status_code=400, detail="Senha senha não pode ser vazia, digite a senha criada no campo Senha e tente novamente!")
 
+        if email_filter.ready and email_filter.might_exist(user.email):
+            existente = (db.execute(select(User.id).where(User.email == user.email))).first()
+            if existente:
+                logger.error("Erro ao criar usuário: e-mail já cadastrado")
+                raise HTTPException(status_code=400, detail="E-mail já cadastrado")
+
         hashed_pw = create_hash(user.password)
         db_user = User(name=user.name, email=user.email, password=hashed_pw, role="user")
         db.add(db_user)
         db.commit()
-        db.refresh(db_user)
-        logger.info(f"Usuário criado com sucesso - Nome: {user.name}, E-mail: {user.email}")
+        list_cache.clear()
+        email_filter.add(db_user.email)
+        audit_writer.record("create", db_user.id, db_user.id)
+        logger.info("Usuário criado com sucesso - Nome: %s, E-mail: %s", user.name, user.email)
         return db_user
-    
+
+    except IntegrityError:
+        db.rollback()
+        logger.error("Erro ao criar usuário: e-mail já cadastrado")
+        raise HTTPException(status_code=400, detail="E-mail já cadastrado")
+
     except SQLAlchemyError as e:
-        logger.error(f"Erro na conexão com banco de dados ao criar usuário")
+        logger.error("Erro na conexão com banco de dados ao criar usuário")
         raise HTTPException(status_code=500, detail="Erro interno no servidor")
 
 def get_user(db: Session, user_id: int, current_user: User):
     try:
-        if current_user != "admin":
-            logger.error(f"Operação negada: Usuário {current_user.id} tentou buscar dados de outro usuário")
+        if current_user.role != "admin" and current_user.id != user_id:
+            logger.error("Operação negada: Usuário %s tentou buscar dados de outro usuário", current_user.id)
             raise HTTPException(status_code=403, detail="Você não te permissão para acessar os dados de outro usuário")
         
+        user = db.query(User).filter(User.id == user_id, NOT_DELETED).first()
+        if not user:
+            logger.error("Usuário não encontrado - ID: %s", user_id)
+            raise HTTPException(status_code=404, detail="Usuário não encontrado")
+
         logger.info("Busca de usuário concluída com sucesso")
-        return db.query(User).filter(User.id == user_id).first()
+        return user
     
     except SQLAlchemyError as e:
-        logger.error(f"Erro ao buscar usuário {e}")
+        logger.error("Erro ao buscar usuário %s", e)
         raise HTTPException(status_code=500, detail="Erro interno no servidor")
 
 def update_user(db: Session, user_id: int, user_data: UserUpdate, current_user: User):
     try:
-        user = db.query(User).filter(User.id == user_id).first()
+        user = db.query(User).filter(User.id == user_id, NOT_DELETED).first()
         if not user:
             logger.error("Usuário não encontrado durante a desativação de usuário")
             raise HTTPException(status_code=404, detail="Usuário não encontrado")
         
-        if current_user.role != "admin" or current_user.id != user.id:
-            logger.error(f"Permissão negada: Usuário {current_user.id} tentou atualizar o usuário {user_id}")
+        if current_user.role != "admin" and current_user.id != user.id:
+            logger.error("Permissão negada: Usuário %s tentou atualizar o usuário %s", current_user.id, user_id)
             raise HTTPException(status_code=403, detail="Você não tem permissão para atualizar este usuário.")
 
+        email_anterior = user.email
+
         if user_data.name is not None:
             user.name = user_data.name
 
@@ -66,21 +96,29 @@ def update_user(db: Session, user_id: int, user_data: UserUpdate, current_user:
             from core.hashing import create_hash
             user.password = create_hash(user_data.password)
 
+        if user_data.password is not None or user.email != email_anterior:
+            bump_token_version(user)
+
         db.commit()
-        db.refresh(user)
-        logger.info(f"Usuário atualizado com sucesso - ID: {user_id}")
+        invalidate_user(email_anterior)
+        if user.email != email_anterior:
+            email_filter.add(user.email)
+        invalidate_user(user.email)
+        token_revocations.update(user.id, user.token_version)
+        audit_writer.record("update", user.id, current_user.id, {"fields": changed_fields(user_data)})
+        logger.info("Usuário atualizado com sucesso - ID: %s", user_id)
         return {"message": "Usuário atualizado com sucesso"}
     
     except SQLAlchemyError as e:
-        logger.error(f"Erro ao buscar usuário {e}")
+        logger.error("Erro ao buscar usuário %s", e)
         raise HTTPException(status_code=500, detail="Erro interno no servidor")
 
 def delete_user(user_id: int, db: Session, current_user: User):
     try:
-        user = db.query(User).filter(User.id == user_id).first()
+        user = db.query(User).filter(User.id == user_id, NOT_DELETED).first()
 
         if not user:
-            logger.error(f"Usuário não encontrado para exclusão - ID: {user.id}")
+            logger.error("Usuário não encontrado para exclusão - ID: %s", user_id)
             raise HTTPException(status_code=404, detail="Usuário não encontrado.")
         
         if current_user.role == "admin" and user.id == current_user.id:
@@ -88,53 +126,106 @@ def delete_user(user_id: int, db: Session, current_user: User):
             raise HTTPException(status_code=403, detail="Admins não podem excluir a si mesmos.")
 
         if current_user.role != "admin" and current_user.id != user_id:
-            logger.error(f"Usuário {current_user.id} tentou excluir outro usuário sem permissão")
+            logger.error("Usuário %s tentou excluir outro usuário sem permissão", current_user.id)
             raise HTTPException(status_code=403, detail="Você não tem permissão para excluir este usuário.")
         
         if current_user.role == "admin" and user.role == "admin" and current_user.id != user.id:
             logger.error("Operação negada: um administrador tentou excluir outro administrador")
             raise HTTPException(status_code=403, detail="Você não pode excluir outro administrador.")
     
-        db.delete(user)
+        email_removido = user.email
+        if SOFT_DELETE:
+            user.is_deleted = True
+            user.deleted_at = datetime.utcnow()
+            bump_token_version(user)
+        else:
+            db.execute(delete(RefreshToken).where(RefreshToken.user_id == user.id))
+            db.delete(user)
         db.commit()
-        logger.info(f"Usuário deletado com sucesso - ID: {user_id}")
+        invalidate_user(email_removido)
+        token_revocations.revoke_user(user_id)
+        audit_writer.record("delete", user_id, current_user.id, {"soft": SOFT_DELETE})
+        logger.info("Usuário deletado com sucesso - ID: %s", user_id)
         return {"message": "Usuário excluído com sucesso"}
     
     except SQLAlchemyError as e:
-        logger.error(f"Erro ao buscar usuário {e}")
+        logger.error("Erro ao buscar usuário %s", e)
         raise HTTPException(status_code=500, detail="Erro interno no servidor")
 
-def list_users(db: Session, current_user: User, skip: int = 0, limit: int = 10, name: str = None, email: str = None):
+def purge_deleted_users(db: Session, retention_days: float = USER_RETENTION_DAYS, batch_size: int = USER_PURGE_BATCH_SIZE, max_batches: int = USER_PURGE_MAX_BATCHES) -> int:
+    limite = datetime.utcnow() - timedelta(days=retention_days)
+    total = 0
+    for _ in range(max_batches):
+        ids = db.execute(
+            select(User.id).where(User.is_deleted.is_(True), User.deleted_at < limite).order_by(User.deleted_at).limit(batch_size)
+        ).scalars().all()
+        if not ids:
+            break
+        db.execute(delete(RefreshToken).where(RefreshToken.user_id.in_(ids)))
+        db.execute(delete(User).where(User.id.in_(ids)))
+        db.commit()
+        total += len(ids)
+        if len(ids) < batch_size:
+            break
+
+    if total:
+        logger.info("Expurgo de usuários excluídos concluído - %s registros removidos", total)
+    return total
+
+def list_users(db: Session, current_user: User, skip: int = 0, limit: int = 10, name: str = None, email: str = None, cursor: str = None, search: str = "contains"):
     try:
         if current_user.role != "admin":
             logger.error("Operação negada: um usuário tentou acessar dados de outro usuário")
             raise HTTPException(status_code=403, detail="Você não tem permissão para esse recurso")
         
-        query = db.query(User)
+        query = build_list_users_query(db.get_bind().dialect.name, limit, cursor=cursor, skip=skip, name=name, email=email, search=search)
+        users = db.execute(query).all()
 
-        if name:
-            query = query.filter(User.name.contains(name))
-        if email:
-            query = query.filter(User.email.contains(email))
-        
         logger.info("Realizada consulta de usuários")
-        return query.offset(skip).limit(limit).all()
+        return paginate(users, limit)
     
     except SQLAlchemyError as e:
-        logger.error(f"Erro ao buscar usuário {e}")
+        logger.error("Erro ao buscar usuário %s", e)
         raise HTTPException(status_code=500, detail="Erro interno no servidor")
 
 def get_user_by_email(db: Session, user_email: EmailStr) -> Optional[User]:
     try:
-        return db.query(User).filter(User.email == user_email).first()
+        generation = email_filter.generation
+        if email_filter.definitely_absent(user_email):
+            return None
+        user = db.query(User).filter(User.email == user_email, NOT_DELETED).first()
+        if user is None:
+            email_filter.remember_missing(user_email, generation)
+        return user
     except SQLAlchemyError as e:
-        logger.error(f"Erro ao buscar usuário {e}")
+        logger.error("Erro ao buscar usuário %s", e)
         raise HTTPException(status_code=500, detail="Erro interno no servidor")  
 
 
+def update_password_hash(db: Session, user: User, password_hash: str):
+    try:
+        user.password = password_hash
+        db.commit()
+        invalidate_user(user.email)
+        logger.info("Hash de senha atualizado para os parâmetros atuais - ID: %s", user.id)
+    except SQLAlchemyError as e:
+        db.rollback()
+        logger.error("Erro ao atualizar hash de senha %s", e)
+
+
 def patch_user(db: Session, user_id: int, user_patch: UserPatch, current_user: User):
     try:
-        user = db.query(User).filter(User.id == user_id).first()
+        user = db.query(User).filter(User.id == user_id, NOT_DELETED).first()
+
+        if not user:
+            logger.error("Usuário não encontrado durante a atualização parcial de usuário")
+            raise HTTPException(status_code=404, detail="Usuário não encontrado")
+
+        if current_user.role != "admin" and current_user.id != user.id:
+            logger.error("Permissão negada: Usuário %s tentou atualizar o usuário %s", current_user.id, user_id)
+            raise HTTPException(status_code=403, detail="Você não tem permissão para atualizar este usuário.")
+
+        email_anterior = user.email
         
         if user_patch.name is not None:
             user.name = user_patch.name
@@ -143,17 +234,25 @@ def patch_user(db: Session, user_id: int, user_patch: UserPatch, current_user: U
         if user_patch.password is not None:
             user.password = create_hash(user_patch.password)
 
+        if user_patch.password is not None or user.email != email_anterior:
+            bump_token_version(user)
+
         db.commit()
-        db.refresh(user)
+        invalidate_user(email_anterior)
+        if user.email != email_anterior:
+            email_filter.add(user.email)
+        invalidate_user(user.email)
+        token_revocations.update(user.id, user.token_version)
+        audit_writer.record("patch", user.id, current_user.id, {"fields": changed_fields(user_patch)})
         return user
     
     except SQLAlchemyError as e:
-        logger.error(f"Erro ao buscar usuário {e}")
+        logger.error("Erro ao buscar usuário %s", e)
         raise HTTPException(status_code=500, detail="Erro interno no servidor")
 
 def activate_user(user_id: int, current_user: User, db: Session):
     try:
-        user = db.query(User).filter(User.id == user_id).first()
+        user = db.query(User).filter(User.id == user_id, NOT_DELETED).first()
     
         if not user:
             logger.error("Usuário não encontrado durante ativação de usuário")
@@ -162,24 +261,28 @@ def activate_user(user_id: int, current_user: User, db: Session):
         if current_user.role == "admin" or current_user.id == user.id:
                 
             if user.is_active == True:
-                logger.error(f"Usuário - ID:{user.id} já está ativo")
+                logger.error("Usuário - ID:%s já está ativo", user.id)
                 return{"message": f"Usuário - ID: {user.id} já está ativo"}
             
             user.is_active = True
+            bump_token_version(user)
             db.commit()
-            logger.info(f"Usuário - ID: {user.id} foi reativado")
+            invalidate_user(user.email)
+            token_revocations.update(user.id, user.token_version)
+            audit_writer.record("activate", user.id, current_user.id)
+            logger.info("Usuário - ID: %s foi reativado", user.id)
             return {"message" : f"Usuário - ID: {user.id} foi reativado com sucesso!"}
 
-        logger.error(f"Usuário - ID: {current_user.id}, teve acesso negado para recurso de ativação")
+        logger.error("Usuário - ID: %s, teve acesso negado para recurso de ativação", current_user.id)
         raise HTTPException(status_code=403, detail="Acesso negado")
     
     except SQLAlchemyError as e:
-        logger.error(f"Erro ao buscar usuário: {e}")
+        logger.error("Erro ao buscar usuário: %s", e)
         raise HTTPException(status_code=500, detail="Erro interno no servidor")
             
 def deactivate_user(user_id: int, current_user: User, db: Session):
     try:
-        user = db.query(User).filter(User.id == user_id).first()
+        user = db.query(User).filter(User.id == user_id, NOT_DELETED).first()
 
         if current_user is None:
             logger.error("Acesso negado a desativação de usuário")
@@ -190,30 +293,34 @@ def deactivate_user(user_id: int, current_user: User, db: Session):
             raise HTTPException(status_code=404, detail="Usuário não encontrado")
                     
         if user.is_active == False:
-            logger.error(f"Usuário - ID:{user.id} já está desativado")
+            logger.error("Usuário - ID:%s já está desativado", user.id)
             return {"message": f"Usuário {user_id} já foi desativado"}
 
         if current_user.role == "admin" or current_user.id == user.id:
             user.is_active = False
+            bump_token_version(user)
             db.commit()
-            logger.info(f"Usuário com ID {user.id} desativado com sucesso.")
+            invalidate_user(user.email)
+            token_revocations.update(user.id, user.token_version)
+            audit_writer.record("deactivate", user.id, current_user.id)
+            logger.info("Usuário com ID %s desativado com sucesso.", user.id)
             return {"message": f"Usuário - ID: {user.id} usuário foi desativado"}
                     
         if current_user.id != user_id:
-            logger.error(f"Usuário - ID: {current_user.id} tentou excluir usuário - ID: {user_id}")
+            logger.error("Usuário - ID: %s tentou excluir usuário - ID: %s", current_user.id, user_id)
             raise HTTPException(status_code=403, detail="Você não tem permissão para desativar um usuário diferente do seu")
     
     except SQLAlchemyError as e:
-        logger.error(f"Erro ao buscar usuário: {e}")
+        logger.error("Erro ao buscar usuário: %s", e)
         raise HTTPException(status_code=500, detail="Erro interno no servidor")      
 
    
 def promote_user_to_admin(user_id: int, current_user: User, db: Session):
     try:  
-        user = db.query(User).filter(User.id == user_id).first()
+        user = db.query(User).filter(User.id == user_id, NOT_DELETED).first()
         
         if current_user.role != "admin":
-            logger.error(f"Usuário {current_user.id} tentou se promover para administrador (operação negada)")
+            logger.error("Usuário %s tentou se promover para administrador (operação negada)", current_user.id)
             raise HTTPException(status_code=403, detail="Apenas admins podem promover outros usuários a admin")
         
         if not user:
@@ -225,12 +332,16 @@ def promote_user_to_admin(user_id: int, current_user: User, db: Session):
             return {"message":  "Usuário já é admin"}
         
         user.role = "admin"
+        bump_token_version(user)
         db.commit()
-        logger.info(f"Usuário promovido a administrador - ID: {user_id}")
+        invalidate_user(user.email)
+        token_revocations.update(user.id, user.token_version)
+        audit_writer.record("promote", user.id, current_user.id)
+        logger.info("Usuário promovido a administrador - ID: %s", user_id)
         return {"message": f"Usuário '{user.name}' promovido a admin com sucesso"}
     
     except SQLAlchemyError as e:
-        logger.error(f"Erro ao buscar usuário {e}")
+        logger.error("Erro ao buscar usuário %s", e)
         raise HTTPException(status_code=500, detail="Erro interno no servidor")
 
 def get_data_current_user(current_user: User):
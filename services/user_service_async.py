@@ -0,0 +1,332 @@
+from datetime import datetime
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from models.user import User, NOT_DELETED
+from schemas.user import UserCreate, UserUpdate, UserPatch
+from core.hashing import create_hash_async
+from core.cache import invalidate_user, list_cache
+from core.revocation import token_revocations, bump_token_version
+from core.audit import audit_writer, changed_fields
+from core.email_filter import email_filter
+import services.change_feed  # noqa: F401
+from core.config import SOFT_DELETE
+from models.refresh_token import RefreshToken
+from services.user_queries import build_list_users_query, paginate
+from typing import Optional
+from pydantic import EmailStr
+from fastapi import HTTPException
+from utils.logger import logger
+
+async def _get_by_id(db: AsyncSession, user_id: int) -> Optional[User]:
+    result = await db.execute(select(User).where(User.id == user_id, NOT_DELETED))
+    return result.scalars().first()
+
+async def create_user(db: AsyncSession, user: UserCreate):
+    try:
+        if user.name == "":
+            logger.error("Erro ao criar usuário")
+            raise HTTPException(status_code=400, detail="Nome não pode ser vazio, preencha seu nome no campo Nome e tente novamente!")
+        if user.email == "":
+            logger.error("Erro ao criar usuário")
+            raise HTTPException(status_code=400, detail="E-mail não pode ser vazio, digite seu e-mail no campo corretamente!")
+        if user.password == "":
+            logger.error("Erro ao criar usuário")
+            raise HTTPException(status_code=400, detail="Senha senha não pode ser vazia, digite a senha criada no campo Senha e tente novamente!")
+
+        if email_filter.ready and email_filter.might_exist(user.email):
+            existente = (await db.execute(select(User.id).where(User.email == user.email))).first()
+            if existente:
+                logger.error("Erro ao criar usuário: e-mail já cadastrado")
+                raise HTTPException(status_code=400, detail="E-mail já cadastrado")
+
+        hashed_pw = await create_hash_async(user.password)
+        db_user = User(name=user.name, email=user.email, password=hashed_pw, role="user")
+        db.add(db_user)
+        await db.commit()
+        list_cache.clear()
+        email_filter.add(db_user.email)
+        await audit_writer.record_async("create", db_user.id, db_user.id)
+        logger.info("Usuário criado com sucesso - Nome: %s, E-mail: %s", user.name, user.email)
+        return db_user
+
+    except IntegrityError:
+        await db.rollback()
+        logger.error("Erro ao criar usuário: e-mail já cadastrado")
+        raise HTTPException(status_code=400, detail="E-mail já cadastrado")
+
+    except SQLAlchemyError as e:
+        logger.error("Erro na conexão com banco de dados ao criar usuário")
+        raise HTTPException(status_code=500, detail="Erro interno no servidor")
+
+async def get_user(db: AsyncSession, user_id: int, current_user: User):
+    try:
+        if current_user.role != "admin" and current_user.id != user_id:
+            logger.error("Operação negada: Usuário %s tentou buscar dados de outro usuário", current_user.id)
+            raise HTTPException(status_code=403, detail="Você não te permissão para acessar os dados de outro usuário")
+
+        user = await _get_by_id(db, user_id)
+        if not user:
+            logger.error("Usuário não encontrado - ID: %s", user_id)
+            raise HTTPException(status_code=404, detail="Usuário não encontrado")
+
+        logger.info("Busca de usuário concluída com sucesso")
+        return user
+
+    except SQLAlchemyError as e:
+        logger.error("Erro ao buscar usuário %s", e)
+        raise HTTPException(status_code=500, detail="Erro interno no servidor")
+
+async def update_user(db: AsyncSession, user_id: int, user_data: UserUpdate, current_user: User):
+    try:
+        user = await _get_by_id(db, user_id)
+        if not user:
+            logger.error("Usuário não encontrado durante a desativação de usuário")
+            raise HTTPException(status_code=404, detail="Usuário não encontrado")
+
+        if current_user.role != "admin" and current_user.id != user.id:
+            logger.error("Permissão negada: Usuário %s tentou atualizar o usuário %s", current_user.id, user_id)
+            raise HTTPException(status_code=403, detail="Você não tem permissão para atualizar este usuário.")
+
+        email_anterior = user.email
+
+        if user_data.name is not None:
+            user.name = user_data.name
+
+        if user_data.email is not None:
+            user.email = user_data.email
+
+        if user_data.password is not None:
+            user.password = await create_hash_async(user_data.password)
+
+        if user_data.password is not None or user.email != email_anterior:
+            bump_token_version(user)
+
+        await db.commit()
+        invalidate_user(email_anterior)
+        if user.email != email_anterior:
+            email_filter.add(user.email)
+        invalidate_user(user.email)
+        token_revocations.update(user.id, user.token_version)
+        await audit_writer.record_async("update", user.id, current_user.id, {"fields": changed_fields(user_data)})
+        logger.info("Usuário atualizado com sucesso - ID: %s", user_id)
+        return {"message": "Usuário atualizado com sucesso"}
+
+    except SQLAlchemyError as e:
+        logger.error("Erro ao buscar usuário %s", e)
+        raise HTTPException(status_code=500, detail="Erro interno no servidor")
+
+async def delete_user(user_id: int, db: AsyncSession, current_user: User):
+    try:
+        user = await _get_by_id(db, user_id)
+
+        if not user:
+            logger.error("Usuário não encontrado para exclusão - ID: %s", user_id)
+            raise HTTPException(status_code=404, detail="Usuário não encontrado.")
+
+        if current_user.role == "admin" and user.id == current_user.id:
+            logger.error("Operação negada: administrador tentou excluir a si mesmo")
+            raise HTTPException(status_code=403, detail="Admins não podem excluir a si mesmos.")
+
+        if current_user.role != "admin" and current_user.id != user_id:
+            logger.error("Usuário %s tentou excluir outro usuário sem permissão", current_user.id)
+            raise HTTPException(status_code=403, detail="Você não tem permissão para excluir este usuário.")
+
+        if current_user.role == "admin" and user.role == "admin" and current_user.id != user.id:
+            logger.error("Operação negada: um administrador tentou excluir outro administrador")
+            raise HTTPException(status_code=403, detail="Você não pode excluir outro administrador.")
+
+        email_removido = user.email
+        if SOFT_DELETE:
+            user.is_deleted = True
+            user.deleted_at = datetime.utcnow()
+            bump_token_version(user)
+        else:
+            await db.execute(delete(RefreshToken).where(RefreshToken.user_id == user.id))
+            await db.delete(user)
+        await db.commit()
+        invalidate_user(email_removido)
+        token_revocations.revoke_user(user_id)
+        await audit_writer.record_async("delete", user_id, current_user.id, {"soft": SOFT_DELETE})
+        logger.info("Usuário deletado com sucesso - ID: %s", user_id)
+        return {"message": "Usuário excluído com sucesso"}
+
+    except SQLAlchemyError as e:
+        logger.error("Erro ao buscar usuário %s", e)
+        raise HTTPException(status_code=500, detail="Erro interno no servidor")
+
+async def list_users(db: AsyncSession, current_user: User, skip: int = 0, limit: int = 10, name: str = None, email: str = None, cursor: str = None, search: str = "contains"):
+    try:
+        if current_user.role != "admin":
+            logger.error("Operação negada: um usuário tentou acessar dados de outro usuário")
+            raise HTTPException(status_code=403, detail="Você não tem permissão para esse recurso")
+
+        query = build_list_users_query(db.get_bind().dialect.name, limit, cursor=cursor, skip=skip, name=name, email=email, search=search)
+        result = await db.execute(query)
+
+        logger.info("Realizada consulta de usuários")
+        return paginate(result.all(), limit)
+
+    except SQLAlchemyError as e:
+        logger.error("Erro ao buscar usuário %s", e)
+        raise HTTPException(status_code=500, detail="Erro interno no servidor")
+
+async def get_user_by_email(db: AsyncSession, user_email: EmailStr) -> Optional[User]:
+    try:
+        generation = email_filter.generation
+        if email_filter.definitely_absent(user_email):
+            return None
+        result = await db.execute(select(User).where(User.email == user_email, NOT_DELETED))
+        user = result.scalars().first()
+        if user is None:
+            email_filter.remember_missing(user_email, generation)
+        return user
+    except SQLAlchemyError as e:
+        logger.error("Erro ao buscar usuário %s", e)
+        raise HTTPException(status_code=500, detail="Erro interno no servidor")
+
+async def update_password_hash(db: AsyncSession, user: User, password_hash: str):
+    try:
+        user.password = password_hash
+        await db.commit()
+        invalidate_user(user.email)
+        logger.info("Hash de senha atualizado para os parâmetros atuais - ID: %s", user.id)
+    except SQLAlchemyError as e:
+        await db.rollback()
+        logger.error("Erro ao atualizar hash de senha %s", e)
+
+async def patch_user(db: AsyncSession, user_id: int, user_patch: UserPatch, current_user: User):
+    try:
+        user = await _get_by_id(db, user_id)
+
+        if not user:
+            logger.error("Usuário não encontrado durante a atualização parcial de usuário")
+            raise HTTPException(status_code=404, detail="Usuário não encontrado")
+
+        if current_user.role != "admin" and current_user.id != user.id:
+            logger.error("Permissão negada: Usuário %s tentou atualizar o usuário %s", current_user.id, user_id)
+            raise HTTPException(status_code=403, detail="Você não tem permissão para atualizar este usuário.")
+
+        email_anterior = user.email
+
+        if user_patch.name is not None:
+            user.name = user_patch.name
+        if user_patch.email is not None:
+            user.email = user_patch.email
+        if user_patch.password is not None:
+            user.password = await create_hash_async(user_patch.password)
+
+        if user_patch.password is not None or user.email != email_anterior:
+            bump_token_version(user)
+
+        await db.commit()
+        invalidate_user(email_anterior)
+        if user.email != email_anterior:
+            email_filter.add(user.email)
+        invalidate_user(user.email)
+        token_revocations.update(user.id, user.token_version)
+        await audit_writer.record_async("patch", user.id, current_user.id, {"fields": changed_fields(user_patch)})
+        return user
+
+    except SQLAlchemyError as e:
+        logger.error("Erro ao buscar usuário %s", e)
+        raise HTTPException(status_code=500, detail="Erro interno no servidor")
+
+async def activate_user(user_id: int, current_user: User, db: AsyncSession):
+    try:
+        user = await _get_by_id(db, user_id)
+
+        if not user:
+            logger.error("Usuário não encontrado durante ativação de usuário")
+            raise HTTPException(status_code=404, detail="Usuário não encontrado")
+
+        if current_user.role == "admin" or current_user.id == user.id:
+
+            if user.is_active == True:
+                logger.error("Usuário - ID:%s já está ativo", user.id)
+                return{"message": f"Usuário - ID: {user.id} já está ativo"}
+
+            user.is_active = True
+            bump_token_version(user)
+            await db.commit()
+            invalidate_user(user.email)
+            token_revocations.update(user.id, user.token_version)
+            await audit_writer.record_async("activate", user.id, current_user.id)
+            logger.info("Usuário - ID: %s foi reativado", user.id)
+            return {"message" : f"Usuário - ID: {user.id} foi reativado com sucesso!"}
+
+        logger.error("Usuário - ID: %s, teve acesso negado para recurso de ativação", current_user.id)
+        raise HTTPException(status_code=403, detail="Acesso negado")
+
+    except SQLAlchemyError as e:
+        logger.error("Erro ao buscar usuário: %s", e)
+        raise HTTPException(status_code=500, detail="Erro interno no servidor")
+
+async def deactivate_user(user_id: int, current_user: User, db: AsyncSession):
+    try:
+        if current_user is None:
+            logger.error("Acesso negado a desativação de usuário")
+            raise HTTPException(status_code=403, detail="Acesso negado")
+
+        user = await _get_by_id(db, user_id)
+
+        if not user:
+            logger.error("Usuário não encontrado durante a desativação de usuário")
+            raise HTTPException(status_code=404, detail="Usuário não encontrado")
+
+        if user.is_active == False:
+            logger.error("Usuário - ID:%s já está desativado", user.id)
+            return {"message": f"Usuário {user_id} já foi desativado"}
+
+        if current_user.role == "admin" or current_user.id == user.id:
+            user.is_active = False
+            bump_token_version(user)
+            await db.commit()
+            invalidate_user(user.email)
+            token_revocations.update(user.id, user.token_version)
+            await audit_writer.record_async("deactivate", user.id, current_user.id)
+            logger.info("Usuário com ID %s desativado com sucesso.", user.id)
+            return {"message": f"Usuário - ID: {user.id} usuário foi desativado"}
+
+        logger.error("Usuário - ID: %s tentou excluir usuário - ID: %s", current_user.id, user_id)
+        raise HTTPException(status_code=403, detail="Você não tem permissão para desativar um usuário diferente do seu")
+
+    except SQLAlchemyError as e:
+        logger.error("Erro ao buscar usuário: %s", e)
+        raise HTTPException(status_code=500, detail="Erro interno no servidor")
+
+async def promote_user_to_admin(user_id: int, current_user: User, db: AsyncSession):
+    try:
+        if current_user.role != "admin":
+            logger.error("Usuário %s tentou se promover para administrador (operação negada)", current_user.id)
+            raise HTTPException(status_code=403, detail="Apenas admins podem promover outros usuários a admin")
+
+        user = await _get_by_id(db, user_id)
+
+        if not user:
+            logger.error("Usuário não encontrado na tentativa de promoção para administrador")
+            raise HTTPException(status_code=404, detail="Usuário não encontrado")
+
+        if user.role == "admin":
+            logger.error("Tentativa inválida: usuário já é administrador")
+            return {"message":  "Usuário já é admin"}
+
+        user.role = "admin"
+        bump_token_version(user)
+        await db.commit()
+        invalidate_user(user.email)
+        token_revocations.update(user.id, user.token_version)
+        await audit_writer.record_async("promote", user.id, current_user.id)
+        logger.info("Usuário promovido a administrador - ID: %s", user_id)
+        return {"message": f"Usuário '{user.name}' promovido a admin com sucesso"}
+
+    except SQLAlchemyError as e:
+        logger.error("Erro ao buscar usuário %s", e)
+        raise HTTPException(status_code=500, detail="Erro interno no servidor")
+
+async def get_data_current_user(current_user: User):
+    if current_user is not None:
+        logger.info("Consulta de dados do usuário logado realizada com sucesso")
+        return current_user
+    logger.error("Usuário não encontrado durante consulta de dados do usuário logado")
+    raise HTTPException(status_code=404, detail="Usuário não encontrado")
@@ -1,16 +1,22 @@
+import os
 import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
+os.environ.setdefault("AUDIT_ENABLED", "false")
+
 from main import app
 from core.database import Base, get_db
+from core.metrics import instrument_engine
+from core.email_filter import email_filter
 
 SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
 
 engine = create_engine(
     SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
 )
-TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine, expire_on_commit=False)
+instrument_engine(engine)
 
 
 Base.metadata.create_all(bind=engine)
@@ -29,3 +35,11 @@ app.dependency_overrides[get_db] = override_get_db
 def client():
     with TestClient(app) as c:
         yield c
+
+
+@pytest.fixture(autouse=True)
+def email_filter_off(monkeypatch):
+    email_filter.reset()
+    monkeypatch.setattr(email_filter, "enabled", False)
+    yield
+    email_filter.reset()
@@ -0,0 +1,76 @@
+import asyncio
+import threading
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from core.database import Base
+from core.audit import AuditWriter
+from models.audit_event import AuditEvent
+from services.audit_service import list_audit_events
+
+engine = create_engine("sqlite:///./test_audit.db", connect_args={"check_same_thread": False})
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+@pytest.fixture(scope="function")
+def db():
+    Base.metadata.create_all(bind=engine)
+    db = TestingSessionLocal()
+    yield db
+    db.close()
+    Base.metadata.drop_all(bind=engine)
+
+
+def test_full_buffer_flushes_inline_and_pages_by_cursor(db):
+    writer = AuditWriter(TestingSessionLocal, buffer_size=3, batch_size=2, overflow_policy="flush")
+    for user_id in range(1, 6):
+        writer.record("update", user_id, 1, {"fields": ["name"]})
+
+    assert writer.stats()["inline_flushes"] == 1
+    assert db.query(AuditEvent).count() == 2
+
+    writer.flush_all()
+    assert writer.stats()["buffered"] == 0
+    assert db.query(AuditEvent).count() == 5
+
+    pagina = list_audit_events(db, limit=3, action="update")
+    assert [e.target_id for e in pagina["items"]] == [5, 4, 3]
+    pagina = list_audit_events(db, limit=3, action="update", cursor=pagina["next_cursor"])
+    assert [e.target_id for e in pagina["items"]] == [2, 1]
+    assert pagina["next_cursor"] is None
+
+    assert [e.target_id for e in list_audit_events(db, user_id=4)["items"]] == [4]
+
+
+def test_drop_policy_discards_when_full(db):
+    writer = AuditWriter(TestingSessionLocal, buffer_size=2, batch_size=10, overflow_policy="drop")
+    for user_id in range(4):
+        writer.record("delete", user_id)
+
+    assert writer.stats()["dropped"] == 2
+    assert writer.flush_all() == 2
+
+
+def test_record_async_flushes_off_the_event_loop(db):
+    writer = AuditWriter(TestingSessionLocal, buffer_size=2, batch_size=10, overflow_policy="flush")
+    flush_threads = []
+    flush_original = writer.flush
+
+    def flush():
+        flush_threads.append(threading.get_ident())
+        return flush_original()
+
+    writer.flush = flush
+
+    async def gravar():
+        for user_id in range(3):
+            await writer.record_async("update", user_id, 1)
+        return threading.get_ident()
+
+    loop_thread = asyncio.run(gravar())
+
+    assert writer.stats()["inline_flushes"] == 1
+    assert flush_threads and loop_thread not in flush_threads
+    assert db.query(AuditEvent).count() == 2
+    assert writer.flush_all() == 1
@@ -0,0 +1,31 @@
+from types import SimpleNamespace
+import pytest
+from fastapi import HTTPException
+from services.batch_service import check_batch_request, plan_batch, summarize_batch
+
+admin = SimpleNamespace(id=1, role="admin")
+comum = SimpleNamespace(id=2, role="user")
+rows = [
+    SimpleNamespace(id=1, email="admin@admin.com", role="admin", is_active=True, token_version=0),
+    SimpleNamespace(id=2, email="ana@exemplo.com", role="user", is_active=True, token_version=0),
+    SimpleNamespace(id=3, email="bruno@exemplo.com", role="user", is_active=False, token_version=0),
+]
+
+
+def test_plan_batch_applies_per_row_rules():
+    resultados, alvos = plan_batch("delete", [1, 2, 4], rows, admin)
+
+    assert [r["status"] for r in resultados] == ["forbidden", "deleted", "not_found"]
+    assert [row.id for row in alvos] == [2]
+    assert summarize_batch("delete", resultados)["changed"] == 1
+
+    resultados, alvos = plan_batch("deactivate", [2, 3], rows, comum)
+    assert [r["status"] for r in resultados] == ["updated", "forbidden"]
+
+
+def test_check_batch_request_deduplicates_and_guards_promote():
+    assert check_batch_request("activate", [3, 2, 3], admin) == [3, 2]
+
+    with pytest.raises(HTTPException) as exc:
+        check_batch_request("promote", [3], comum)
+    assert exc.value.status_code == 403
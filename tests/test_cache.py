@@ -0,0 +1,47 @@
+import time
+from core.cache import TTLCache
+
+
+def test_ttl_cache_hits_and_misses():
+    cache = TTLCache(max_size=10, ttl=60)
+
+    assert cache.get("a@a.com") is None
+    cache.set("a@a.com", "usuario")
+    assert cache.get("a@a.com") == "usuario"
+
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+
+
+def test_ttl_cache_evicts_least_recently_used():
+    cache = TTLCache(max_size=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.stats()["evictions"] == 1
+
+
+def test_ttl_cache_expires_and_invalidates():
+    cache = TTLCache(max_size=10, ttl=0.01)
+    cache.set("a", 1)
+    cache.ttl = 60
+    cache.set("b", 2)
+    cache.invalidate("b")
+
+    time.sleep(0.02)
+    assert cache.get("a") is None
+    assert cache.get("b") is None
+
+
+def test_ttl_cache_skips_set_from_stale_generation():
+    cache = TTLCache(max_size=10, ttl=60)
+    generation = cache.generation
+    cache.clear()
+    cache.set("pagina", b"antiga", generation=generation)
+
+    assert cache.get("pagina") is None
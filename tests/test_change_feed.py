@@ -0,0 +1,54 @@
+import pytest
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import sessionmaker
+
+from models.user import Base, User
+from models.user_change import UserChange
+from services.change_feed import acknowledge, build_changes_query, compact_user_changes
+
+engine = create_engine("sqlite:///./test_change_feed.db", connect_args={"check_same_thread": False})
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+@pytest.fixture(scope="function")
+def db():
+    Base.metadata.create_all(bind=engine)
+    db = TestingSessionLocal()
+    yield db
+    db.close()
+    Base.metadata.drop_all(bind=engine)
+
+
+def ops(db, after=0):
+    return [(change.op, change.version) for change in db.execute(build_changes_query(after, 100)).scalars()]
+
+
+def test_mutations_write_outbox_rows_in_the_same_transaction(db):
+    ana = User(name="Ana", email="ana@exemplo.com", password="x")
+    db.add(ana)
+    db.commit()
+
+    ana.name = "Ana Maria"
+    db.commit()
+
+    ana.is_deleted = True
+    db.commit()
+
+    ana.name = "Descartado"
+    db.flush()
+    db.rollback()
+
+    assert ops(db) == [("create", 1), ("update", 2), ("delete", 3)]
+
+
+def test_compaction_removes_entries_acknowledged_by_every_consumer(db):
+    db.add_all([User(name=f"U{i}", email=f"u{i}@exemplo.com", password="x") for i in range(4)])
+    db.commit()
+
+    acknowledge(db, "billing", 3)
+    acknowledge(db, "search", 2)
+    assert compact_user_changes(db) == 2
+
+    acknowledge(db, "search", 4)
+    assert compact_user_changes(db) == 1
+    assert db.execute(select(UserChange.seq)).scalars().all() == [4]
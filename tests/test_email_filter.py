@@ -0,0 +1,91 @@
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from core.cache import TTLCache
+from core.email_filter import BloomFilter, EmailFilter
+from models.user import Base, User
+
+engine = create_engine("sqlite:///./test_email_filter.db", connect_args={"check_same_thread": False})
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+@pytest.fixture(scope="function")
+def db():
+    Base.metadata.create_all(bind=engine)
+    db = TestingSessionLocal()
+    yield db
+    db.close()
+    Base.metadata.drop_all(bind=engine)
+
+
+def test_bloom_filter_has_no_false_negatives_and_respects_error_rate():
+    bloom = BloomFilter(10000, 0.01)
+    for i in range(10000):
+        bloom.add(f"user{i}@exemplo.com")
+
+    assert all(f"user{i}@exemplo.com" in bloom for i in range(10000))
+    falsos = sum(f"outro{i}@exemplo.com" in bloom for i in range(10000))
+    assert falsos / 10000 < 0.02
+    assert bloom.false_positive_rate() < 0.02
+
+
+def test_filter_skips_unknown_emails_and_caches_misses(db):
+    db.add_all([User(name="Ana", email="ana@exemplo.com", password="x"), User(name="Bia", email="bia@exemplo.com", password="x", is_deleted=True)])
+    db.commit()
+    email_filter = EmailFilter(True, 1000, 0.001, TTLCache(100, 60))
+
+    assert not email_filter.definitely_absent("ghost@exemplo.com")
+    email_filter.build(db)
+
+    assert email_filter.definitely_absent("ghost@exemplo.com")
+    assert not email_filter.definitely_absent("ana@exemplo.com")
+    assert not email_filter.definitely_absent("bia@exemplo.com")
+
+    email_filter.remember_missing("bia@exemplo.com", email_filter.generation)
+    assert email_filter.definitely_absent("bia@exemplo.com")
+    assert email_filter.stats()["false_positives"] == 1
+
+
+def test_add_invalidates_misses_recorded_before_it(db):
+    email_filter = EmailFilter(True, 1000, 0.001, TTLCache(100, 60))
+    email_filter.build(db)
+
+    generation = email_filter.generation
+    email_filter.add("novo@exemplo.com")
+    email_filter.remember_missing("novo@exemplo.com", generation)
+
+    assert not email_filter.definitely_absent("novo@exemplo.com")
+
+
+def test_api_finds_users_inserted_by_another_process_after_sync(client, monkeypatch):
+    import re
+    from core.email_filter import email_filter
+    from core.security import create_token_access
+    from tests.conftest import TestingSessionLocal, engine as api_engine
+
+    Base.metadata.drop_all(bind=api_engine)
+    Base.metadata.create_all(bind=api_engine)
+    monkeypatch.setattr(email_filter, "enabled", True)
+    monkeypatch.setattr(email_filter, "bloom", None)
+    url = "/api/v1/endpoints/auth/protected-route"
+    headers = {"Authorization": f"Bearer {create_token_access({'sub': 'externo@exemplo.com'})}"}
+
+    session = TestingSessionLocal()
+    try:
+        email_filter.build(session)
+        response = client.get(url, headers=headers)
+        assert response.status_code == 401
+        assert re.search(r'desc="0 queries"', response.headers["Server-Timing"])
+
+        session.add(User(name="Externo", email="externo@exemplo.com", password="x"))
+        session.commit()
+        email_filter.sync(session)
+    finally:
+        session.close()
+
+    assert client.get(url, headers=headers).status_code == 200
+    assert email_filter.stats()["topped_up"] == 1
+    assert email_filter.stats()["rebuilds"] == 1
+    Base.metadata.drop_all(bind=api_engine)
+    Base.metadata.create_all(bind=api_engine)
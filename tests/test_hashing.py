@@ -0,0 +1,51 @@
+import asyncio
+import pytest
+from fastapi import HTTPException
+
+import core.hashing as hashing
+
+
+def test_create_hash_async_and_verify():
+    hashed = asyncio.run(hashing.create_hash_async("senha123"))
+
+    assert asyncio.run(hashing.verify_password_async("senha123", hashed))
+    assert not hashing.verify_password("senha_errada", hashed)
+
+    metrics = hashing.get_hash_metrics()
+    assert metrics["completed"] >= 3
+    assert metrics["compute_seconds"] > 0
+
+
+def test_hash_queue_limit_returns_503(monkeypatch):
+    monkeypatch.setattr(hashing, "HASH_WORKERS", 1)
+    monkeypatch.setattr(hashing, "HASH_QUEUE_LIMIT", 0)
+
+    with pytest.raises(HTTPException) as exc:
+        hashing.create_hash("senha123")
+
+    assert exc.value.status_code == 503
+
+
+
+def test_create_hash_many_respects_queue_limit(monkeypatch):
+    monkeypatch.setattr(hashing, "HASH_WORKERS", 1)
+    monkeypatch.setattr(hashing, "HASH_QUEUE_LIMIT", 0)
+    rejeitados = hashing.get_hash_metrics()["rejected"]
+
+    with pytest.raises(HTTPException) as exc:
+        hashing.create_hash_many(["senha123", "senha456"])
+
+    assert exc.value.status_code == 503
+    assert hashing.get_hash_metrics()["rejected"] == rejeitados + 1
+
+def test_verify_and_update_rehashes_with_new_params(monkeypatch):
+    monkeypatch.setattr(hashing, "HASH_WORKERS", 0)
+    antigo = hashing.build_crypt_context({**hashing.hash_params, "scheme": "bcrypt", "bcrypt_rounds": 4}).hash("senha123")
+    monkeypatch.setattr(hashing, "pwd_context", hashing.build_crypt_context({**hashing.hash_params, "scheme": "bcrypt", "bcrypt_rounds": 5}))
+
+    assert hashing.needs_rehash(antigo)
+    valido, novo_hash = asyncio.run(hashing.verify_and_update_async("senha123", antigo))
+
+    assert valido
+    assert novo_hash.startswith("$2b$05$")
+    assert not hashing.needs_rehash(novo_hash)
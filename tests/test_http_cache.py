@@ -0,0 +1,13 @@
+from types import SimpleNamespace
+from core.http_cache import etag_matches, user_etag
+
+
+def test_user_etag_follows_row_version():
+    user = SimpleNamespace(id=7, version=3)
+    assert user_etag(user) == '"u7-v3"'
+
+    assert etag_matches('"u7-v3"', user_etag(user))
+    assert etag_matches('W/"u7-v3", "outro"', user_etag(user))
+    assert etag_matches("*", user_etag(user))
+    assert not etag_matches('"u7-v2"', user_etag(user))
+    assert not etag_matches(None, user_etag(user))
@@ -0,0 +1,61 @@
+import io
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from models.user import Base, User
+from services.import_service import import_users, parse_rows
+
+engine = create_engine("sqlite:///./test_import.db", connect_args={"check_same_thread": False})
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+@pytest.fixture(scope="function")
+def db():
+    Base.metadata.create_all(bind=engine)
+    db = TestingSessionLocal()
+    db.add(User(name="Existente", email="existente@exemplo.com", password="x"))
+    db.commit()
+    yield db
+    db.close()
+    Base.metadata.drop_all(bind=engine)
+
+
+def test_import_users_reports_row_errors_without_aborting(db):
+    arquivo = io.StringIO(
+        "name,email,password\n"
+        "Ana,ana@exemplo.com,senha1\n"
+        "Repetido,existente@exemplo.com,senha2\n"
+        "Sem Email,nao-e-email,senha3\n"
+        "Bruno,bruno@exemplo.com,senha4\n"
+        "Ana de novo,ana@exemplo.com,senha5\n"
+    )
+
+    report = import_users(db, parse_rows(arquivo, "csv"), batch_size=2)
+
+    assert report["total"] == 5
+    assert report["created"] == 2
+    assert [erro["line"] for erro in report["errors"]] == [3, 4, 6]
+    assert db.query(User).count() == 3
+
+
+def test_import_users_reports_rows_with_extra_columns(db):
+    arquivo = io.StringIO(
+        "name,email,password\n"
+        "Ana,ana@exemplo.com,senha1,sobra\n"
+        "Bruno,bruno@exemplo.com,senha2\n"
+    )
+
+    report = import_users(db, parse_rows(arquivo, "csv"), batch_size=10)
+
+    assert report["created"] == 1
+    assert report["errors"] == [{"line": 2, "email": "ana@exemplo.com", "error": "Linha com mais colunas que o cabeçalho"}]
+
+
+@pytest.mark.parametrize("batch_size", [0, -1])
+def test_import_users_rejects_invalid_batch_size(db, batch_size):
+    from fastapi import HTTPException
+
+    with pytest.raises(HTTPException) as exc:
+        import_users(db, iter([]), batch_size=batch_size)
+    assert exc.value.status_code == 400
@@ -0,0 +1,39 @@
+import logging
+import queue
+
+from utils.logger import BoundedQueueHandler, get_log_metrics
+
+
+def _record(mensagem):
+    return logging.LogRecord("teste", logging.INFO, __file__, 1, mensagem, None, None)
+
+
+def test_bounded_queue_handler_drops_new_records_when_full():
+    handler = BoundedQueueHandler(queue.Queue(1), "drop_new")
+    antes = get_log_metrics()["dropped"]
+
+    handler.emit(_record("primeiro"))
+    handler.emit(_record("segundo"))
+
+    assert handler.queue.get_nowait().msg == "primeiro"
+    assert get_log_metrics()["dropped"] == antes + 1
+
+
+def test_bounded_queue_handler_drop_oldest_keeps_latest():
+    handler = BoundedQueueHandler(queue.Queue(1), "drop_oldest")
+
+    handler.emit(_record("primeiro"))
+    handler.emit(_record("segundo"))
+
+    assert handler.queue.get_nowait().msg == "segundo"
+
+
+def test_records_are_not_formatted_on_the_caller_thread():
+    handler = BoundedQueueHandler(queue.Queue(1), "drop_new")
+    record = logging.LogRecord("teste", logging.INFO, __file__, 1, "Usuário %s", (42,), None)
+
+    handler.emit(record)
+
+    enfileirado = handler.queue.get_nowait()
+    assert enfileirado.args == (42,)
+    assert enfileirado.getMessage() == "Usuário 42"
@@ -0,0 +1,65 @@
+import re
+import pytest
+
+from core.cache import list_cache, principal_cache
+from core.database import Base
+from core.security import create_token_access
+from tests.conftest import engine
+
+PREFIX = "/api/v1/endpoints"
+
+
+@pytest.fixture
+def api(client):
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    yield client
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+
+
+def queries(response) -> int:
+    return int(re.search(r'desc="(\d+) queries"', response.headers["Server-Timing"]).group(1))
+
+
+def bearer(email: str) -> dict:
+    return {"Authorization": f"Bearer {create_token_access({'sub': email})}"}
+
+
+def test_each_endpoint_runs_the_minimum_number_of_statements(api):
+    criado = api.post(f"{PREFIX}/user/0", json={"name": "Ana", "email": "ana@exemplo.com", "password": "segredo1"})
+    assert criado.status_code == 200
+    assert queries(criado) == 2
+
+    user_id = criado.json()["id"]
+    headers = bearer("ana@exemplo.com")
+    esperado = [
+        ("GET", f"{PREFIX}/user/{user_id}", None, 2),
+        ("PUT", f"{PREFIX}/user/{user_id}", {"name": "Ana Maria"}, 4),
+        ("PATCH", f"{PREFIX}/users/{user_id}", {"name": "Ana B"}, 4),
+        ("PATCH", f"{PREFIX}/users/{user_id}/deactivate", None, 4),
+        ("PATCH", f"{PREFIX}/users/{user_id}/activate", None, 4),
+        ("GET", f"{PREFIX}/auth/protected-route", None, 1),
+    ]
+    for method, url, body, total in esperado:
+        principal_cache.clear()
+        list_cache.clear()
+        response = api.request(method, url, headers=headers, json=body)
+        assert response.status_code == 200, (url, response.text)
+        assert queries(response) == total, url
+
+
+def test_cached_principal_skips_the_lookup(api):
+    user_id = api.post(f"{PREFIX}/user/0", json={"name": "Bia", "email": "bia@exemplo.com", "password": "segredo1"}).json()["id"]
+    headers = bearer("bia@exemplo.com")
+    principal_cache.clear()
+
+    assert queries(api.get(f"{PREFIX}/user/{user_id}", headers=headers)) == 2
+    assert queries(api.get(f"{PREFIX}/user/{user_id}", headers=headers)) == 1
+
+
+@pytest.mark.parametrize("limit", [0, -1, 100000])
+def test_list_rejects_out_of_range_limit(api, limit):
+    api.post(f"{PREFIX}/user/0", json={"name": "Ana", "email": "ana@exemplo.com", "password": "segredo1"})
+    response = api.get(f"{PREFIX}/users/", params={"limit": limit}, headers=bearer("ana@exemplo.com"))
+    assert response.status_code == 422
@@ -0,0 +1,56 @@
+import pytest
+from fastapi import HTTPException
+from core.rate_limit import LoginRateLimiter, MemoryRateLimitBackend
+
+
+def make_limiter():
+    backend = MemoryRateLimitBackend(max_keys=100, max_hits_per_key=10)
+    return LoginRateLimiter(backend, window=60, max_per_ip=10, max_per_email=3, lockout=30, lockout_max=120)
+
+
+def test_login_limiter_locks_email_after_failures():
+    limiter = make_limiter()
+    for _ in range(3):
+        limiter.check("10.0.0.1", "ana@exemplo.com")
+        limiter.record_failure("10.0.0.1", "ana@exemplo.com")
+
+    with pytest.raises(HTTPException) as exc:
+        limiter.check("10.0.0.2", "ANA@exemplo.com")
+
+    assert exc.value.status_code == 429
+    assert int(exc.value.headers["Retry-After"]) <= 30
+    limiter.check("10.0.0.1", "bruno@exemplo.com")
+    assert limiter.stats()["rejected"] == 1
+
+
+def test_login_limiter_lockout_grows_exponentially():
+    limiter = make_limiter()
+    for _ in range(3):
+        limiter.record_failure("10.0.0.1", "ana@exemplo.com")
+    primeiro, _ = limiter.backend.get_lockout("email:ana@exemplo.com")
+
+    limiter.record_failure("10.0.0.1", "ana@exemplo.com")
+    segundo, strikes = limiter.backend.get_lockout("email:ana@exemplo.com")
+
+    assert strikes == 2
+    assert segundo - primeiro >= 29
+
+    limiter.record_success("10.0.0.1", "ana@exemplo.com")
+    assert limiter.backend.get_lockout("email:ana@exemplo.com") == (0.0, 0)
+
+
+def test_incomplete_backend_fails_on_instantiation():
+    from core.rate_limit import RateLimitBackend
+
+    class SemReset(RateLimitBackend):
+        def hit(self, key, window):
+            return 0
+
+        def get_lockout(self, key):
+            return 0.0, 0
+
+        def set_lockout(self, key, until, strikes, ttl):
+            pass
+
+    with pytest.raises(TypeError):
+        SemReset()
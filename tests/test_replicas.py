@@ -0,0 +1,48 @@
+import pytest
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import sessionmaker
+
+from core import database
+from core.database import ReplicaSet, RoutingSession
+from models.user import Base, User
+
+primary = create_engine("sqlite:///./test_primary.db", connect_args={"check_same_thread": False})
+replica = create_engine("sqlite:///./test_replica.db", connect_args={"check_same_thread": False})
+
+
+@pytest.fixture
+def session_factory():
+    for db_engine in (primary, replica):
+        Base.metadata.create_all(bind=db_engine)
+    replicas = ReplicaSet([replica])
+    yield sessionmaker(bind=primary, class_=RoutingSession, replicas=replicas), replicas
+    for db_engine in (primary, replica):
+        Base.metadata.drop_all(bind=db_engine)
+
+
+def emails(db):
+    return db.execute(select(User.email)).scalars().all()
+
+
+def test_reads_go_to_replica_only_in_read_only_context(session_factory):
+    factory, replicas = session_factory
+    db = factory()
+    db.add(User(name="Ana", email="ana@exemplo.com", password="x"))
+    db.commit()
+
+    assert emails(db) == ["ana@exemplo.com"]
+
+    token = database._read_only.set(True)
+    try:
+        assert emails(db) == []
+        assert replicas.stats()["r0"]["routed"] == 1
+
+        replicas.mark(0, False)
+        assert emails(db) == ["ana@exemplo.com"]
+
+        replicas.mark(0, True)
+        database.use_primary(db)
+        assert emails(db) == ["ana@exemplo.com"]
+    finally:
+        database._read_only.reset(token)
+        db.close()
@@ -0,0 +1,41 @@
+from core.revocation import TokenRevocationTable
+
+
+def test_revocation_table_rejects_older_versions():
+    table = TokenRevocationTable()
+    assert not table.is_revoked(1, 0)
+
+    table.update(1, 2)
+    table.update(1, 1)
+    assert table.is_revoked(1, 1)
+    assert not table.is_revoked(1, 2)
+
+    table.revoke_user(1)
+    assert table.is_revoked(1, 2)
+    assert table.stats()["rejected"] == 2
+
+
+def test_refresh_only_reads_users_changed_since_last_run(tmp_path):
+    from datetime import datetime, timedelta
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+    from models.user import Base, User
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'revocation.db'}")
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    antigo = datetime.utcnow() - timedelta(hours=1)
+    db.add_all([User(name=f"U{i}", email=f"u{i}@exemplo.com", password="x", token_version=2, updated_at=antigo) for i in range(3)])
+    db.commit()
+
+    table = TokenRevocationTable()
+    table.refresh(db)
+    assert table.stats()["last_refresh_rows"] == 3
+
+    user = db.query(User).filter(User.email == "u0@exemplo.com").one()
+    user.token_version = 5
+    db.commit()
+    table.refresh(db)
+    assert table.stats()["last_refresh_rows"] == 1
+    assert table.is_revoked(user.id, 4)
+    db.close()
@@ -0,0 +1,19 @@
+from sqlalchemy import create_engine
+
+from core.database import Base, SCHEMA_VERSION, get_schema_version, mark_schema_version
+
+engine = create_engine("sqlite:///./test_schema_version.db", connect_args={"check_same_thread": False})
+
+
+def test_schema_version_marker():
+    Base.metadata.drop_all(bind=engine)
+    assert get_schema_version(engine) is None
+
+    Base.metadata.create_all(bind=engine)
+    assert get_schema_version(engine) is None
+
+    mark_schema_version(engine)
+    mark_schema_version(engine)
+    assert get_schema_version(engine) == SCHEMA_VERSION
+
+    Base.metadata.drop_all(bind=engine)
@@ -0,0 +1,106 @@
+import multiprocessing
+
+from core.cache import TTLCache
+from core.revocation import TokenRevocationTable
+from core.shared_state import SharedMemoryState
+
+
+def _bump(path: str, vezes: int):
+    state = SharedMemoryState(path, 64)
+    for _ in range(vezes):
+        state.incr("contador")
+
+
+def test_shared_memory_counters_across_processes(tmp_path):
+    path = str(tmp_path / "state")
+    processos = [multiprocessing.Process(target=_bump, args=(path, 50)) for _ in range(3)]
+    for processo in processos:
+        processo.start()
+    for processo in processos:
+        processo.join()
+
+    assert SharedMemoryState(path, 64).get("contador") == 150
+
+
+def test_cache_invalidation_reaches_other_workers(tmp_path):
+    path = str(tmp_path / "state")
+    worker_a = TTLCache(10, 60, "list", SharedMemoryState(path, 64))
+    worker_b = TTLCache(10, 60, "list", SharedMemoryState(path, 64))
+    worker_a.set("pagina", 1)
+    worker_b.set("pagina", 1)
+
+    worker_a.clear()
+    worker_b.sync()
+    assert worker_b.get("pagina") is None
+    assert worker_b.stats()["remote_invalidations"] == 1
+
+    worker_a.set("pagina", 2)
+    worker_a.sync()
+    assert worker_a.get("pagina") == 2
+
+
+def test_revocations_reach_other_workers(tmp_path):
+    path = str(tmp_path / "state")
+    worker_a = TokenRevocationTable(SharedMemoryState(path, 64))
+    worker_b = TokenRevocationTable(SharedMemoryState(path, 64))
+
+    worker_a.update(7, 3)
+    worker_a.revoke_user(8)
+    worker_b.sync()
+    assert worker_b.is_revoked(7, 2)
+    assert not worker_b.is_revoked(7, 3)
+    assert worker_b.is_revoked(8, 100)
+
+
+def test_full_table_evicts_expired_entries_and_keeps_counters(tmp_path, monkeypatch):
+    import core.shared_state as modulo
+
+    agora = [1000.0]
+    monkeypatch.setattr(modulo.time, "time", lambda: agora[0])
+    state = SharedMemoryState(str(tmp_path / "state"), 16, ttl=60)
+    area = state.slots
+
+    assert all(state.max_update("token_revocations", user_id, 1) for user_id in range(area))
+    assert not state.max_update("token_revocations", area, 1)
+    assert state.incr("cache:principal") == 1
+
+    agora[0] += 61
+    assert state.max_update("token_revocations", area, 1)
+    assert state.items("token_revocations") == {area: 1}
+    assert state.stats()["overflows"] == 1
+
+
+def test_revocation_overflow_falls_back_to_database(tmp_path, monkeypatch):
+    path = str(tmp_path / "state")
+    worker_a = TokenRevocationTable(SharedMemoryState(path, 16))
+    worker_b = TokenRevocationTable(SharedMemoryState(path, 16))
+    monkeypatch.setattr(worker_a.shared, "max_update", lambda *args: False)
+    atualizados = []
+    monkeypatch.setattr(worker_b, "refresh", lambda db: atualizados.append(db))
+
+    worker_a.update(7, 3)
+    worker_b.sync("sessao")
+    assert atualizados == ["sessao"]
+    worker_b.sync("sessao")
+    assert atualizados == ["sessao"]
+
+
+def test_incomplete_backend_fails_on_instantiation():
+    import pytest
+    from core.shared_state import SharedState
+
+    class SemItems(SharedState):
+        def incr(self, name):
+            return 1
+
+        def get(self, name):
+            return 0
+
+        def max_update(self, name, key, value):
+            return True
+
+        def reset(self):
+            pass
+
+    with pytest.raises(TypeError):
+        SemItems()
@@ -0,0 +1,63 @@
+from datetime import datetime, timedelta
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+import services.user_service as user_service
+import services.batch_service as batch_service
+from models.user import Base, User
+from models.refresh_token import RefreshToken
+from services.token_service import build_refresh_token
+from services.user_service import delete_user, get_user_by_email, purge_deleted_users
+
+engine = create_engine("sqlite:///./test_soft_delete.db", connect_args={"check_same_thread": False})
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+@pytest.fixture(scope="function")
+def db():
+    Base.metadata.create_all(bind=engine)
+    db = TestingSessionLocal()
+    db.add_all([
+        User(name="Admin", email="admin@exemplo.com", password="x", role="admin"),
+        User(name="Ana", email="ana@exemplo.com", password="x"),
+        User(name="Bruno", email="bruno@exemplo.com", password="x"),
+    ])
+    db.commit()
+    yield db
+    db.close()
+    Base.metadata.drop_all(bind=engine)
+
+
+def test_delete_user_marks_tombstone_and_purge_removes_it(db):
+    admin = get_user_by_email(db, "admin@exemplo.com")
+    ana = get_user_by_email(db, "ana@exemplo.com")
+    bruno = get_user_by_email(db, "bruno@exemplo.com")
+
+    delete_user(ana.id, db, admin)
+    delete_user(bruno.id, db, admin)
+
+    assert get_user_by_email(db, "ana@exemplo.com") is None
+    assert db.query(User).count() == 3
+
+    db.query(User).filter(User.email == "ana@exemplo.com").update({"deleted_at": datetime.utcnow() - timedelta(days=60)})
+    db.commit()
+
+    assert purge_deleted_users(db, retention_days=30, batch_size=1) == 1
+    assert db.query(User).count() == 2
+
+
+def test_hard_delete_removes_refresh_tokens(db, monkeypatch):
+    monkeypatch.setattr(user_service, "SOFT_DELETE", False)
+    monkeypatch.setattr(batch_service, "SOFT_DELETE", False)
+    admin = get_user_by_email(db, "admin@exemplo.com")
+    ana = get_user_by_email(db, "ana@exemplo.com")
+    bruno = get_user_by_email(db, "bruno@exemplo.com")
+    db.add_all([build_refresh_token(user)[1] for user in (admin, ana, bruno)])
+    db.commit()
+
+    delete_user(ana.id, db, admin)
+    batch_service.run_batch(db, "delete", [bruno.id], admin)
+
+    assert db.query(User).count() == 1
+    assert [t.user_id for t in db.query(RefreshToken)] == [admin.id]
@@ -0,0 +1,49 @@
+from datetime import datetime, timedelta
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from models.user import Base, User
+from models.refresh_token import RefreshToken
+from services.token_service import issue_refresh_token, rotate_refresh_token, purge_expired_refresh_tokens
+
+engine = create_engine("sqlite:///./test_tokens.db", connect_args={"check_same_thread": False})
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+@pytest.fixture(scope="function")
+def db():
+    Base.metadata.create_all(bind=engine)
+    db = TestingSessionLocal()
+    db.add(User(name="Ana", email="ana@exemplo.com", password="x"))
+    db.commit()
+    yield db
+    db.close()
+    Base.metadata.drop_all(bind=engine)
+
+
+def test_refresh_token_rotation_detects_reuse(db):
+    user = db.query(User).first()
+    original = issue_refresh_token(db, user)
+
+    _, rotacionado = rotate_refresh_token(db, original)
+    assert rotacionado != original
+
+    with pytest.raises(HTTPException) as erro:
+        rotate_refresh_token(db, original)
+    assert erro.value.detail == "Refresh token reutilizado"
+
+    with pytest.raises(HTTPException):
+        rotate_refresh_token(db, rotacionado)
+
+
+def test_purge_removes_only_expired_tokens(db):
+    user = db.query(User).first()
+    issue_refresh_token(db, user)
+    issue_refresh_token(db, user)
+    db.query(RefreshToken).filter(RefreshToken.id == 1).update({"expires_at": datetime.utcnow() - timedelta(days=1)})
+    db.commit()
+
+    assert purge_expired_refresh_tokens(db) == 1
+    assert db.query(RefreshToken).count() == 1
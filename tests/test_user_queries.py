@@ -0,0 +1,72 @@
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+import services.user_queries as user_queries
+from core.database import create_search_index
+from models.user import Base, User
+from services.user_queries import build_list_users_query, decode_cursor, encode_cursor, paginate
+
+engine = create_engine("sqlite:///./test_queries.db", connect_args={"check_same_thread": False})
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+@pytest.fixture(scope="function")
+def db():
+    Base.metadata.create_all(bind=engine)
+    create_search_index(engine)
+    db = TestingSessionLocal()
+    for i in range(1, 26):
+        db.add(User(name=f"Usuario {i:02d}", email=f"user{i:02d}@exemplo.com", password="x"))
+    db.add(User(name="Maria Silva", email="maria@outro.com", password="x"))
+    db.commit()
+    yield db
+    db.close()
+    Base.metadata.drop_all(bind=engine)
+    with engine.begin() as conn:
+        conn.exec_driver_sql("DROP TABLE IF EXISTS users_fts")
+
+
+def _page(db, limit, **kwargs):
+    query = build_list_users_query("sqlite", limit, **kwargs)
+    return paginate(db.execute(query).all(), limit)
+
+
+def test_cursor_round_trip():
+    assert decode_cursor(encode_cursor(42)) == 42
+
+    with pytest.raises(HTTPException) as exc:
+        decode_cursor("nao-e-um-cursor")
+    assert exc.value.status_code == 400
+
+
+def test_keyset_pagination_walks_all_rows(db):
+    ids = []
+    cursor = None
+    while True:
+        page = _page(db, 10, cursor=cursor)
+        ids.extend(user.id for user in page["items"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+
+    assert ids == sorted(ids)
+    assert len(ids) == 26
+
+
+def test_email_prefix_search(db):
+    page = _page(db, 50, email="user1", search="prefix")
+
+    assert [user.email for user in page["items"]] == [f"user{i}@exemplo.com" for i in range(10, 20)]
+
+
+def test_name_fulltext_search(db, monkeypatch):
+    monkeypatch.setattr(user_queries, "FULLTEXT_SEARCH", True)
+    page = _page(db, 50, name="silv")
+
+    assert [user.name for user in page["items"]] == ["Maria Silva"]
+
+
+def test_paginate_tolerates_non_positive_limit():
+    assert paginate([], 0) == {"items": [], "next_cursor": None}
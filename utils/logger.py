@@ -1,18 +1,148 @@
+import atexit
+import json
 import logging
+import logging.handlers
+import queue
+import threading
+from contextvars import ContextVar
+from core.metrics import register_gauges
+from core.config import (
+    LOG_LEVEL, LOG_FILE, LOG_FORMAT, LOG_ASYNC, LOG_QUEUE_SIZE, LOG_OVERFLOW_POLICY,
+    LOG_MAX_BYTES, LOG_BACKUP_COUNT, LOG_ROTATE_WHEN,
+)
+
+_log_context: ContextVar[dict] = ContextVar("log_context", default=None)
+
+log_metrics = {"enqueued": 0, "dropped": 0}
+_metrics_lock = threading.Lock()
+
+
+def new_log_context(**fields):
+    return _log_context.set(dict(fields))
+
+
+def reset_log_context(token):
+    _log_context.reset(token)
+
+
+def get_log_context() -> dict:
+    return dict(_log_context.get() or {})
+
+
+def bind_log_context(**fields):
+    contexto = _log_context.get()
+    if contexto is not None:
+        contexto.update(fields)
+
+
+class ContextFilter(logging.Filter):
+    def filter(self, record):
+        contexto = _log_context.get() or {}
+        record.request_id = contexto.get("request_id")
+        record.user_id = contexto.get("user_id")
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        dados = {
+            "timestamp": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "request_id": getattr(record, "request_id", None),
+            "user_id": getattr(record, "user_id", None),
+        }
+        if record.exc_info:
+            dados["exception"] = self.formatException(record.exc_info)
+        return json.dumps(dados, ensure_ascii=False, default=str)
+
+
+class BoundedQueueHandler(logging.handlers.QueueHandler):
+    def __init__(self, log_queue, overflow_policy: str = "drop_new"):
+        super().__init__(log_queue)
+        self.overflow_policy = overflow_policy
+
+    def prepare(self, record):
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            if self.overflow_policy == "drop_oldest":
+                try:
+                    self.queue.get_nowait()
+                    self.queue.put_nowait(record)
+                except (queue.Empty, queue.Full):
+                    pass
+            with _metrics_lock:
+                log_metrics["dropped"] += 1
+            return
+        with _metrics_lock:
+            log_metrics["enqueued"] += 1
+
+
+class DrainingQueueListener(logging.handlers.QueueListener):
+    def enqueue_sentinel(self):
+        self.queue.put(self._sentinel)
+
+
+def _build_formatter() -> logging.Formatter:
+    if LOG_FORMAT == "json":
+        return JsonFormatter()
+    return logging.Formatter("%(asctime)s - %(levelname)s - %(message)s")
+
+
+def _build_file_handler() -> logging.Handler:
+    if LOG_ROTATE_WHEN:
+        return logging.handlers.TimedRotatingFileHandler(LOG_FILE, when=LOG_ROTATE_WHEN, backupCount=LOG_BACKUP_COUNT, encoding="utf-8")
+    return logging.handlers.RotatingFileHandler(LOG_FILE, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUP_COUNT, encoding="utf-8")
+
 
 logger = logging.getLogger("app_logger")
-logger.setLevel(logging.INFO)
+logger.setLevel(LOG_LEVEL)
+listener = None
 
 if not logger.handlers:
-    file_handler = logging.FileHandler("app.log", encoding="utf-8")
-    file_handler.setLevel(logging.INFO)
+    formatter = _build_formatter()
 
-    formatter = logging.Formatter("%(asctime)s - %(levelname)s - %(message)s")
+    file_handler = _build_file_handler()
+    file_handler.setLevel(LOG_LEVEL)
     file_handler.setFormatter(formatter)
 
     console_handler = logging.StreamHandler()
-    console_handler.setLevel(logging.INFO)
+    console_handler.setLevel(LOG_LEVEL)
     console_handler.setFormatter(formatter)
 
-    logger.addHandler(file_handler)
-    logger.addHandler(console_handler)
\ No newline at end of file
+    if LOG_ASYNC:
+        queue_handler = BoundedQueueHandler(queue.Queue(LOG_QUEUE_SIZE), LOG_OVERFLOW_POLICY)
+        queue_handler.addFilter(ContextFilter())
+        logger.addHandler(queue_handler)
+
+        listener = DrainingQueueListener(queue_handler.queue, file_handler, console_handler, respect_handler_level=True)
+        listener.start()
+    else:
+        file_handler.addFilter(ContextFilter())
+        console_handler.addFilter(ContextFilter())
+        logger.addHandler(file_handler)
+        logger.addHandler(console_handler)
+
+
+def stop_logging():
+    global listener
+    if listener is not None:
+        listener.stop()
+        listener = None
+
+
+def get_log_metrics() -> dict:
+    with _metrics_lock:
+        metrics = dict(log_metrics)
+    if listener is not None:
+        metrics["queue_size"] = listener.queue.qsize()
+    return metrics
+
+
+register_gauges("logging", get_log_metrics)
+atexit.register(stop_logging)